@@ -0,0 +1,275 @@
+import gc
+import sys
+import random
+import contextlib
+import time
+import tracemalloc
+from photon import Photon
+from mirror import Mirror
+from receiver import Receiver
+from sorter import sort_receivers_by_symbol, sort_receivers_by_activation_time, \
+    sort_receivers_by_total_energy, sort_receivers_for_report
+from direction import MIRROR_SYMBOLS
+from input_parser import check_lines, check_emitter, check_receiver, check_mirror, check_pulse_sequence
+from board_displayer import BoardDisplayer
+from sparse_board_displayer import SparseBoardDisplayer
+
+'''
+benchmark - Measures how the slower parts of the program scale with the size
+of their input. Each benchmark prints a table with one row per input size.
+
+Usage: python benchmark.py <benchmark>
+where <benchmark> is one of the names in BENCHMARKS. With no name given, every
+benchmark is run.
+'''
+
+
+def time_call(function, *args) -> float:
+    '''
+    Returns how many seconds a single call of function with args takes.
+
+    Parameters
+    ----------
+    function - the function to time
+    args     - the arguments to call it with
+    '''
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def make_receivers(count: int, seed: int = 0) -> list[Receiver]:
+    '''
+    Returns count activated receivers in a random order, with random
+    activation times and energies chosen so that there are plenty of ties.
+
+    Parameters
+    ----------
+    count - the number of receivers to make
+    seed  - the seed for the random number generator
+    '''
+    rng = random.Random(seed)
+    receivers = []
+    i = 0
+    while i < count:
+        receiver = Receiver(f'R{i}', i, 0)
+        receiver.activated = True
+        receiver.activation_time = rng.randint(1, max(1, count // 10))
+        receiver.photons_absorbed = 1
+        receiver.total_energy = Receiver.convert_frequency_to_energy(rng.randint(1, 1000))
+        receivers.append(receiver)
+        i += 1
+    rng.shuffle(receivers)
+    return receivers
+
+
+def benchmark_sorter(sizes: list[int]) -> None:
+    '''
+    Times each receiver sort from sorter, as well as the two report
+    orderings made separately and with sort_receivers_for_report.
+
+    Parameters
+    ----------
+    sizes - the numbers of receivers to sort
+    '''
+    print(f'{"receivers":>10} {"symbol":>10} {"activation":>10} {"energy":>10} {"separate":>10} {"report":>10}')
+    for size in sizes:
+        receivers = make_receivers(size)
+        by_symbol = time_call(sort_receivers_by_symbol, receivers)
+        by_activation_time = time_call(sort_receivers_by_activation_time, receivers)
+        by_total_energy = time_call(sort_receivers_by_total_energy, receivers)
+        report = time_call(sort_receivers_for_report, receivers)
+        separate = by_activation_time + by_total_energy
+        print(f'{size:>10} {by_symbol:>9.4f}s {by_activation_time:>9.4f}s {by_total_energy:>9.4f}s '
+              f'{separate:>9.4f}s {report:>9.4f}s')
+
+
+class DictPhoton:
+    '''
+    A photon laid out the way Photon was before it used __slots__: every
+    attribute, including the symbol and the direction string, is stored in
+    the instance's __dict__. Only used as a reference for benchmark_memory.
+    '''
+
+
+    def __init__(self, x: int, y: int, frequency: int, direction: str):
+        self.x = x
+        self.y = y
+        self.symbol = '.'
+        self.frequency = frequency
+        self.direction = direction
+        self.absorbed = False
+        self.trapped = False
+        self.circuit = None
+
+
+def measure_memory(factory, count: int) -> int:
+    '''
+    Returns how many bytes are allocated to keep count objects made by
+    factory alive at once.
+
+    Parameters
+    ----------
+    factory - called with an index to make each object
+    count   - the number of objects to make
+    '''
+    tracemalloc.start()
+    objects = [factory(i) for i in range(count)]
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return allocated
+
+
+def benchmark_memory(sizes: list[int]) -> None:
+    '''
+    Measures the memory used by photons with a per-instance __dict__ and with
+    __slots__, along with the memory used by mirrors, and the saving per
+    million photons.
+
+    Parameters
+    ----------
+    sizes - the numbers of objects to make
+    '''
+    directions = 'NESW'
+    print(f'{"objects":>10} {"dict photon":>12} {"photon":>12} {"mirror":>12} {"saved/1M":>12}')
+    for size in sizes:
+        dict_photons = measure_memory(lambda i: DictPhoton(i, i, 100 + i, directions[i % 4]), size)
+        photons = measure_memory(lambda i: Photon(i, i, 100 + i, directions[i % 4]), size)
+        mirrors = measure_memory(lambda i: Mirror('/', i, i), size)
+        saved = (dict_photons - photons) * 10**6 // size
+        print(f'{size:>10} {dict_photons / 2**20:>10.2f}MB {photons / 2**20:>10.2f}MB '
+              f'{mirrors / 2**20:>10.2f}MB {saved / 2**20:>10.2f}MB')
+
+
+@contextlib.contextmanager
+def paused_gc():
+    '''
+    Pauses the cyclic garbage collector for the duration of a with block,
+    which is how a caller making millions of short-lived objects (e.g. with
+    check_lines) can stop it being set off over and over.
+    '''
+    collecting = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if collecting:
+            gc.enable()
+
+
+def make_lines(count: int, kind: str, seed: int = 0) -> list[str]:
+    '''
+    Returns count random valid input lines of one kind, every tenth of which
+    is made invalid by replacing its last token.
+
+    Parameters
+    ----------
+    count - the number of lines to make
+    kind  - 'emitter', 'receiver', 'mirror' or 'pulse'
+    seed  - the seed for the random number generator
+    '''
+    rng = random.Random(seed)
+    lines = []
+    i = 0
+    while i < count:
+        if kind == 'emitter':
+            line = f'E{i} {rng.randrange(1000)} {rng.randrange(1000)}'
+        elif kind == 'receiver':
+            line = f'R{i} {rng.randrange(1000)} {rng.randrange(1000)}'
+        elif kind == 'mirror':
+            line = f'{rng.choice(MIRROR_SYMBOLS)} {rng.randrange(1000)} {rng.randrange(1000)}'
+        else:
+            line = f'E{i} {rng.randint(1, 1000)} {rng.choice("NESW")}'
+        if i % 10 == 9:
+            line = line.rsplit(' ', 1)[0] + ' x'
+        lines.append(line)
+        i += 1
+    return lines
+
+
+def benchmark_parser(sizes: list[int]) -> None:
+    '''
+    Measures how many lines per second check_lines validates for each kind
+    of input line, with one in ten lines invalid, as it is and with the
+    garbage collector paused by the caller (see paused_gc).
+
+    Parameters
+    ----------
+    sizes - the numbers of lines to check
+    '''
+    checks = (('emitter', check_emitter), ('receiver', check_receiver), ('mirror', check_mirror),
+              ('pulse', check_pulse_sequence))
+    print(f'{"lines":>10} {"gc":>6}' + ''.join(f' {kind + " lines/s":>16}' for kind, check in checks))
+    for size in sizes:
+        lines = {kind: make_lines(size, kind) for kind, check in checks}
+        for paused in (False, True):
+            row = f'{size:>10} {"paused" if paused else "on":>6}'
+            for kind, check in checks:
+                with paused_gc() if paused else contextlib.nullcontext():
+                    row += f' {size / time_call(check_lines, check, lines[kind]):>16,.0f}'
+            print(row)
+
+
+def draw_board(displayer_class, size: int, count: int, seed: int = 0):
+    '''
+    Returns a size x size board drawn with count mirrors, each with a
+    photon's trail running from it to the edge of the board.
+
+    Parameters
+    ----------
+    displayer_class - BoardDisplayer or SparseBoardDisplayer
+    size            - the width and height of the board
+    count           - the number of mirrors to draw
+    seed            - the seed for the random number generator
+    '''
+    rng = random.Random(seed)
+    displayer = displayer_class(size, size)
+    i = 0
+    while i < count:
+        mirror = Mirror(rng.choice(MIRROR_SYMBOLS), rng.randrange(size), rng.randrange(size))
+        displayer.add_component_to_board(mirror)
+        displayer.add_path_to_board(mirror.x, mirror.y, 'NESW'[i % 4], size)
+        i += 1
+    return displayer
+
+
+def benchmark_board(sizes: list[int], count: int = 300) -> None:
+    '''
+    Measures the memory used by a board with a few hundred mirrors and
+    trails when stored densely (up to 10,000 x 10,000) and sparsely, and the
+    time taken to render a 100 x 40 region of the sparse board.
+
+    Parameters
+    ----------
+    sizes - the widths (and heights) of the boards
+    count - the number of mirrors and trails on each board
+    '''
+    print(f'{"size":>10} {"dense":>12} {"sparse":>12} {"region":>12}')
+    for size in sizes:
+        dense = '-'
+        if size <= 10**4:
+            dense = f'{measure_memory(lambda i: draw_board(BoardDisplayer, size, count), 1) / 2**20:.2f}MB'
+        sparse = measure_memory(lambda i: draw_board(SparseBoardDisplayer, size, count), 1)
+        displayer = draw_board(SparseBoardDisplayer, size, count)
+        region = time_call(displayer.render_region, size // 2, size // 2, 100, 40)
+        print(f'{size:>10} {dense:>12} {sparse / 2**20:>10.2f}MB {region * 1000:>10.2f}ms')
+
+
+BENCHMARKS = {
+    'sorter': lambda: benchmark_sorter([10, 100, 1000, 10**4, 10**5, 10**6]),
+    'memory': lambda: benchmark_memory([1000, 10**4, 10**5, 10**6]),
+    'parser': lambda: benchmark_parser([10**4, 10**5, 10**6]),
+    'board': lambda: benchmark_board([10**3, 10**4, 10**5, 10**6]),
+}
+
+
+if __name__ == '__main__':
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            print(f'Error: unknown benchmark \'{name}\'')
+            continue
+        print(f'{name}:')
+        BENCHMARKS[name]()
+        print('')
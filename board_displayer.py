@@ -1,18 +1,54 @@
+import sys
+import hashlib
 from emitter import Emitter
 from receiver import Receiver
 from photon import Photon
 from mirror import Mirror
+from symbols import get_glyph
 
 '''
 BoardDisplayer - A helper class used to display the circuit board.
 Each time a component is added to the circuit, this board is updated to 
 store the component's symbol in its assigned position on the board.
 
+The board is stored as one bytearray laid out exactly as it is printed,
+border and newlines included, with one byte per cell. Printing the board is
+then a single decode and a single write, and the decoded frame is cached
+until a cell changes. Boards too large to allocate are drawn by a
+SparseBoardDisplayer instead, which has the same methods.
+
 You are free to add more attributes and methods, as long as you aren't 
 modifying the existing scaffold.
 '''
 
 
+# byte values of an empty cell and of a photon's trail
+EMPTY = ord(' ')
+PHOTON = ord('.')
+
+
+def clip_region(x: int, y: int, width: int, height: int, board_width: int,
+                board_height: int) -> tuple[int, int, int, int]:
+    '''
+    Returns the (left, top, right, bottom) of a region of a board clipped to
+    the board, where right and bottom are one past the last column and row.
+
+    Parameters
+    ----------
+    x            - the x position of the left column of the region
+    y            - the y position of the top row of the region
+    width        - the width of the region
+    height       - the height of the region
+    board_width  - the width of the board
+    board_height - the height of the board
+    '''
+    left = min(max(x, 0), board_width)
+    top = min(max(y, 0), board_height)
+    right = max(min(x + width, board_width), left)
+    bottom = max(min(y + height, board_height), top)
+    return left, top, right, bottom
+
+
 class BoardDisplayer:
 
 
@@ -24,10 +60,12 @@ class BoardDisplayer:
 
         width:  int             - the width of this board
         height: int             - the height of this board
-        board:  list[list[str]] - a list of list of strings representing the 
-                                  circuit board, having the symbol of each 
-                                  component and photon in the circuit at its 
-                                  assigned position
+        board:  bytearray       - the printed form of the circuit board as 
+                                  bytes, having the symbol of each component
+                                  and photon in the circuit at its assigned
+                                  position
+        frame:  str | None      - the board decoded for printing, or None if
+                                  the board has changed since it was decoded
 
         Parameters
         ----------
@@ -37,48 +75,66 @@ class BoardDisplayer:
         self.width = width
         self.height = height 
         self.board = self.create_board()
+        self.frame = None
 
 
-    def create_board(self) -> list[list[str]]:
+    def create_board(self) -> bytearray:
         '''
         Creates a board of size width x height and returns it.
 
         Returns
         -------
-        Returns a list of list of strings representing an empty circuit 
-        board of size width x height.
+        Returns a bytearray representing an empty circuit board of size 
+        width x height, laid out as it is printed with its border.
 
         Example
         ------- 
         >>> self.width, self.height
         (8, 3)
         >>> create_board() # board split across multiple lines for readability
-        [
-         [' ', ' ', ' ', ' ', ' ', ' ', ' ', ' '], 
-         [' ', ' ', ' ', ' ', ' ', ' ', ' ', ' '],
-         [' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ']
-        ]
+        bytearray(b'+--------+\n'
+                  b'|        |\n'
+                  b'|        |\n'
+                  b'|        |\n'
+                  b'+--------+\n')
 
         The board above has 3 rows (height), with each row having 8 columns (width).
         Each cell is initialised as a space, which represents an empty cell.
         '''
-        board = []
-        row = 0
-        while row < self.height:
-            new_row = []
-            col = 0
-            while col < self.width:
-                new_row.append(' ')
-                col += 1
-            board.append(new_row)
-            row += 1
-        return board
+        border = b'+' + b'-' * self.width + b'+\n'
+        row = b'|' + b' ' * self.width + b'|\n'
+        return bytearray(border + row * self.height + border)
+
+
+    def cell_index(self, x: int, y: int) -> int:
+        '''
+        Returns the index into board of the cell at (x, y).
+
+        Parameters
+        ----------
+        x - the x position of the cell
+        y - the y position of the cell
+        '''
+        return (self.width + 3) * (y + 1) + 1 + x
+
+
+    def get_cell(self, x: int, y: int) -> str:
+        '''
+        Returns the symbol on the board at (x, y), being ' ' for an empty cell.
+
+        Parameters
+        ----------
+        x - the x position of the cell
+        y - the y position of the cell
+        '''
+        return chr(self.board[self.cell_index(x, y)])
 
    
     def add_component_to_board(self, component: Emitter | Receiver | Mirror) -> None:
         '''
         Adds the symbol of the component on the board at its assigned 
-        position.
+        position. Symbols wider than a cell are drawn as one character (see
+        symbols.get_glyph).
 
         Parameters
         ----------
@@ -89,28 +145,41 @@ class BoardDisplayer:
         You shouldn't need to care what type of component you are adding,
         since all components have a symbol, x and y.
         
-        >>> self.board # board split across multiple lines for readability
-        [
-         [' ', ' ', ' '], 
-         [' ', ' ', ' '],
-         [' ', ' ', ' ']
-        ]
+        >>> self.print_board()
+        +---+
+        |   |
+        |   |
+        |   |
+        +---+
         >>> emitter = Emitter('A', 0, 0)
         >>> receiver = Receiver('R0', 2, 0)
         >>> self.add_component_to_board(emitter)
         >>> self.add_component_to_board(receiver)
-        >>> self.board
-        [
-         ['A', ' ', '0'], 
-         [' ', ' ', ' '],
-         [' ', ' ', ' ']
-        ]      
+        >>> self.print_board()
+        +---+
+        |A 0|
+        |   |
+        |   |
+        +---+
         '''
         if 0 <= component.x < self.width and 0 <= component.y < self.height:
-            if len(component.symbol) == 2:
-                self.board[component.y][component.x] = component.symbol[1]
-            else:
-                self.board[component.y][component.x] = component.symbol
+            symbol = get_glyph(component.symbol, component.get_component_type())
+            self.board[self.cell_index(component.x, component.y)] = ord(symbol)
+            self.frame = None
+
+
+    def remove_component_from_board(self, component: Emitter | Receiver | Mirror) -> None:
+        '''
+        Clears the cell of the board at the position of a component that was
+        taken out of the circuit.
+
+        Parameters
+        ----------
+        component: the component to remove its symbol from the board
+        '''
+        if 0 <= component.x < self.width and 0 <= component.y < self.height:
+            self.board[self.cell_index(component.x, component.y)] = EMPTY
+            self.frame = None
 
 
     def add_photon_to_board(self, photon: Photon) -> None:
@@ -125,8 +194,64 @@ class BoardDisplayer:
         photon: the photon to add its symbol on the board
         '''
         if 0 <= photon.x < self.width and 0 <= photon.y < self.height:
-            if self.board[photon.y][photon.x] == ' ':
-                self.board[photon.y][photon.x] = photon.symbol
+            index = self.cell_index(photon.x, photon.y)
+            if self.board[index] == EMPTY:
+                self.board[index] = ord(photon.symbol)
+                self.frame = None
+
+
+    def add_path_to_board(self, x: int, y: int, direction: str, length: int) -> None:
+        '''
+        Adds the photon symbol on the board for each of the length cells a
+        photon passes through when it travels from (x, y) in the given
+        direction, not including (x, y) itself. Like add_photon_to_board, 
+        cells that already hold a symbol are not replaced.
+
+        Parameters
+        ----------
+        x         - the x position the photon starts from
+        y         - the y position the photon starts from
+        direction - the direction the photon travels in ('N', 'E', 'S' or 'W')
+        length    - the number of cells the photon passes through
+        '''
+        dx = 0
+        dy = 0
+        if direction == 'E':
+            dx = 1
+        elif direction == 'W':
+            dx = -1
+        elif direction == 'N':
+            dy = -1
+        elif direction == 'S':
+            dy = 1
+
+        step = 0
+        while step < length:
+            x += dx
+            y += dy
+            if 0 <= x < self.width and 0 <= y < self.height:
+                index = self.cell_index(x, y)
+                if self.board[index] == EMPTY:
+                    self.board[index] = PHOTON
+                    self.frame = None
+            step += 1
+
+
+    def add_cells_to_board(self, cells: list[tuple[int, int]]) -> None:
+        '''
+        Adds the photon symbol on the board at each (x, y) position in cells
+        that a photon has passed through. Like add_photon_to_board, cells 
+        that already hold a symbol are not replaced.
+
+        Parameters
+        ----------
+        cells - the (x, y) positions photons have passed through
+        '''
+        for x, y in cells:
+            index = self.cell_index(x, y)
+            if self.board[index] == EMPTY:
+                self.board[index] = PHOTON
+                self.frame = None
 
 
     def print_board(self) -> None:
@@ -136,11 +261,11 @@ class BoardDisplayer:
         Example 1
         ---------
         >>> self.board # board split across multiple lines for readability
-        [
-         [' ', ' ', ' ', ' ', ' ', ' ', ' ', ' '], 
-         [' ', ' ', ' ', ' ', ' ', ' ', ' ', ' '],
-         [' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ']
-        ]
+        bytearray(b'+--------+\\n'
+                  b'|        |\\n'
+                  b'|        |\\n'
+                  b'|        |\\n'
+                  b'+--------+\\n')
         >>> self.print_board()
         +--------+
         |        |         
@@ -151,11 +276,11 @@ class BoardDisplayer:
         Example 2
         ---------
         >>> self.board # board split across multiple lines for readability
-        [
-         ['A', ' ', ' ', ' ', ' ', ' ', ' ', '0'], 
-         [' ', ' ', ' ', ' ', ' ', ' ', ' ', ' '],
-         ['B', ' ', ' ', ' ', ' ', ' ', ' ', '1']
-        ]
+        bytearray(b'+--------+\\n'
+                  b'|A      0|\\n'
+                  b'|        |\\n'
+                  b'|B      1|\\n'
+                  b'+--------+\\n')
         >>> self.print_board()
         +--------+
         |A      0|         
@@ -166,11 +291,11 @@ class BoardDisplayer:
         Example 3
         ---------
         >>> self.board # board split across multiple lines for readability
-        [
-         ['A', '.', '.', '.', '.', '.', '.', '0'], 
-         [' ', ' ', ' ', ' ', ' ', ' ', ' ', ' '],
-         ['B', '.', '.', '.', '.', '.', '.', '1']
-        ]
+        bytearray(b'+--------+\\n'
+                  b'|A......0|\\n'
+                  b'|        |\\n'
+                  b'|B......1|\\n'
+                  b'+--------+\\n')
         >>> self.print_board()
         +--------+
         |A......0|         
@@ -178,16 +303,56 @@ class BoardDisplayer:
         |B......1|
         +--------+
         '''
-        border = '+'+'-'*self.width+'+'
-        print(border)
-        row = 0 
-        while row < self.height:
-            line = '|'
-            col = 0
-            while col < self.width:
-                line += self.board[row][col]
-                col += 1
-            line += '|'
-            print(line)
-            row += 1
-        print(border)
+        sys.stdout.write(self.render_board())
+
+
+    def get_checksum(self) -> str:
+        '''Returns a hash of everything drawn on the board.'''
+        return hashlib.sha256(self.board).hexdigest()
+
+
+    def render_board(self) -> str:
+        '''
+        Returns the formatted board with the border included, exactly as 
+        print_board prints it. The result is cached until the board changes.
+        '''
+        if self.frame is None:
+            self.frame = self.board.decode('latin-1')
+        return self.frame
+
+
+    def render_region(self, x: int, y: int, width: int, height: int) -> str:
+        '''
+        Returns the formatted region of the board width cells wide and height
+        cells high with its top left cell at (x, y), with a border around
+        it. The region is clipped to the board.
+
+        Parameters
+        ----------
+        x      - the x position of the left column of the region
+        y      - the y position of the top row of the region
+        width  - the width of the region
+        height - the height of the region
+
+        Example
+        -------
+        >>> self.print_board()
+        +--------+
+        |A......0|
+        |        |
+        |B......1|
+        +--------+
+        >>> print(self.render_region(0, 1, 3, 2), end='')
+        +---+
+        |   |
+        |B..|
+        +---+
+        '''
+        left, top, right, bottom = clip_region(x, y, width, height, self.width, self.height)
+        border = '+' + '-' * (right - left) + '+\n'
+        rows = [border]
+        for row in range(top, bottom):
+            index = self.cell_index(left, row)
+            rows.append('|' + self.board[index:index + right - left].decode('latin-1') + '|\n')
+        rows.append(border)
+        return ''.join(rows)
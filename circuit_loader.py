@@ -0,0 +1,123 @@
+import input_parser
+from laser_circuit import LaserCircuit
+from pulse_loader import PulseLoader
+
+'''
+circuit_loader - Loads a whole circuit from a circuit file in one pass.
+
+A circuit file holds the same lines the program reads from the user, followed
+by the pulse sequence:
+
+    <width> <height>
+    <emitter lines>
+    END EMITTERS
+    <receiver lines>
+    END RECEIVERS
+    <mirror lines>
+    END MIRRORS
+    <pulse sequence lines>
+
+Every line is validated with the same rules as input_parser and every
+component with the same checks as LaserCircuit, but instead of printing each
+error as it is found, all errors are collected and returned together. Blank
+lines are ignored. The components are added through LaserCircuit's bulk
+add_components, so loading large layouts does not re-sort on every insert.
+'''
+
+
+SECTIONS = (
+    ('END EMITTERS', input_parser.check_emitter),
+    ('END RECEIVERS', input_parser.check_receiver),
+    ('END MIRRORS', input_parser.check_mirror),
+)
+
+
+def load_circuit(file_obj) -> tuple[LaserCircuit | None, list[str]]:
+    '''
+    Reads a circuit file and builds the circuit it describes, including
+    setting the pulse sequence of its emitters.
+
+    Parameters
+    ----------
+    file_obj - a file like object returned by open()
+
+    Returns
+    -------
+    A tuple of the circuit and a list of error messages, each prefixed with
+    the line it was found on (a missing end marker is reported on the line
+    after the last one). Lines with errors are skipped, so the circuit holds
+    everything that was valid. If the board size is not valid, no
+    circuit can be built and None is returned in its place.
+    '''
+    errors = []
+    size = None
+    components = []
+    component_lines = []
+    pulses = []
+    section = -1
+
+    line_number = 0
+    for line in file_obj:
+        line_number += 1
+        line = line.strip()
+        if not line:
+            continue
+
+        if section == -1:
+            size, error = input_parser.check_size(line)
+            if error is not None:
+                errors.append((line_number, error))
+            section = 0
+            continue
+
+        if section < len(SECTIONS):
+            end_marker, check = SECTIONS[section]
+            if line == end_marker:
+                section += 1
+                continue
+            component, error = check(line)
+            if error is not None:
+                errors.append((line_number, error))
+            else:
+                components.append(component)
+                component_lines.append(line_number)
+            continue
+
+        pulse, error = input_parser.check_pulse_sequence(line)
+        if error is not None:
+            errors.append((line_number, error))
+        else:
+            pulses.append((line_number, pulse))
+
+    if section == -1:
+        errors.append((line_number + 1, 'Error: the circuit file is empty'))
+    elif section < len(SECTIONS):
+        errors.append((line_number + 1, f'Error: missing {SECTIONS[section][0]}'))
+
+    if size is None:
+        return None, format_errors(errors)
+
+    circuit = LaserCircuit(size[0], size[1])
+    for index, error in circuit.add_components(components):
+        errors.append((component_lines[index], error))
+
+    loader = PulseLoader(circuit, quiet=True)
+    for line_number, (symbol, frequency, direction) in pulses:
+        error = loader.set_pulse(symbol, frequency, direction)
+        if error is not None:
+            errors.append((line_number, error))
+
+    return circuit, format_errors(errors)
+
+
+def format_errors(errors: list[tuple[int, str]]) -> list[str]:
+    '''
+    Returns the errors found while loading a circuit file in the order of the
+    lines they were found on, each prefixed with its line number.
+
+    Parameters
+    ----------
+    errors - the line number and message of each error
+    '''
+    errors = sorted(errors, key=lambda error: error[0])
+    return [f'Line {line_number}: {error}' for line_number, error in errors]
@@ -0,0 +1,104 @@
+import os
+
+'''
+CircuitResult - The results of running a LaserCircuit, returned by
+run_circuit. It holds everything that run_circuit writes into its output
+files, so callers running circuits in bulk can read the results directly
+without printing anything or going through the file system, and can write
+the output files to a directory of their choosing.
+'''
+
+
+class CircuitResult:
+
+
+    def __init__(self, clock: int, emit_photons: list[str], activation_times: list[tuple[str, int]],
+                 total_energy: list[tuple[str, float, int]], trapped_photons: int):
+        '''
+        Initialises a CircuitResult instance.
+
+        clock:            int                          - how many nanoseconds
+                                                         the circuit ran for
+        emit_photons:     list[str]                    - each emitter as
+                                                         printed when it
+                                                         emitted its photon
+        activation_times: list[tuple[str, int]]        - the symbol and
+                                                         activation time of
+                                                         each activated
+                                                         receiver, sorted by
+                                                         activation time
+        total_energy:     list[tuple[str, float, int]] - the symbol, total
+                                                         energy and photons
+                                                         absorbed of each
+                                                         activated receiver,
+                                                         sorted by total
+                                                         energy
+        trapped_photons:  int                          - how many photons were
+                                                         stopped for being
+                                                         stuck in a loop
+
+        Parameters
+        ----------
+        clock            - the final clock of the circuit
+        emit_photons     - the emitters as strings
+        activation_times - the activation times of the activated receivers
+        total_energy     - the energy absorbed by the activated receivers
+        trapped_photons  - the number of trapped photons
+        '''
+        self.clock = clock
+        self.emit_photons = emit_photons
+        self.activation_times = activation_times
+        self.total_energy = total_energy
+        self.trapped_photons = trapped_photons
+
+
+    def get_clock(self) -> int:
+        '''Returns clock.'''
+        return self.clock
+
+
+    def get_activation_times(self) -> list[tuple[str, int]]:
+        '''Returns activation_times.'''
+        return self.activation_times
+
+
+    def get_total_energy(self) -> list[tuple[str, float, int]]:
+        '''Returns total_energy.'''
+        return self.total_energy
+
+
+    def get_trapped_photons(self) -> int:
+        '''Returns trapped_photons.'''
+        return self.trapped_photons
+
+
+    def emit_photons_output(self) -> str:
+        '''Returns the contents of the emit_photons.out output file.'''
+        return ''.join(f'{line}\n' for line in self.emit_photons)
+
+
+    def activation_times_output(self) -> str:
+        '''Returns the contents of the activation_times.out output file.'''
+        return ''.join(f'{symbol}: {time}ns\n' for symbol, time in self.activation_times)
+
+
+    def total_energy_output(self) -> str:
+        '''Returns the contents of the total_energy.out output file.'''
+        return ''.join(f'{symbol}: {energy:.2f}eV ({photons})\n' for symbol, energy, photons in self.total_energy)
+
+
+    def write(self, output_dir: str) -> None:
+        '''
+        Writes the emit_photons.out, activation_times.out and total_energy.out
+        output files into output_dir. You can assume output_dir exists.
+
+        Parameters
+        ----------
+        output_dir - the directory to write the output files into
+        '''
+        with open(os.path.join(output_dir, 'emit_photons.out'), 'w') as file:
+            file.write(self.emit_photons_output())
+        with open(os.path.join(output_dir, 'activation_times.out'), 'w') as file:
+            file.write(self.activation_times_output())
+        with open(os.path.join(output_dir, 'total_energy.out'), 'w') as file:
+            file.write(self.total_energy_output())
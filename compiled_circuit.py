@@ -0,0 +1,473 @@
+import copy
+from bisect import bisect_left, bisect_right
+from collections import ChainMap
+from photon import Photon
+from receiver import Receiver
+from circuit_result import CircuitResult
+from sorter import sort_receivers_for_report
+from direction import NORTH, EAST, SOUTH, WEST, STATIONARY, ABSORB, DIRECTIONS, DIRECTION_NAMES, REFLECTIONS, \
+    encode_direction
+
+'''
+CompiledCircuit - The layout of a LaserCircuit compiled into the outcome of
+every photon that could travel through it, returned by LaserCircuit.compile.
+
+A photon's path is fully determined by its position and direction, so each
+state (x, y, direction) of a photon leaving a component has exactly one next
+state: the component it reaches next, after reflecting off it or passing over
+it, or an end to its path. Compiling builds this graph once for every
+emitter and mirror cell and follows each chain to its end, storing the
+outcome of every state along the way (path compression), so no chain is ever
+followed twice. An outcome is a tuple (kind, time, x, y, period) where kind is
+
+    'receiver' - absorbed by the receiver at (x, y)
+    'exit'     - absorbed for leaving the board, last seen at (x, y)
+    'absorbed' - absorbed by the mirror at (x, y)
+    'loop'     - stuck in a loop forever, entering it at (x, y)
+
+time is how many nanoseconds the photon takes to get there and period is the
+length (ns) of the loop, or 0 for the other kinds.
+
+Afterwards, running the circuit with any pulse sequence only looks up one
+outcome per emitter instead of simulating every tick, and gives the same
+results as LaserCircuit.run_circuit. A compiled circuit holds only plain data,
+so it can be pickled and sent to other processes.
+'''
+
+
+class CompiledCircuit:
+
+
+    def __init__(self, width: int, height: int, emitters: list[tuple[str, int, int, int, str | None]],
+                 receivers: list[tuple[str, int, int]], mirrors: list[tuple[str, int, int]],
+                 resolve_all: bool = True):
+        '''
+        Initialises a CompiledCircuit instance given the size of the board and
+        its components, and compiles the outcome of every state. If
+        resolve_all is False, nothing is compiled up front and each state is
+        compiled the first time a photon reaches it instead, which is cheaper
+        when only a few photons will be traced.
+
+        width:          int                               - the width of the
+                                                            board
+        height:         int                               - the height of the
+                                                            board
+        emitters:       list[tuple[str, int, int, int, str | None]]
+                                                          - the symbol,
+                                                            position, frequency
+                                                            and direction of
+                                                            each emitter, in
+                                                            the order they emit
+        receivers:      list[tuple[str, int, int]]        - the symbol and
+                                                            position of each
+                                                            receiver
+        mirrors:        dict[tuple[int, int], str]        - the symbol of the
+                                                            mirror at each
+                                                            position
+        receiver_grid:  dict[tuple[int, int], str]        - the symbol of the
+                                                            receiver at each
+                                                            position
+        emitter_cells:  set[tuple[int, int]]              - the position of
+                                                            every emitter
+        row_index:      dict[int, list[int]]              - the sorted x
+                                                            positions of the
+                                                            components in each
+                                                            row
+        column_index:   dict[int, list[int]]              - the sorted y
+                                                            positions of the
+                                                            components in each
+                                                            column
+        successors:     dict[tuple[int, int, int], tuple] - per state, the
+                                                            next state and the
+                                                            time to reach it,
+                                                            or None and the
+                                                            outcome it ends in
+        outcomes:       dict[tuple[int, int, int], tuple] - per state, the
+                                                            outcome its path
+                                                            ends in
+        trap_times:     dict[tuple[int, int, int], tuple] - per looping start
+                                                            state, what
+                                                            find_trap returns
+
+        Parameters
+        ----------
+        width       - the width of the board
+        height      - the height of the board
+        emitters    - the emitters, as (symbol, x, y, frequency, direction)
+        receivers   - the receivers, as (symbol, x, y)
+        mirrors     - the mirrors, as (symbol, x, y)
+        resolve_all - whether to compile every state now
+        '''
+        self.width = width
+        self.height = height
+        self.emitters = emitters
+        self.receivers = receivers
+        self.mirrors = {(x, y): symbol for symbol, x, y in mirrors}
+        self.receiver_grid = {(x, y): symbol for symbol, x, y in receivers}
+        self.emitter_cells = {(x, y) for symbol, x, y, frequency, direction in emitters}
+
+        self.row_index = {}
+        self.column_index = {}
+        for x, y in list(self.emitter_cells) + list(self.receiver_grid) + list(self.mirrors):
+            self.row_index.setdefault(y, []).append(x)
+            self.column_index.setdefault(x, []).append(y)
+        for line in self.row_index.values():
+            line.sort()
+        for line in self.column_index.values():
+            line.sort()
+
+        self.successors = {}
+        self.outcomes = {}
+        self.trap_times = {}
+        if not resolve_all:
+            return
+        for x, y in list(self.emitter_cells) + list(self.mirrors):
+            for code in (NORTH, EAST, SOUTH, WEST):
+                self.successors[(x, y, code)] = self.find_successor(x, y, code)
+        for state in list(self.successors):
+            self.resolve(state)
+
+
+    def with_mirrors(self, mirrors: list[tuple[str, int, int]]) -> 'CompiledCircuit':
+        '''
+        Returns a compiled circuit of this layout with extra mirrors placed on
+        empty cells. It shares this circuit's position and line indexes,
+        layering only the mirrors and the rows and columns they change on
+        top, so making it costs as much as the mirrors given. Nothing in it
+        is compiled up front. This circuit is left as it is.
+
+        Parameters
+        ----------
+        mirrors - the mirrors to place, as (symbol, x, y)
+        '''
+        variant = copy.copy(self)
+        rows = {}
+        columns = {}
+        for symbol, x, y in mirrors:
+            if y not in rows:
+                rows[y] = list(self.row_index.get(y, []))
+            if x not in columns:
+                columns[x] = list(self.column_index.get(x, []))
+            rows[y].append(x)
+            columns[x].append(y)
+        for line in rows.values():
+            line.sort()
+        for line in columns.values():
+            line.sort()
+
+        variant.mirrors = ChainMap({(x, y): symbol for symbol, x, y in mirrors}, self.mirrors)
+        variant.row_index = ChainMap(rows, self.row_index)
+        variant.column_index = ChainMap(columns, self.column_index)
+        variant.successors = {}
+        variant.outcomes = {}
+        variant.trap_times = {}
+        return variant
+
+
+    def find_successor(self, x: int, y: int, code: int) -> tuple:
+        '''
+        Finds where a photon leaving (x, y) in the direction code goes next.
+
+        Parameters
+        ----------
+        x    - the x position the photon leaves
+        y    - the y position the photon leaves
+        code - the code of the direction it travels in, not STATIONARY
+
+        Returns
+        -------
+        (next state, time) if it reflects off or passes over a component and
+        carries on, or (None, outcome) if its path ends there.
+        '''
+        if code == EAST or code == WEST:
+            line = self.row_index.get(y, [])
+            if code == EAST:
+                i = bisect_right(line, x)
+                target = (line[i], y) if i < len(line) else None
+                edge = (self.width - 1, y)
+            else:
+                i = bisect_left(line, x) - 1
+                target = (line[i], y) if i >= 0 else None
+                edge = (0, y)
+        else:
+            line = self.column_index.get(x, [])
+            if code == SOUTH:
+                i = bisect_right(line, y)
+                target = (x, line[i]) if i < len(line) else None
+                edge = (x, self.height - 1)
+            else:
+                i = bisect_left(line, y) - 1
+                target = (x, line[i]) if i >= 0 else None
+                edge = (x, 0)
+
+        if target is None:
+            time = abs(edge[0] - x) + abs(edge[1] - y) + 1
+            return None, ('exit', time, edge[0], edge[1], 0)
+
+        time = abs(target[0] - x) + abs(target[1] - y)
+        if target in self.receiver_grid:
+            return None, ('receiver', time, target[0], target[1], 0)
+        if target in self.mirrors:
+            reflected = REFLECTIONS[self.mirrors[target]][code]
+            if reflected == ABSORB:
+                return None, ('absorbed', time, target[0], target[1], 0)
+            return (target[0], target[1], reflected), time
+        return (target[0], target[1], code), time
+
+
+    def get_successor(self, state: tuple[int, int, int]) -> tuple:
+        '''
+        Returns the successor of state as given by find_successor, finding and
+        storing it first if it is not a state of an emitter or mirror cell.
+
+        Parameters
+        ----------
+        state - the (x, y, direction code) of a photon
+        '''
+        successor = self.successors.get(state)
+        if successor is None:
+            successor = self.find_successor(*state)
+            self.successors[state] = successor
+        return successor
+
+
+    def resolve(self, state: tuple[int, int, int]) -> tuple:
+        '''
+        Follows the chain of states from state until it reaches a state whose
+        outcome is already known, the end of its path or a state it has
+        already passed through (a loop), then stores the outcome of every
+        state on the chain.
+
+        Parameters
+        ----------
+        state - the (x, y, direction code) of a photon with a direction
+
+        Returns
+        -------
+        The outcome of state.
+        '''
+        path = []
+        times = []
+        on_path = {}
+        while True:
+            if state in self.outcomes:
+                break
+            if state in on_path:
+                start = on_path[state]
+                period = sum(times[start:])
+                for looping in path[start:]:
+                    self.outcomes[looping] = ('loop', 0, looping[0], looping[1], period)
+                del path[start:]
+                del times[start:]
+                break
+            successor, result = self.get_successor(state)
+            if successor is None:
+                self.outcomes[state] = result
+                break
+            on_path[state] = len(path)
+            path.append(state)
+            times.append(result)
+            state = successor
+
+        outcome = self.outcomes[state]
+        i = len(path) - 1
+        while i >= 0:
+            kind, time, x, y, period = outcome
+            outcome = (kind, time + times[i], x, y, period)
+            self.outcomes[path[i]] = outcome
+            i -= 1
+        return outcome
+
+
+    def trace(self, x: int, y: int, direction: str | None) -> tuple[str, int, int, int, int]:
+        '''
+        Returns the outcome of a photon starting at (x, y) and travelling in
+        direction, as described at the top of this module. A photon without
+        a valid direction never moves, so it is absorbed straight away if it
+        is on a receiver, and is otherwise stuck in a loop of 1ns.
+
+        Parameters
+        ----------
+        x         - the x position of the photon
+        y         - the y position of the photon
+        direction - the direction of the photon
+
+        Example
+        -------
+        >>> compiled.trace(0, 0, 'E')
+        ('receiver', 4, 4, 0, 0)
+        '''
+        code = encode_direction(direction)
+        if code == STATIONARY:
+            if (x, y) in self.receiver_grid:
+                return ('receiver', 1, x, y, 0)
+            return ('loop', 0, x, y, 1)
+        outcome = self.outcomes.get((x, y, code))
+        if outcome is None:
+            outcome = self.resolve((x, y, code))
+        return outcome
+
+
+    def path(self, x: int, y: int, direction: str | None, duration: int) -> list[tuple[int, int, str, int]]:
+        '''
+        Returns the straight moves a photon starting at (x, y) and travelling
+        in direction makes in its first duration nanoseconds, or until its
+        path ends if that is sooner, as the (x, y, direction, length) that
+        BoardDisplayer.add_path_to_board draws. A photon without a valid
+        direction never moves.
+
+        Parameters
+        ----------
+        x         - the x position of the photon
+        y         - the y position of the photon
+        direction - the direction of the photon
+        duration  - the most nanoseconds of the path to return
+
+        Example
+        -------
+        >>> compiled.path(0, 0, 'E', 10)
+        [(0, 0, 'E', 3), (3, 0, 'S', 2)]
+        '''
+        state = (x, y, encode_direction(direction))
+        moves = []
+        if state[2] == STATIONARY:
+            return moves
+        while duration > 0:
+            successor, result = self.get_successor(state)
+            if successor is None:
+                distance = abs(result[2] - state[0]) + abs(result[3] - state[1])
+            else:
+                distance = result
+            if distance > 0:
+                moves.append((state[0], state[1], DIRECTIONS[state[2]], min(distance, duration)))
+            duration -= distance
+            if successor is None:
+                break
+            state = successor
+        return moves
+
+
+    def find_trap(self, x: int, y: int, direction: str | None) -> tuple[int, int, tuple[int, int, int]]:
+        '''
+        Returns when LaserCircuit's trap detection finds a photon starting at
+        (x, y) in direction to be trapped, the loop period it reports and the
+        (x, y, direction code) the photon is in at that time. The photon's
+        outcome must be a loop. This follows the same checkpoint
+        rule as TrapDetector over the photon's mirror reflections, jumping
+        from mirror to mirror, and is stored for later calls.
+
+        Parameters
+        ----------
+        x         - the x position of the photon
+        y         - the y position of the photon
+        direction - the direction of the photon
+        '''
+        code = encode_direction(direction)
+        if code == STATIONARY:
+            return (1, 1, (x, y, code))
+        start = (x, y, code)
+        trap = self.trap_times.get(start)
+        if trap is not None:
+            return trap
+
+        state = start
+        time = 0
+        checkpoint = None
+        reflections_since = 0
+        reflection_limit = 1
+        while trap is None:
+            state, distance = self.get_successor(state)
+            time += distance
+            if (state[0], state[1]) not in self.mirrors:
+                continue
+            if checkpoint is None:
+                checkpoint = (state, time)
+            elif checkpoint[0] == state:
+                trap = (time, time - checkpoint[1], state)
+            else:
+                reflections_since += 1
+                if reflections_since == reflection_limit:
+                    checkpoint = (state, time)
+                    reflections_since = 0
+                    reflection_limit *= 2
+        self.trap_times[start] = trap
+        return trap
+
+
+    def reachable_receivers(self, symbol: str) -> dict[str, str]:
+        '''
+        Returns which receiver the photon of the emitter with the given symbol
+        reaches for each direction it could be emitted in, leaving out the
+        directions that do not reach a receiver.
+
+        Parameters
+        ----------
+        symbol - the symbol of the emitter
+
+        Example
+        -------
+        >>> compiled.reachable_receivers('A')
+        {'E': 'R0', 'S': 'R3'}
+        '''
+        reachable = {}
+        for emitter_symbol, x, y, frequency, direction in self.emitters:
+            if emitter_symbol != symbol:
+                continue
+            for direction in ('N', 'E', 'S', 'W'):
+                kind, time, end_x, end_y, period = self.trace(x, y, direction)
+                if kind == 'receiver':
+                    reachable[direction] = self.receiver_grid[(end_x, end_y)]
+        return reachable
+
+
+    def run(self, pulse_sequence: dict[str, tuple[int, str]] | None = None) -> CircuitResult:
+        '''
+        Works out the results of running the circuit from the outcome of each
+        emitter's photon, without simulating it. The results are the same as
+        those LaserCircuit.run_circuit returns with trap detection on.
+
+        Parameters
+        ----------
+        pulse_sequence - the frequency and direction to set each emitter to,
+                         by symbol. Emitters left out keep the pulse sequence
+                         they had when the circuit was compiled.
+
+        Returns
+        -------
+        The results of running the circuit.
+        '''
+        receivers = {(x, y): Receiver(symbol, x, y) for symbol, x, y in self.receivers}
+        emit_photons = []
+        hits = []
+        clock = 0
+        trapped_photons = 0
+        index = 0
+        while index < len(self.emitters):
+            symbol, x, y, frequency, direction = self.emitters[index]
+            if pulse_sequence is not None and symbol in pulse_sequence:
+                frequency, direction = pulse_sequence[symbol]
+            name = DIRECTION_NAMES[encode_direction(direction)]
+            emit_photons.append(f'{symbol}: {frequency}THz, {name}')
+
+            kind, time, end_x, end_y, period = self.trace(x, y, direction)
+            if kind == 'loop':
+                time, period, state = self.find_trap(x, y, direction)
+                trapped_photons += 1
+            elif kind == 'receiver':
+                hits.append((time, index, end_x, end_y, frequency))
+            clock = max(clock, time)
+            index += 1
+
+        # receivers add up energy in the same order as the tick engine
+        hits.sort()
+        for time, index, x, y, frequency in hits:
+            receivers[(x, y)].absorb_photon(Photon(x, y, frequency, None), time)
+
+        by_activation_time, by_total_energy = sort_receivers_for_report(list(receivers.values()))
+        return CircuitResult(
+            clock,
+            emit_photons,
+            [(receiver.symbol, receiver.get_activation_time()) for receiver in by_activation_time],
+            [(receiver.symbol, receiver.get_total_energy(), receiver.photons_absorbed) for receiver in by_total_energy],
+            trapped_photons,
+        )
@@ -0,0 +1,70 @@
+'''
+direction - The small integer encoding of directions shared by photons,
+emitters and the engines. Photons and emitters store their direction as one of
+these codes rather than as a string, and convert to and from the usual 'N',
+'E', 'S' and 'W' in their direction property and getters.
+
+A photon or emitter without a valid direction (for example an emitter whose
+pulse sequence has not been set) has the code STATIONARY, which decodes to
+None.
+
+It also holds the tables that photons move and reflect by: how far one step
+in each direction goes, and the direction a photon leaves each type of mirror
+in. Photon.move and Mirror.reflect_photon look up one photon at a time, while
+the vectorized engine turns the same tables into arrays to look up every
+photon at once, so both always agree.
+'''
+
+
+NORTH = 0
+EAST = 1
+SOUTH = 2
+WEST = 3
+STATIONARY = 4
+
+# the direction each code stands for, indexed by code
+DIRECTIONS = ('N', 'E', 'S', 'W', None)
+DIRECTION_NAMES = ('North', 'East', 'South', 'West', None)
+DIRECTION_CODES = {'N': NORTH, 'E': EAST, 'S': SOUTH, 'W': WEST}
+
+# the change in x and y of one step in each direction, indexed by code
+DELTA_X = (0, 1, 0, -1, 0)
+DELTA_Y = (-1, 0, 1, 0, 0)
+
+# the direction a photon leaves each type of mirror in, indexed by mirror
+# symbol then by the code of the direction it arrived in, ABSORB meaning the
+# photon is absorbed instead
+ABSORB = -1
+MIRROR_SYMBOLS = ('/', '\\', '>', '<', '^', 'v')
+REFLECTIONS = {
+    #      N         E         S         W         stationary
+    '/':  (EAST,     NORTH,    WEST,     SOUTH,    STATIONARY),
+    '\\': (WEST,     SOUTH,    EAST,     NORTH,    STATIONARY),
+    '>':  (EAST,     ABSORB,   EAST,     ABSORB,   STATIONARY),
+    '<':  (WEST,     ABSORB,   WEST,     ABSORB,   STATIONARY),
+    '^':  (ABSORB,   NORTH,    ABSORB,   NORTH,    STATIONARY),
+    'v':  (ABSORB,   SOUTH,    ABSORB,   SOUTH,    STATIONARY),
+}
+
+
+def encode_direction(direction: str | None) -> int:
+    '''
+    Returns the code of a direction, or STATIONARY if direction is not 'N',
+    'E', 'S' or 'W'.
+
+    Parameters
+    ----------
+    direction - the direction to encode
+    '''
+    return DIRECTION_CODES.get(direction, STATIONARY)
+
+
+def decode_direction(code: int) -> str | None:
+    '''
+    Returns the direction a code stands for, or None for STATIONARY.
+
+    Parameters
+    ----------
+    code - the code to decode
+    '''
+    return DIRECTIONS[code]
@@ -1,4 +1,6 @@
 from photon import Photon
+from direction import DIRECTION_NAMES, encode_direction, decode_direction
+from symbols import symbol_key
 
 '''
 Emitter - A laser that emits a photon with a frequency and direction.
@@ -7,26 +9,37 @@ pulse  sequence.
 
 You are free to add more attributes and methods, as long as you aren't 
 modifying the existing scaffold.
+
+Emitters use __slots__, share component_type through the class and store their
+direction as a code from the direction module, like photons do.
 '''
 
 
 class Emitter:
 
 
+    __slots__ = ('x', 'y', 'symbol', 'frequency', 'direction_code', 'pulse_sequence_set')
+    component_type = 'emitter'
+
+
     def __init__(self, symbol: str, x: int, y: int):
         '''
         Initialises an Emitter instance given a symbol, x and y value. 
         component_type is 'emitter', frequency is 0 and direction is None by 
         default.
 
-        component_type:     str  - represents the type of component ('emitter')
-        symbol:             str  - the symbol of this emitter ('A' to 'J')
+        component_type:     str  - represents the type of component ('emitter'),
+                                   shared by every emitter
+        symbol:             str  - the symbol of this emitter ('A' to 'J',
+                                   or 'E' followed by a number, see the
+                                   symbols module)
         x:                  int  - x position of this emitter
         y:                  int  - y position of this emitter
         frequency:          int  - the frequency (THz) of the photon this emitter 
                                    emits
-        direction:          str  - the direction in which the photon this emitter 
-                                   emits will travel ('N', 'E', 'S' or 'W')
+        direction_code:     int  - the code of the direction in which the
+                                   photon this emitter emits will travel (see
+                                   the direction module)
         pulse_sequence_set: bool - whether or not this emitter has been set by
                                    the pulse sequence
 
@@ -39,9 +52,8 @@ class Emitter:
         self.x = x
         self.y = y 
         self.symbol = symbol
-        self.component_type = 'emitter'
         self.frequency = 0
-        self.direction = None
+        self.direction_code = encode_direction(None)
         self.pulse_sequence_set = False
 
 
@@ -94,10 +106,22 @@ class Emitter:
         return self.frequency
 
 
+    @property
+    def direction(self) -> str | None:
+        '''Returns direction, decoded from direction_code.'''
+        return decode_direction(self.direction_code)
+
+
+    @direction.setter
+    def direction(self, direction: str | None) -> None:
+        '''Sets direction_code to the code of direction.'''
+        self.direction_code = encode_direction(direction)
+
+
     def get_direction(self) -> str:
         # only requires implementation once you reach RUN-MY-CIRCUIT
         '''Returns direction.'''
-        return self.direction
+        return decode_direction(self.direction_code)
 
 
     def get_component_type(self) -> str:
@@ -109,6 +133,11 @@ class Emitter:
         '''Returns symbol.'''
         return self.symbol
 
+
+    def get_symbol_key(self) -> tuple[str, int]:
+        '''Returns the key emitters are sorted by symbol with (see symbols).'''
+        return symbol_key(self.symbol)
+
     
     def get_x(self) -> int:
         '''Returns x.'''
@@ -143,14 +172,5 @@ class Emitter:
         >>> print(self)
         C: 256THz, South
         '''
-        if self.direction == 'N':
-            direction_name = 'North'
-        elif self.direction == 'E':
-            direction_name = 'East' 
-        elif self.direction == 'S':
-            direction_name = 'South'
-        elif self.direction == 'W':
-            direction_name = 'West'
-        else:
-            direction_name = self.direction
+        direction_name = DIRECTION_NAMES[self.direction_code]
         return f'{self.symbol}: {self.frequency}THz, {direction_name}'
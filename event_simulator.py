@@ -0,0 +1,129 @@
+from heapq import heappush, heappop
+
+'''
+event_simulator - An alternate engine for running a LaserCircuit which only
+does work when a photon reaches a component or leaves the board.
+
+Rather than moving each photon one cell per tick, the simulator uses the
+circuit's row and column indexes to find the next component in a photon's
+direction of travel and schedules the photon's arrival there on a priority
+queue keyed by arrival time. Events are processed in order of (time, photon)
+which is the same order the tick engine handles them, so activation times and
+energies are identical. The cost of a run grows with the number of
+interactions rather than with the size of the board.
+'''
+
+
+class EventSimulator:
+
+
+    def __init__(self, circuit, trails: bool = True):
+        '''
+        Initialises an EventSimulator instance given the circuit to run.
+
+        circuit: LaserCircuit                   - the circuit this simulator
+                                                  runs
+        trails:  bool                           - whether the path of each
+                                                  photon is drawn on the
+                                                  circuit's board displayer
+        events:  list[tuple[int, int, int, int, str]]
+                                                - priority queue of pending
+                                                  events, each being
+                                                  (time, photon index, x, y,
+                                                  kind) where kind is
+                                                  'arrive', 'leave' or 'stall'
+
+        Parameters
+        ----------
+        circuit - the circuit to run
+        trails  - whether to draw photon paths on the board
+        '''
+        self.circuit = circuit
+        self.trails = trails
+        self.events = []
+
+
+    def schedule(self, index: int, time: int) -> None:
+        '''
+        Schedules the next event for the photon at the given index in the
+        circuit's photons, given that it is at its current position at time.
+        The event is either reaching the next component in its direction of
+        travel, or moving off the edge of the board.
+
+        Photons without a direction never move, but still interact with the
+        component they are on during the next tick, so they get a single
+        'stall' event.
+
+        Parameters
+        ----------
+        index - the index of the photon in the circuit's photons
+        time  - the time (ns) at which the photon is at its current position
+        '''
+        circuit = self.circuit
+        photon = circuit.photons[index]
+        direction = photon.direction
+        target = circuit.find_next_component(photon.x, photon.y, direction)
+
+        if target is not None:
+            distance = abs(target[0] - photon.x) + abs(target[1] - photon.y)
+            heappush(self.events, (time + distance, index, target[0], target[1], 'arrive'))
+            return
+
+        # no component ahead, the photon walks to the edge and is absorbed
+        # on the tick it would step off the board
+        if direction == 'E':
+            edge = (circuit.width - 1, photon.y)
+        elif direction == 'W':
+            edge = (0, photon.y)
+        elif direction == 'S':
+            edge = (photon.x, circuit.height - 1)
+        elif direction == 'N':
+            edge = (photon.x, 0)
+        else:
+            heappush(self.events, (time + 1, index, photon.x, photon.y, 'stall'))
+            return
+        distance = abs(edge[0] - photon.x) + abs(edge[1] - photon.y)
+        heappush(self.events, (time + distance + 1, index, edge[0], edge[1], 'leave'))
+
+
+    def run(self) -> None:
+        '''
+        Runs every photon in the circuit that has not been absorbed until it
+        is absorbed. When finished, the circuit's clock is set to the time of
+        the last absorption and each photon and receiver is left in the same
+        state as after running the circuit with tick.
+        '''
+        circuit = self.circuit
+        index = 0
+        while index < len(circuit.photons):
+            if not circuit.photons[index].is_absorbed():
+                self.schedule(index, circuit.clock)
+            index += 1
+
+        while self.events:
+            time, index, x, y, kind = heappop(self.events)
+            photon = circuit.photons[index]
+            if self.trails:
+                distance = abs(x - photon.x) + abs(y - photon.y)
+                circuit.board_displayer.add_path_to_board(photon.x, photon.y, photon.direction, distance)
+
+            photon.x = x
+            photon.y = y
+            circuit.clock = time
+
+            # a photon that leaves the board is moved back onto the edge and
+            # one that stalls stays where it is, and both are drawn again
+            if self.trails and kind != 'arrive':
+                circuit.board_displayer.add_photon_to_board(photon)
+
+            if kind == 'leave':
+                photon.got_absorbed()
+                continue
+
+            component = circuit.get_collided_component(photon)
+            if component is not None:
+                photon.interact_with_component(component, time)
+            if circuit.trap_detection:
+                circuit.check_for_trap(photon, component)
+            if not photon.is_absorbed() and kind == 'arrive':
+                self.schedule(index, time)
@@ -1,6 +1,8 @@
 from emitter import Emitter
 from receiver import Receiver
 from mirror import Mirror
+from direction import MIRROR_SYMBOLS
+from symbols import is_emitter_symbol, is_receiver_symbol
 
 '''
 input_parser - A module that parses the inputs of the program. 
@@ -11,9 +13,17 @@ should be using functions from this module to validate it.
 
 You are free to add more functions, as long as you aren't modifying the
 existing scaffold.
+
+Symbols are validated with set lookups and the precompiled patterns of the
+symbols module. check_lines runs a check over many lines at once, which is
+how large inputs should be validated.
 '''
 
 
+MIRROR_SYMBOL_SET = frozenset(MIRROR_SYMBOLS)
+DIRECTION_SET = frozenset('NESW')
+
+
 def parse_size(user_input: str) -> tuple[int, int] | None:
     # only requires implementation once you reach GET-MY-INPUTS
     '''
@@ -49,33 +59,79 @@ def parse_size(user_input: str) -> tuple[int, int] | None:
     >>> size
     (18, 6)
     '''
+    result, error = check_size(user_input)
+    if error is not None:
+        print(error)
+    return result
+
+
+def check_size(user_input: str) -> tuple[tuple[int, int] | None, str | None]:
+    '''
+    Performs the same checks as parse_size without printing anything.
+
+    Parameters
+    ----------
+    user_input - the input to check
+
+    Returns
+    -------
+    A tuple of what parse_size would return and the error message it would
+    print, or None if all checks pass.
+    '''
     parts = user_input.split()
     if len(parts) != 2:
-        print('Error: <width> <height>')
-        return None
+        return None, 'Error: <width> <height>'
 
     try:
         width = int(parts[0])
     except ValueError:
-        print('Error: width is not an integer')
-        return None
+        return None, 'Error: width is not an integer'
     
     try:
         height = int(parts[1])
     except ValueError:
-        print('Error: height is not an integer')
-        return None
+        return None, 'Error: height is not an integer'
 
     if width <= 0:
-        print('Error: width must be greater than zero')
-        return None
+        return None, 'Error: width must be greater than zero'
 
     if height <= 0:
-        print('Error: height must be greater than zero')
-        return None
+        return None, 'Error: height must be greater than zero'
+
+
+    return (width, height), None
+
+
+def get_emitter_symbol_error(symbol: str) -> str:
+    '''
+    Returns the error message for an invalid emitter symbol. A symbol that
+    looks like a numbered emitter symbol ('E' followed by more characters)
+    is reported against that rule, and any other symbol is reported as not
+    being between 'A' and 'J', as before numbered symbols existed.
+
+    Parameters
+    ----------
+    symbol - the invalid symbol
+    '''
+    if len(symbol) > 1 and symbol[0] == 'E':
+        return 'Error: symbol is not \'E\' followed by a number without leading zeros'
+    return 'Error: symbol is not between \'A\'-\'J\''
 
 
-    return (width, height)
+def get_receiver_symbol_error(symbol: str) -> str:
+    '''
+    Returns the error message for an invalid receiver symbol. A symbol that
+    starts with 'R' followed by more characters is reported against the rule
+    for receiver symbols, and any other symbol is reported as not being
+    between R0 and R9, as before numbered symbols existed.
+
+    Parameters
+    ----------
+    symbol - the invalid symbol
+    '''
+    if len(symbol) > 1 and symbol[0] == 'R':
+        return 'Error: symbol is not \'R\' followed by a number without leading zeros'
+    return 'Error: symbol is not between R0-R9'
 
 
 def parse_emitter(user_input: str) -> Emitter | None:
@@ -86,7 +142,8 @@ def parse_emitter(user_input: str) -> Emitter | None:
       1)  user_input contains exactly 3 tokens. If there are 3 tokens, we 
           interpret the first token  as symbol, the second token as x and the 
           third token as y for the remaining checks.
-      2)  symbol is a character between 'A' to 'J'. 
+      2)  symbol is a character between 'A' to 'J', or 'E' followed by a
+          number (see symbols). 
       3)  x is an integer.
       4)  y is an integer.
       5)  x is greater than 0.
@@ -103,48 +160,61 @@ def parse_emitter(user_input: str) -> Emitter | None:
     Else, if at any point a check fails, prints an error message stating the cause
     of the error and returns None, skipping any further checks.
     '''
+    result, error = check_emitter(user_input)
+    if error is not None:
+        print(error)
+    return result
+
+
+def check_emitter(user_input: str) -> tuple[Emitter | None, str | None]:
+    '''
+    Performs the same checks as parse_emitter without printing anything.
+
+    Parameters
+    ----------
+    user_input - the input to check
+
+    Returns
+    -------
+    A tuple of what parse_emitter would return and the error message it would
+    print, or None if all checks pass.
+    '''
     tokens = user_input.split()
 
     if len(tokens) != 3:
-        print('Error: <symbol> <x> <y>')
-        return None
+        return None, 'Error: <symbol> <x> <y>'
 
     symbol = tokens[0]
-    if not (symbol == 'A' or symbol == 'B' or symbol == 'C' or symbol == 'D' or symbol == 'E' 
-            or symbol == 'F' or symbol == 'G' or symbol == 'H' or symbol == 'I' or symbol == 'J'):
-            print('Error: symbol is not between \'A\'-\'J\'')
-            return None
+    if not is_emitter_symbol(symbol):
+        return None, get_emitter_symbol_error(symbol)
 
     try:
         x = int(tokens[1])
     except ValueError:
-        print('Error: x is not an integer')
-        return None
+        return None, 'Error: x is not an integer'
     
     try:
         y = int(tokens[2])
     except ValueError:
-        print('Error: y is not an integer')
-        return None
+        return None, 'Error: y is not an integer'
 
     if x < 0:
-        print('Error: x cannot be negative')
-        return None
+        return None, 'Error: x cannot be negative'
 
     if y < 0:
-        print('Error: y cannot be negative')
-        return None
+        return None, 'Error: y cannot be negative'
 
 
-    return Emitter(symbol, x, y)
+    return Emitter(symbol, x, y), None
 
 
 def parse_receiver(user_input: str) -> Receiver | None:
     # only requires implementation once you reach GET-MY-INPUTS
     '''
     Identical to parse_emitter, with the only differences being
-    that the symbol must be between 'R0' to 'R9', and that a new Receiver
-    instance is returned if all checks pass.
+    that the symbol must be 'R' followed by a number (e.g. 'R0' or 'R4567',
+    see symbols), and that a new Receiver instance is returned if all checks
+    pass.
 
     Parameters
     ----------
@@ -157,39 +227,51 @@ def parse_receiver(user_input: str) -> Receiver | None:
     Else, if at any point a check fails, prints an error message stating the cause
     of the error and returns None, skipping any further checks.    
     '''
+    result, error = check_receiver(user_input)
+    if error is not None:
+        print(error)
+    return result
+
+
+def check_receiver(user_input: str) -> tuple[Receiver | None, str | None]:
+    '''
+    Performs the same checks as parse_receiver without printing anything.
+
+    Parameters
+    ----------
+    user_input - the input to check
+
+    Returns
+    -------
+    A tuple of what parse_receiver would return and the error message it
+    would print, or None if all checks pass.
+    '''
     tokens = user_input.split()
 
     if len(tokens) != 3:
-        print('Error: <symbol> <x> <y>')
-        return None
+        return None, 'Error: <symbol> <x> <y>'
 
     symbol = tokens[0]
-    if not (symbol == 'R0' or symbol == 'R1' or symbol == 'R2' or symbol == 'R3' or symbol == 'R4' 
-            or symbol == 'R5' or symbol == 'R6' or symbol == 'R7' or symbol == 'R8' or symbol == 'R9'):
-            print('Error: symbol is not between R0-R9')
-            return None
+    if not is_receiver_symbol(symbol):
+        return None, get_receiver_symbol_error(symbol)
 
     try:
         x = int(tokens[1])
     except ValueError:
-        print('Error: x is not an integer')
-        return None
+        return None, 'Error: x is not an integer'
     
     try:
         y = int(tokens[2])
     except ValueError:
-        print('Error: y is not an integer')
-        return None
+        return None, 'Error: y is not an integer'
 
     if x < 0:
-        print('Error: x cannot be negative')
-        return None
+        return None, 'Error: x cannot be negative'
 
     if y < 0:
-        print('Error: y cannot be negative')
-        return None
+        return None, 'Error: y cannot be negative'
 
-    return Receiver(symbol, x, y)
+    return Receiver(symbol, x, y), None
 
 
 def parse_pulse_sequence(line: str) -> tuple[str, int, str] | None:
@@ -201,7 +283,8 @@ def parse_pulse_sequence(line: str) -> tuple[str, int, str] | None:
           If there are 3 tokens, we interpret the first token as symbol, the
           second token as frequency and the third token as direction for the
           remaining checks.
-      2)  symbol is a character between 'A' to 'J'.
+      2)  symbol is a character between 'A' to 'J', or 'E' followed by a
+          number (see symbols).
       3)  frequency is an integer.
       4)  frequency is greater than zero.
       5)  direction is either 'N', 'E', 'S' or 'W'.
@@ -218,34 +301,46 @@ def parse_pulse_sequence(line: str) -> tuple[str, int, str] | None:
     Else, if at any point a check fails, prints an error message stating the cause
     of the error and returns None, skipping any further checks.    
     '''
+    result, error = check_pulse_sequence(line)
+    if error is not None:
+        print(error)
+    return result
+
+
+def check_pulse_sequence(line: str) -> tuple[tuple[str, int, str] | None, str | None]:
+    '''
+    Performs the same checks as parse_pulse_sequence without printing anything.
+
+    Parameters
+    ----------
+    line - the input to check
+
+    Returns
+    -------
+    A tuple of what parse_pulse_sequence would return and the error message
+    it would print, or None if all checks pass.
+    '''
     input_line = line.split()
 
     if len(input_line) != 3:
-        print('Error: <symbol> <frequency> <direction>')
-        return None
+        return None, 'Error: <symbol> <frequency> <direction>'
 
     symbol, frequency, direction = input_line
         
-    if not (symbol == 'A' or symbol == 'B' or symbol == 'C' or symbol == 'D' or symbol == 'E' 
-        or symbol == 'F' or symbol == 'G' or symbol == 'H' or symbol == 'I' or symbol == 'J'):
-        print('Error: symbol is not between \'A\'-\'J\'')
-        return None
+    if not is_emitter_symbol(symbol):
+        return None, get_emitter_symbol_error(symbol)
 
     try:
         frequency = int(input_line[1])
         if frequency <= 0:
-            print('Error: frequency must be greater than zero')
-            return None
+            return None, 'Error: frequency must be greater than zero'
     except ValueError:
-        print('Error: frequency is not an integer')
-        return None
+        return None, 'Error: frequency is not an integer'
     
-    if not (direction == 'N' or direction == 'E' or direction == 'S' or direction == 'W'):
-        print('Error: direction must be \'N\', \'E\', \'S\' or \'W\'')
-        return None
+    if direction not in DIRECTION_SET:
+        return None, 'Error: direction must be \'N\', \'E\', \'S\' or \'W\''
 
-    return (symbol, frequency, direction)
-    
+    return (symbol, frequency, direction), None
 
 
 def parse_mirror(user_input: str) -> Mirror | None:
@@ -273,37 +368,84 @@ def parse_mirror(user_input: str) -> Mirror | None:
     Else, if at any point a check fails, prints an error message stating the cause
     of the error and returns None, skipping any further checks.    
     '''
+    result, error = check_mirror(user_input)
+    if error is not None:
+        print(error)
+    return result
+
+
+def check_mirror(user_input: str) -> tuple[Mirror | None, str | None]:
+    '''
+    Performs the same checks as parse_mirror without printing anything.
+
+    Parameters
+    ----------
+    user_input - the input to check
+
+    Returns
+    -------
+    A tuple of what parse_mirror would return and the error message it would
+    print, or None if all checks pass.
+    '''
     tokens = user_input.split()
 
     if len(tokens) != 3:
-        print('Error: <symbol> <x> <y>')
-        return None
+        return None, 'Error: <symbol> <x> <y>'
 
     symbol = tokens[0]
-    if not (symbol == '/' or symbol == '\\' or symbol == '>' or symbol == '<' or symbol == '^' 
-            or symbol == 'v'):
-            print("Error: symbol must be '/', '\\', '>', '<', '^' or 'v'")
-            return None
+    if symbol not in MIRROR_SYMBOL_SET:
+        return None, "Error: symbol must be '/', '\\', '>', '<', '^' or 'v'"
             
     try:
         x = int(tokens[1])
     except ValueError:
-        print('Error: x is not an integer')
-        return None
+        return None, 'Error: x is not an integer'
     
     try:
         y = int(tokens[2])
     except ValueError:
-        print('Error: y is not an integer')
-        return None
+        return None, 'Error: y is not an integer'
 
     if x < 0:
-        print('Error: x cannot be negative')
-        return None
+        return None, 'Error: x cannot be negative'
 
     if y < 0:
-        print('Error: y cannot be negative')
-        return None
+        return None, 'Error: y cannot be negative'
+
+    return Mirror(symbol, x, y), None
+
 
-    return Mirror(symbol, x, y)
+def check_lines(check, lines, first_line: int = 1) -> tuple[list[tuple[int, object]], list[tuple[int, str]]]:
+    '''
+    Runs one of the check functions over many lines at once, without printing
+    anything.
+
+    Parameters
+    ----------
+    check      - the check to run, e.g. check_mirror
+    lines      - an iterable of the lines to check, e.g. a file object
+    first_line - the number of the first line
+
+    Returns
+    -------
+    A tuple (results, errors). results holds a (line number, result) for
+    each line that passes, and errors holds a (line number, error message)
+    for each line that does not, both in the order of the lines.
+
+    Example
+    -------
+    >>> check_lines(check_mirror, ['/ 1 2', 'x 1 2'])
+    ([(1, <mirror.Mirror object at ...>)], [(2, "Error: symbol must be '/', '\\', '>', '<', '^' or 'v'")])
+    '''
+    results = []
+    errors = []
+    line_number = first_line
+    for line in lines:
+        result, error = check(line)
+        if error is None:
+            results.append((line_number, result))
+        else:
+            errors.append((line_number, error))
+        line_number += 1
+    return results, errors
 
@@ -1,10 +1,21 @@
+import os
+from bisect import bisect_left, bisect_right, insort
 from sorter import *
 from emitter import Emitter
 from receiver import Receiver
 from photon import Photon
 from mirror import Mirror
 from board_displayer import BoardDisplayer
+from sparse_board_displayer import SparseBoardDisplayer, SPARSE_THRESHOLD
+from vectorized_engine import VectorizedEngine
+from event_simulator import EventSimulator
+from parallel_runner import ParallelRunner
+from trap_detector import TrapDetector
+from circuit_result import CircuitResult
+from compiled_circuit import CompiledCircuit
+from path_tracker import PathTracker
 from input_parser import *
+from direction import STATIONARY, DIRECTIONS, DELTA_X, DELTA_Y
 
 '''
 LaserCircuit - Responsible for storing all the components of the circuit and
@@ -25,19 +36,78 @@ class LaserCircuit:
         '''        
         Initialise a LaserCircuit instance given a width and height. All 
         lists of components and photons are empty by default.
-        board_displayer is initialised to a BoardDisplayer instance. clock is
-        0 by default.
+        board_displayer is initialised to a BoardDisplayer instance, or a
+        SparseBoardDisplayer instance for boards with more than
+        SPARSE_THRESHOLD cells. clock is 0 by default.
 
         emitters:        list[Emitter]  - all emitters in this circuit
         receivers:       list[Receiver] - all receivers in this circuit
-        photons:         list[Photon]   - all photons in this circuit
+        photons:         list[Photon]   - all photons in this circuit,
+                                          absorbed or not, in the order they
+                                          were added
+        active_photons:  list[Photon]   - the photons that tick still has to
+                                          move, in the order they were added
+        unchecked_photon_count:
+                         int            - how many photons at the end of
+                                          active_photons have been added since
+                                          the last tick
+        exit_time:       int            - the time the last photon retired by
+                                          retire_exiting_photon reaches the
+                                          edge of the board and is absorbed
+        exit_trails:     list[tuple[int, int, int, int, int]]
+                                        - the x, y, direction code, time and
+                                          distance to the edge of each retired
+                                          photon whose trail is not yet fully
+                                          drawn on the board
         mirrors:         list[Mirror]   - all mirrors in this circuit
         width:           int            - the width of this circuit board
         height:          int            - the height of this circuit board
-        board_displayer: BoardDisplayer - helper class for storing and 
+        board_displayer: BoardDisplayer | SparseBoardDisplayer
+                                        - helper class for storing and 
                                           displaying the circuit board
         clock:           int            - a clock keeping track of how many 
                                           nanoseconds this circuit has run for
+        emitter_grid:    dict[tuple[int, int], Emitter]
+                                        - position index of the emitters,
+                                          keyed by (x, y)
+        receiver_grid:   dict[tuple[int, int], Receiver]
+                                        - position index of the receivers,
+                                          keyed by (x, y)
+        mirror_grid:     dict[tuple[int, int], Mirror]
+                                        - position index of the mirrors,
+                                          keyed by (x, y)
+        emitter_symbols: dict[str, Emitter]
+                                        - symbol index of the emitters
+        receiver_symbols:
+                         dict[str, Receiver]
+                                        - symbol index of the receivers
+        live_photon_count:
+                         int            - the number of photons in this
+                                          circuit that have not been absorbed
+        activated_receiver_count:
+                         int            - the number of receivers in this
+                                          circuit that are activated
+        trails:          bool           - whether photons draw their path on
+                                          the board as they move (True by
+                                          default)
+        trap_detection:  bool           - whether photons stuck in a loop are
+                                          detected and stopped (True by
+                                          default)
+        trap_detector:   TrapDetector   - keeps track of trapped photons
+        photon_starts:   list[tuple[int, int, int, int]]
+                                        - the x, y, direction code and clock
+                                          each photon was added with
+        path_tracker:    PathTracker | None
+                                        - keeps this circuit's finished state
+                                          up to date as its layout is edited,
+                                          once track_paths has been called
+                                          (None by default)
+        row_index:       dict[int, list[int]]
+                                        - sorted x positions of the components
+                                          in each row, keyed by y
+        column_index:    dict[int, list[int]]
+                                        - sorted y positions of the components
+                                          in each column, keyed by x
 
         Parameters
         ----------
@@ -47,11 +117,32 @@ class LaserCircuit:
         self.clock = 0
         self.width = width
         self.height = height 
-        self.board_displayer = BoardDisplayer(width, height)
+        if width * height > SPARSE_THRESHOLD:
+            self.board_displayer = SparseBoardDisplayer(width, height)
+        else:
+            self.board_displayer = BoardDisplayer(width, height)
         self.emitters = [] 
         self.receivers = [] 
         self.mirrors = []
         self.photons = []
+        self.active_photons = []
+        self.unchecked_photon_count = 0
+        self.exit_time = 0
+        self.exit_trails = []
+        self.emitter_grid = {}
+        self.receiver_grid = {}
+        self.mirror_grid = {}
+        self.emitter_symbols = {}
+        self.receiver_symbols = {}
+        self.row_index = {}
+        self.column_index = {}
+        self.live_photon_count = 0
+        self.activated_receiver_count = 0
+        self.trails = True
+        self.trap_detection = True
+        self.trap_detector = TrapDetector()
+        self.photon_starts = []
+        self.path_tracker = None
 
 
     def emit_photons(self) -> None:
@@ -64,7 +155,7 @@ class LaserCircuit:
         while index < len(self.emitters):
             emitter = self.emitters[index]
             new_photon = emitter.emit_photon()
-            self.photons.append(new_photon)
+            self.add_photon(new_photon)
             index += 1
 
 
@@ -73,21 +164,27 @@ class LaserCircuit:
         '''
         Returns whether or not this circuit has finished running. The
         circuit is finished running if every photon in the circuit has been
-        absorbed.
+        absorbed, and the clock has reached the time the photons retired by
+        retire_exiting_photon would have been absorbed at.
 
         Returns
         -------
         True if the circuit has finished running or not, else False.
         '''
-        index = 0
-        while index < len(self.photons):
-            if not self.photons[index].is_absorbed():
-                return False
-            index += 1
-        return True
+        return self.live_photon_count == 0 and self.clock >= self.exit_time
+
 
+    def count_absorbed_photon(self) -> None:
+        '''Updates the count of live photons when a photon gets absorbed.'''
+        self.live_photon_count -= 1
 
-    def print_emit_photons(self) -> None:
+
+    def count_activated_receiver(self) -> None:
+        '''Updates the count of activated receivers when a receiver activates.'''
+        self.activated_receiver_count += 1
+
+
+    def print_emit_photons(self, output_dir: str | None = '/home/output') -> None:
         # only requires implementation once you reach RUN-MY-CIRCUIT
         '''
         Prints the output for each emitter emitting a photon.
@@ -96,20 +193,29 @@ class LaserCircuit:
         /home/output/emit_photons.out output file. 
         
         You can assume the /home/output/ path exists.
+
+        Parameters
+        ----------
+        output_dir - the directory to write the output file into, or None to
+                     only print the output
         '''
-        with open('/home/output/emit_photons.out', 'w') as file:
-            index = 0
-            while index < len(self.emitters):
-                emitter_str = str(self.emitters[index])
-                file.write(emitter_str + '\n')
-                print(emitter_str)
-                index += 1
+        output = ''
+        index = 0
+        while index < len(self.emitters):
+            emitter_str = str(self.emitters[index])
+            output += emitter_str + '\n'
+            print(emitter_str)
+            index += 1
+
+        if output_dir is not None:
+            with open(os.path.join(output_dir, 'emit_photons.out'), 'w') as file:
+                file.write(output)
             
         self.emit_photons()
 
 
 
-    def print_activation_times(self) -> None:
+    def print_activation_times(self, output_dir: str | None = '/home/output') -> None:
         # only requires implementation once you reach RUN-MY-CIRCUIT
         '''
         Prints the output for the activation times for each receiver, sorted
@@ -120,6 +226,11 @@ class LaserCircuit:
         /home/output/activation_times.out output file.
 
         You can assume the /home/output/ path exists.
+
+        Parameters
+        ----------
+        output_dir - the directory to write the output file into, or None to
+                     only print the output
         '''
         activated_receivers = []
         i = 0
@@ -130,18 +241,22 @@ class LaserCircuit:
         
         sorted_receivers = sort_receivers_by_activation_time(activated_receivers)
         
-        with open('/home/output/activation_times.out','w') as file:
-            i = 0
-            while i < len(sorted_receivers):
-                receiver = sorted_receivers[i]
-                output_line = f"{receiver.symbol}: {receiver.get_activation_time()}ns\n"
-                print(output_line.strip())
-                file.write(output_line)
-                i += 1
+        output = ''
+        i = 0
+        while i < len(sorted_receivers):
+            receiver = sorted_receivers[i]
+            output_line = f"{receiver.symbol}: {receiver.get_activation_time()}ns\n"
+            print(output_line.strip())
+            output += output_line
+            i += 1
+
+        if output_dir is not None:
+            with open(os.path.join(output_dir, 'activation_times.out'),'w') as file:
+                file.write(output)
 
 
 
-    def print_total_energy(self) -> None:
+    def print_total_energy(self, output_dir: str | None = '/home/output') -> None:
         # only requires implementation once you reach RUN-MY-CIRCUIT
         '''
         Prints the output for the total energy absorbed for each receiver,
@@ -152,6 +267,11 @@ class LaserCircuit:
         /home/output/total_energy_absorbed.out output file.
 
         You can assume the /home/output/ path exists.
+
+        Parameters
+        ----------
+        output_dir - the directory to write the output file into, or None to
+                     only print the output
         '''
         activated_receivers = []
         i = 0
@@ -162,22 +282,90 @@ class LaserCircuit:
 
         sorted_receivers = sort_receivers_by_total_energy(activated_receivers)
 
-        with open('/home/output/total_energy.out','w') as file:
-            i = 0
-            while i < len(sorted_receivers):
-                receiver = sorted_receivers[i]
-                output_line = str(receiver)+'\n'
-                print(output_line.strip())
-                file.write(output_line)
-                i += 1
+        output = ''
+        i = 0
+        while i < len(sorted_receivers):
+            receiver = sorted_receivers[i]
+            output_line = str(receiver)+'\n'
+            print(output_line.strip())
+            output += output_line
+            i += 1
+
+        if output_dir is not None:
+            with open(os.path.join(output_dir, 'total_energy.out'),'w') as file:
+                file.write(output)
+
+
+    def get_result(self) -> CircuitResult:
+        '''
+        Returns the results of running this circuit, holding the same values
+        that print_emit_photons, print_activation_times and print_total_energy
+        output.
+        '''
+        by_activation_time, by_total_energy = sort_receivers_for_report(self.receivers)
+        return CircuitResult(
+            self.clock,
+            [str(emitter) for emitter in self.emitters],
+            [(receiver.symbol, receiver.get_activation_time()) for receiver in by_activation_time],
+            [(receiver.symbol, receiver.get_total_energy(), receiver.photons_absorbed) for receiver in by_total_energy],
+            len(self.trap_detector.get_traps()),
+        )
+
+
+    def compile(self, resolve_all: bool = True) -> CompiledCircuit:
+        '''
+        Compiles the layout of this circuit into the outcome of every photon
+        that could travel through it, so it can be run with any pulse sequence
+        or queried without simulating it. The compiled circuit is a snapshot:
+        components added afterwards are not part of it.
+
+        Parameters
+        ----------
+        resolve_all - whether to compile the outcome of every state now, or
+                      only when a photon first reaches it
+
+        Returns
+        -------
+        The compiled circuit.
+        '''
+        return CompiledCircuit(
+            self.width,
+            self.height,
+            [(emitter.symbol, emitter.x, emitter.y, emitter.frequency, emitter.direction) for emitter in self.emitters],
+            [(receiver.symbol, receiver.x, receiver.y) for receiver in self.receivers],
+            [(mirror.symbol, mirror.x, mirror.y) for mirror in self.mirrors],
+            resolve_all,
+        )
 
 
     
     def print_board(self) -> None:
-        '''Calls the print_board method in board_displayer.'''
+        '''
+        Calls the print_board method in board_displayer, after drawing the
+        trails of retired photons up to the current clock.
+        '''
+        self.paint_exit_trails()
         self.board_displayer.print_board()
 
 
+    def print_region(self, x: int, y: int, width: int, height: int) -> None:
+        '''
+        Prints the region of the board width cells wide and height cells high
+        with its top left cell at (x, y), with a border around it, after
+        drawing the trails of retired photons up to the current clock. The
+        region is clipped to the board.
+
+        Parameters
+        ----------
+        x      - the x position of the left column of the region
+        y      - the y position of the top row of the region
+        width  - the width of the region
+        height - the height of the region
+        '''
+        self.paint_exit_trails()
+        print(self.board_displayer.render_region(x, y, width, height), end='')
+
+
     def get_collided_emitter(self, entity: Emitter | Receiver | Photon | Mirror | None) -> Emitter | None:
         '''
         Takes in one argument entity which is either a component or a photon
@@ -196,13 +384,7 @@ class LaserCircuit:
         -------
         An emitter if it has the same position as entity, else None.
         '''
-        i = 0
-        while i < len(self.emitters):
-            emitter = self.emitters[i]
-            if entity.x == emitter.x and entity.y == emitter.y:
-                return emitter
-            i += 1
-        return None
+        return self.emitter_grid.get((entity.x, entity.y))
 
 
 
@@ -224,13 +406,7 @@ class LaserCircuit:
         -------
         A receiver if it has the same position as entity, else None.
         '''
-        i = 0
-        while i < len(self.receivers):
-            receiver = self.receivers[i]
-            if entity.x == receiver.x and entity.y == receiver.y:
-                return receiver
-            i += 1
-        return None
+        return self.receiver_grid.get((entity.x, entity.y))
 
 
     def get_collided_mirror(self, entity: Emitter | Receiver | Photon | Mirror | None) -> Mirror | None:
@@ -251,13 +427,7 @@ class LaserCircuit:
         -------
         A mirror if it has the same position as entity, else None.
         '''
-        i = 0
-        while i < len(self.mirrors):
-            mirror = self.mirrors[i]
-            if entity.x == mirror.x and entity.y == mirror.y:
-                return mirror
-            i += 1
-        return None
+        return self.mirror_grid.get((entity.x, entity.y))
 
 
     def get_collided_component(self, photon: Photon) -> Emitter | Receiver | Mirror | None:
@@ -295,14 +465,173 @@ class LaserCircuit:
 
         return None
 
+    def index_component_lines(self, component: Emitter | Receiver | Mirror) -> None:
+        '''
+        Adds the position of component into the row and column indexes, 
+        keeping each row and column sorted.
+
+        Parameters
+        ----------
+        component - the component that was added into this circuit
+        '''
+        insort(self.row_index.setdefault(component.y, []), component.x)
+        insort(self.column_index.setdefault(component.x, []), component.y)
+
+
+    def unindex_component_lines(self, component: Emitter | Receiver | Mirror) -> None:
+        '''
+        Removes the position of component from the row and column indexes.
+
+        Parameters
+        ----------
+        component - the component that was removed from this circuit
+        '''
+        row = self.row_index[component.y]
+        del row[bisect_left(row, component.x)]
+        column = self.column_index[component.x]
+        del column[bisect_left(column, component.y)]
+
+
+    def find_next_component(self, x: int, y: int, direction: str) -> tuple[int, int] | None:
+        '''
+        Finds the closest position holding a component when travelling from
+        (x, y) in the given direction, not including (x, y) itself.
+
+        Parameters
+        ----------
+        x         - the x position to start from
+        y         - the y position to start from
+        direction - the direction of travel ('N', 'E', 'S' or 'W')
+
+        Returns
+        -------
+        The (x, y) position of the next component in that direction, or None
+        if there is no component before the edge of the board.
+        '''
+        if direction == 'E' or direction == 'W':
+            line = self.row_index.get(y)
+            if line is None:
+                return None
+            if direction == 'E':
+                i = bisect_right(line, x)
+                return (line[i], y) if i < len(line) else None
+            i = bisect_left(line, x) - 1
+            return (line[i], y) if i >= 0 else None
+
+        if direction == 'N' or direction == 'S':
+            line = self.column_index.get(x)
+            if line is None:
+                return None
+            if direction == 'S':
+                i = bisect_right(line, y)
+                return (x, line[i]) if i < len(line) else None
+            i = bisect_left(line, y) - 1
+            return (x, line[i]) if i >= 0 else None
+
+        return None
+
+
+    def count_activated_receivers(self) -> int:
+        '''Returns the number of receivers in this circuit that are activated.'''
+        return self.activated_receiver_count
+
+
+    def check_for_trap(self, photon: Photon, component: Emitter | Receiver | Mirror | None) -> None:
+        '''
+        Checks whether photon is stuck in a loop after it has moved and
+        interacted with component at the current clock. If it is, the photon
+        is stopped and recorded in trap_detector.
+
+        A photon without a valid direction never moves, so it is trapped in
+        a loop with a period of 1ns. Otherwise, a photon can only loop by
+        reflecting off mirrors, so only reflections are checked.
+
+        Parameters
+        ----------
+        photon    - the photon that has just moved
+        component - the component the photon collided with, or None
+        '''
+        if photon.is_absorbed():
+            return
+
+        direction = photon.get_direction()
+        if not (direction == 'N' or direction == 'E' or direction == 'S' or direction == 'W'):
+            self.trap_detector.add_trap(photon, self.clock, 1)
+            return
+
+        if component is None or component.get_component_type() != 'mirror':
+            return
+
+        period = self.trap_detector.visit(photon, (photon.x, photon.y, direction), self.clock)
+        if period is not None:
+            self.trap_detector.add_trap(photon, self.clock, period)
+
+
+    def find_loop_mirrors(self, x: int, y: int, direction: str, period: int) -> list[Mirror]:
+        '''
+        Follows a loop of the given period starting at (x, y) in direction,
+        and returns the mirrors the loop reflects off in the order they are
+        reached, ending with the mirror at (x, y).
+
+        Parameters
+        ----------
+        x         - the x position of a mirror on the loop
+        y         - the y position of a mirror on the loop
+        direction - the direction of travel after reflecting off that mirror
+        period    - the length (ns) of the loop
+
+        Returns
+        -------
+        The mirrors that make up the loop. Empty if the loop has no mirrors.
+        '''
+        mirrors = []
+        probe = Photon(x, y, 0, direction)
+        elapsed = 0
+        while elapsed < period:
+            target = self.find_next_component(probe.x, probe.y, probe.direction)
+            if target is None:
+                break
+            elapsed += abs(target[0] - probe.x) + abs(target[1] - probe.y)
+            probe.x, probe.y = target
+            component = self.get_collided_component(probe)
+            if component.get_component_type() == 'mirror':
+                component.reflect_photon(probe)
+                mirrors.append(component)
+        return mirrors
+
+
+    def print_traps(self) -> None:
+        '''
+        Prints each photon that was stopped for being stuck in a loop, in the
+        order they were found, along with the loop period and the mirrors
+        that make up the loop.
+
+        Example
+        -------
+        >>> self.print_traps()
+        (4, 2) N: trapped at 19ns, loop of 8ns via / (4, 0), \\ (6, 0), / (6, 2), \\ (4, 2)
+        '''
+        traps = self.trap_detector.get_traps()
+        i = 0
+        while i < len(traps):
+            photon, time, period = traps[i]
+            mirrors = self.find_loop_mirrors(photon.x, photon.y, photon.direction, period)
+            via = ', '.join(f'{mirror.symbol} ({mirror.x}, {mirror.y})' for mirror in mirrors)
+            if not via:
+                via = 'no mirrors'
+            print(f'({photon.x}, {photon.y}) {photon.direction}: trapped at {time}ns, loop of {period}ns via {via}')
+            i += 1
+
+
     def tick(self) -> None:
         # only requires implementation once you reach RUN-MY-CIRCUIT
         '''
         Runs a single nanosecond (tick) of this circuit. If the circuit has
         already finished, this method should return out early.
         
-        Otherwise, for each photon that has not been absorbed, this method is
-        responsible for moving it, updating the board to show its new position
+        Otherwise, for each photon that has not been absorbed (only the active
+        photons are visited, and photons absorbed during the tick are removed
+        from them), this method is responsible for moving it, updating the board to show its new position
         and checking if it collided with a component (and handling it if did
         occur). At the end, we then increment clock.
         '''
@@ -310,59 +639,315 @@ class LaserCircuit:
             return
         self.clock += 1
 
+        # absorbed photons are dropped from the active photons as they are
+        # passed, keeping the rest in order
+        active = self.active_photons
+        unchecked = len(active) - self.unchecked_photon_count
+        self.unchecked_photon_count = 0
+        kept = 0
         i = 0
-        while i < len(self.photons):
-            photon = self.photons[i]
+        while i < len(active):
+            photon = active[i]
             if not photon.is_absorbed():
                 photon.move(self.width,self.height)
-                self.board_displayer.add_photon_to_board(photon)
+                if self.trails:
+                    self.board_displayer.add_photon_to_board(photon)
                 collided_component = self.get_collided_component(photon)  
                 if collided_component is not None:
                     photon.interact_with_component(collided_component, self.clock)
+                if self.trap_detection:
+                    self.check_for_trap(photon, collided_component)
+                # only a new photon or one that reached a component can
+                # have run out of components ahead of it
+                if not photon.is_absorbed() and (collided_component is not None or i >= unchecked):
+                    self.retire_exiting_photon(photon)
+                if not photon.is_absorbed():
+                    active[kept] = photon
+                    kept += 1
             i += 1
+        del active[kept:]
+
+
 
+    def leap(self, stop: int | None = None) -> None:
+        '''
+        Runs this circuit up to and including the next tick in which a photon
+        reaches a component or leaves the board, or the tick at clock stop if
+        that comes first. The ticks before it only move the photons along
+        empty cells, so the clock skips straight over them: every photon is
+        moved the whole way at once and its trail drawn, then the last tick
+        is run with tick. The circuit ends up in the same state as running
+        tick over each of those ticks.
+
+        Parameters
+        ----------
+        stop - a clock to not skip past, e.g. the time of the next snapshot,
+               or None
+        '''
+        if self.is_finished():
+            return
+
+        # the number of ticks before the next one in which anything happens
+        if self.live_photon_count == 0:
+            gap = self.exit_time - self.clock - 1
+        else:
+            gap = None
+            for photon in self.active_photons:
+                if photon.is_absorbed():
+                    continue
+                code = photon.direction_code
+                if code == STATIONARY:
+                    gap = 0
+                    break
+                target = self.find_next_component(photon.x, photon.y, DIRECTIONS[code])
+                if target is not None:
+                    distance = abs(target[0] - photon.x) + abs(target[1] - photon.y) - 1
+                elif DELTA_X[code] > 0:
+                    distance = self.width - 1 - photon.x
+                elif DELTA_X[code] < 0:
+                    distance = photon.x
+                elif DELTA_Y[code] > 0:
+                    distance = self.height - 1 - photon.y
+                else:
+                    distance = photon.y
+                if gap is None or distance < gap:
+                    gap = distance
+        if stop is not None:
+            gap = min(gap, stop - self.clock - 1)
+
+        if gap > 0:
+            for photon in self.active_photons:
+                if photon.is_absorbed():
+                    continue
+                code = photon.direction_code
+                if self.trails:
+                    self.board_displayer.add_path_to_board(photon.x, photon.y, DIRECTIONS[code], gap)
+                photon.x += DELTA_X[code] * gap
+                photon.y += DELTA_Y[code] * gap
+            self.clock += gap
+        self.tick()
+
+
+    def retire_exiting_photon(self, photon: Photon) -> None:
+        '''
+        If there are no components between photon and the edge of the board
+        in its direction, it can only walk off the board, so it is moved to
+        the edge and absorbed straight away rather than one tick at a time.
+        The clock still runs until the time it would have been absorbed at
+        (see is_finished), and its trail is drawn on the board as the clock
+        passes each cell (see paint_exit_trails).
+
+        Parameters
+        ----------
+        photon - a live photon that has just moved and interacted
+        '''
+        code = photon.direction_code
+        if code == STATIONARY or self.find_next_component(photon.x, photon.y, DIRECTIONS[code]) is not None:
+            return
+
+        if DELTA_X[code] > 0:
+            distance = self.width - 1 - photon.x
+        elif DELTA_X[code] < 0:
+            distance = photon.x
+        elif DELTA_Y[code] > 0:
+            distance = self.height - 1 - photon.y
+        else:
+            distance = photon.y
 
+        if self.trails and distance > 0:
+            self.exit_trails.append((photon.x, photon.y, code, self.clock, distance))
+        photon.x += DELTA_X[code] * distance
+        photon.y += DELTA_Y[code] * distance
+        photon.got_absorbed()
+        self.exit_time = max(self.exit_time, self.clock + distance + 1)
 
-    def run_circuit(self) -> None:
+
+    def paint_exit_trails(self) -> None:
+        '''
+        Draws the trail of each photon retired by retire_exiting_photon on the
+        board, up to where it would be at the current clock. Trails along the
+        same row or column are merged first, so cells that many trails pass
+        through are only drawn once.
+        '''
+        # the spans of cells to draw along each row (keyed by ('E', y)) and
+        # column (keyed by ('S', x)), as (first, last) positions on that line
+        spans = {}
+        kept = 0
+        i = 0
+        while i < len(self.exit_trails):
+            x, y, code, time, distance = self.exit_trails[i]
+            steps = min(self.clock - time, distance)
+            if steps > 0:
+                end_x = x + DELTA_X[code] * steps
+                end_y = y + DELTA_Y[code] * steps
+                if DELTA_X[code]:
+                    first = x + DELTA_X[code]
+                    spans.setdefault(('E', y), []).append((min(first, end_x), max(first, end_x)))
+                else:
+                    first = y + DELTA_Y[code]
+                    spans.setdefault(('S', x), []).append((min(first, end_y), max(first, end_y)))
+            if steps < distance:
+                self.exit_trails[kept] = (x + DELTA_X[code] * steps, y + DELTA_Y[code] * steps, code, time + steps,
+                                          distance - steps)
+                kept += 1
+            i += 1
+        del self.exit_trails[kept:]
+
+        for (direction, line), line_spans in spans.items():
+            line_spans.sort()
+            start, end = line_spans[0]
+            for first, last in line_spans[1:] + [(None, None)]:
+                if first is not None and first <= end + 1:
+                    end = max(end, last)
+                    continue
+                if direction == 'E':
+                    self.board_displayer.add_path_to_board(start - 1, line, 'E', end - start + 1)
+                else:
+                    self.board_displayer.add_path_to_board(line, start - 1, 'S', end - start + 1)
+                start, end = first, last
+
+
+    def run_engine(self, engine: str, snapshot_interval: int | None) -> None:
+        '''
+        Runs the photons already emitted with the given engine until every one
+        of them is absorbed, printing snapshots of the board along the way
+        (see run_circuit).
+
+        Parameters
+        ----------
+        engine            - 'tick', 'leapfrog', 'vectorized', 'event' or
+                            'parallel'
+        snapshot_interval - print the board every snapshot_interval ns, or
+                            never if None or 0
+        '''
+        if engine == 'event' or engine == 'parallel':
+            if engine == 'event':
+                EventSimulator(self, self.trails).run()
+            else:
+                ParallelRunner(self, self.trails).run()
+            if snapshot_interval and self.clock > 0:
+                self.print_snapshot()
+        else:
+            if engine == 'vectorized':
+                simulator = VectorizedEngine(self)
+            else:
+                simulator = self
+
+            while not simulator.is_finished():
+                if engine == 'leapfrog':
+                    stop = None
+                    if snapshot_interval:
+                        stop = (self.clock // snapshot_interval + 1) * snapshot_interval
+                    self.leap(stop)
+                else:
+                    simulator.tick()
+                if snapshot_interval and (self.clock % snapshot_interval == 0 or simulator.is_finished()):
+                    if engine == 'vectorized' and self.trails:
+                        simulator.paint_board()
+                    self.print_snapshot()
+
+            if engine == 'vectorized':
+                simulator.sync()
+            else:
+                # the board is left showing the whole trail of every retired
+                # photon, as it would be if it were printed now
+                self.paint_exit_trails()
+
+
+    def run_circuit(self, engine: str = 'tick', report_traps: bool = False, headless: bool = False,
+                    snapshot_interval: int | None = 5, output_dir: str | None = '/home/output') -> CircuitResult:
         # only requires implementation once you reach RUN-MY-CIRCUIT
         '''
         Runs the entire circuit from start to finish. This involves getting
         each emitter to emit a photon, and continuously running tick until the
         circuit is finished running. All output in regards of running the 
         circuit should be contained in this method.
-        '''
-        print("========================\n   RUNNING CIRCUIT...\n========================\n")
-
-        print("0ns: Emitting photons.")
-        self.print_emit_photons()
 
-        while not self.is_finished():
-            self.tick()
-            if self.clock % 5 == 0 or self.is_finished():
-                activated_count = 0
-                index = 0
-                while index < len(self.receivers):
-                    if self.receivers[index].is_activated():
-                        activated_count += 1
-                    index += 1
-                print(f"\n{self.clock}ns: {activated_count}/{len(self.receivers)} receiver(s) activated.")
-                self.print_board()
+        Parameters
+        ----------
+        engine            - 'tick' to move the photons one at a time with
+                            tick, 'leapfrog' to skip the clock straight over
+                            the ticks in which no photon reaches a component
+                            with leap (still stopping at every snapshot),
+                            'vectorized' to move them all at once with
+                            a VectorizedEngine (requires NumPy), 'event'
+                            to jump each photon from component to component
+                            with an EventSimulator, or 'parallel' to trace
+                            the photons across worker processes with a
+                            ParallelRunner. All engines write the same
+                            output files. The 'event' and 'parallel' engines
+                            only print the board once, when the circuit has
+                            finished, and the 'parallel' engine requires trap
+                            detection to be on.
+        report_traps      - whether to print the photons that were stopped
+                            for being stuck in a loop once the circuit has
+                            finished
+        headless          - if True, nothing is printed, photon trails are
+                            not drawn on the board during this run (trails
+                            is left as it was) and there are no snapshots
+        snapshot_interval - print the board every snapshot_interval ns, or
+                            never if None or 0
+        output_dir        - the directory to write the output files into, or
+                            None to not write them
 
-        if self.clock == 0:
-            activated_count = 0
-            print(f"\n{self.clock}ns: {activated_count}/{len(self.receivers)} receiver(s) activated.")
-            self.print_board()
+        Returns
+        -------
+        The results of running the circuit.
 
+        Raises
+        ------
+        ValueError if engine is 'parallel' and trap detection is off.
+        '''
+        if engine == 'parallel' and not self.trap_detection:
+            raise ValueError('the parallel engine requires trap detection to be on')
+        if headless:
+            snapshot_interval = None
+
+        if not headless:
+            print("========================\n   RUNNING CIRCUIT...\n========================\n")
+            print("0ns: Emitting photons.")
+            self.print_emit_photons(output_dir)
+        else:
+            self.emit_photons()
+
+        # a headless run does not draw trails, but leaves the setting as it was
+        trails = self.trails
+        if headless:
+            self.trails = False
+        try:
+            self.run_engine(engine, snapshot_interval)
+        finally:
+            self.trails = trails
+
+        if snapshot_interval and self.clock == 0:
+            self.print_snapshot()
+
+        result = self.get_result()
+        if headless:
+            if output_dir is not None:
+                result.write(output_dir)
+            return result
 
         print("\nActivation times:")
-        self.print_activation_times()
+        self.print_activation_times(output_dir)
         print("\nTotal energy absorbed:")
-        self.print_total_energy()
+        self.print_total_energy(output_dir)
 
+        if report_traps:
+            print("\nTrapped photons:")
+            self.print_traps()
 
+        print("\n========================\n   CIRCUIT FINISHED!\n========================")
+        return result
 
 
-        print("\n========================\n   CIRCUIT FINISHED!\n========================")
+    def print_snapshot(self) -> None:
+        '''
+        Prints how many receivers are activated at the current clock, followed
+        by the board.
+        '''
+        print(f"\n{self.clock}ns: {self.count_activated_receivers()}/{len(self.receivers)} receiver(s) activated.")
+        self.print_board()
             
     
     def add_emitter(self, emitter: Emitter) -> bool:
@@ -380,8 +965,9 @@ class LaserCircuit:
         checks. If all checks pass, then the following needs to occur:
           1)  emitter is added in the circuit's list of emitters. emitter
               needs to be added such that the list of emitters remains sorted
-              in alphabetical order by the emitter's symbol. You can assume the
-              list of emitters is already sorted before you add the emitter.
+              in alphabetical order by the emitter's symbol (naturally, see
+              symbols). You can assume the list of emitters is already sorted
+              before you add the emitter.
           2)  emitter's symbol is added into board_displayer.
           3)  The method returns True.
 
@@ -406,29 +992,41 @@ class LaserCircuit:
         if not isinstance(emitter, Emitter):
             return False
 
-        if emitter.x >= self.width or emitter.y >= self.height or emitter.x < 0 or emitter.y < 0:
-            print(f'Error: position ({emitter.x}, {emitter.y}) is out-of-bounds of {self.width}x{self.height} circuit board')
+        error = self.validate_emitter(emitter)
+        if error is not None:
+            print(error)
             return False
 
+        insort(self.emitters, emitter, key=Emitter.get_symbol_key)
+        self.place_component(emitter)
+        return True
+
+
+    def validate_emitter(self, emitter: Emitter) -> str | None:
+        '''
+        Performs the checks of add_emitter in order, without adding the
+        emitter or printing anything.
+
+        Parameters
+        ----------
+        emitter - the emitter to check
+
+        Returns
+        -------
+        The error message of the first check that fails, or None if all
+        checks pass.
+        '''
+        if emitter.x >= self.width or emitter.y >= self.height or emitter.x < 0 or emitter.y < 0:
+            return f'Error: position ({emitter.x}, {emitter.y}) is out-of-bounds of {self.width}x{self.height} circuit board'
+
         collided_emitter = self.get_collided_emitter(emitter)
         if collided_emitter is not None:
-            print(f'Error: position ({emitter.x}, {emitter.y}) is already taken by emitter \'{collided_emitter.symbol}\'')
-            return False
+            return f'Error: position ({emitter.x}, {emitter.y}) is already taken by emitter \'{collided_emitter.symbol}\''
 
-        index = 0
-        while index < len(self.emitters):
-            if emitter.symbol == self.emitters[index].symbol:
-                print(f'Error: symbol \'{emitter.symbol}\' is already taken')
-                return False
-            index += 1
+        if emitter.symbol in self.emitter_symbols:
+            return f'Error: symbol \'{emitter.symbol}\' is already taken'
 
-        index = 0
-        while index < len(self.emitters) and self.emitters[index].symbol < emitter.symbol:
-            index += 1
-
-        self.emitters.insert(index, emitter)
-        self.board_displayer.add_component_to_board(emitter)
-        return True   
+        return None
 
 
     def get_emitters(self) -> list[Emitter]:
@@ -451,8 +1049,9 @@ class LaserCircuit:
         all checks pass, then the following needs to occur:
           1)  receiver is added in the circuit's list of receivers. receiver
               needs to be added such that the list of receivers remains sorted
-              in alphabetical order by the receiver's symbol. You can assume the
-              list of receivers is already sorted before you add the receiver. 
+              in alphabetical order by the receiver's symbol (naturally, see
+              symbols). You can assume the list of receivers is already sorted
+              before you add the receiver. 
           2)  receiver's symbol is added into board_displayer.
           3)  The method returns True.
 
@@ -478,31 +1077,45 @@ class LaserCircuit:
         if not isinstance(receiver, Receiver):
             return False
 
-        if receiver.x >= self.width or receiver.y >= self.height or receiver.x < 0 or receiver.y < 0:
-            print(f'Error: position ({receiver.x}, {receiver.y}) is out-of-bounds of {self.width}x{self.height} circuit board')
+        error = self.validate_receiver(receiver)
+        if error is not None:
+            print(error)
             return False
 
-        if self.get_collided_emitter(receiver) is not None:
-            collided_emitter = self.get_collided_emitter(receiver)
-            print(f'Error: position ({receiver.x}, {receiver.y}) is already taken by emitter \'{collided_emitter.symbol}\'')
-            return False
+        insort(self.receivers, receiver, key=Receiver.get_symbol_key)
+        self.place_component(receiver)
+        return True
+
+
+    def validate_receiver(self, receiver: Receiver) -> str | None:
+        '''
+        Performs the checks of add_receiver in order, without adding the
+        receiver or printing anything.
+
+        Parameters
+        ----------
+        receiver - the receiver to check
+
+        Returns
+        -------
+        The error message of the first check that fails, or None if all
+        checks pass.
+        '''
+        if receiver.x >= self.width or receiver.y >= self.height or receiver.x < 0 or receiver.y < 0:
+            return f'Error: position ({receiver.x}, {receiver.y}) is out-of-bounds of {self.width}x{self.height} circuit board'
+
+        collided_emitter = self.get_collided_emitter(receiver)
+        if collided_emitter is not None:
+            return f'Error: position ({receiver.x}, {receiver.y}) is already taken by emitter \'{collided_emitter.symbol}\''
 
         collided_receiver = self.get_collided_receiver(receiver)
         if collided_receiver is not None:
-            print(f'Error: position ({receiver.x}, {receiver.y}) is already taken by receiver \'{collided_receiver.symbol}\'')
-            return False
+            return f'Error: position ({receiver.x}, {receiver.y}) is already taken by receiver \'{collided_receiver.symbol}\''
 
-        i = 0
-        while i < len(self.receivers):
-            if receiver.symbol == self.receivers[i].symbol:
-                print(f'Error: symbol \'{receiver.symbol}\' is already taken')
-                return False
-            i += 1
+        if receiver.symbol in self.receiver_symbols:
+            return f'Error: symbol \'{receiver.symbol}\' is already taken'
 
-        self.receivers.append(receiver)
-        self.receivers = sort_receivers_by_symbol(self.receivers)
-        self.board_displayer.add_component_to_board(receiver)
-        return True
+        return None
 
 
 
@@ -516,7 +1129,8 @@ class LaserCircuit:
         '''
         If the photon passed in is not a Photon instance, it does not add it in
         and returns False. Else, it adds photon in this circuit's list of
-        photons and returns True.
+        photons, counts it as live if it has not been absorbed and returns
+        True.
 
         Paramaters
         ----------
@@ -528,13 +1142,19 @@ class LaserCircuit:
         '''
         if isinstance(photon, Photon):
             self.photons.append(photon)
+            self.photon_starts.append((photon.x, photon.y, photon.direction_code, self.clock))
+            photon.circuit = self
+            if not photon.is_absorbed():
+                self.live_photon_count += 1
+                self.active_photons.append(photon)
+                self.unchecked_photon_count += 1
             return True
         else:
             return False
 
     def get_photons(self) -> list[Photon]:
         # only requires implementation once you reach RUN-MY-CIRCUIT
-        '''Returns photons.'''
+        '''Returns photons, including the ones that have been absorbed.'''
         return self.photons
 
 
@@ -569,32 +1189,209 @@ class LaserCircuit:
         if not isinstance(mirror, Mirror):
             return False
 
-        
-        if mirror.x >= self.width or mirror.y >= self.height or mirror.x < 0 or mirror.y < 0:
-            print(f'Error: position ({mirror.x}, {mirror.y}) is out-of-bounds of {self.width}x{self.height} circuit board')
+        error = self.validate_mirror(mirror)
+        if error is not None:
+            print(error)
             return False
 
+        i = 0
+        while i < len(self.mirrors) and self.mirrors[i].symbol < mirror.symbol:
+            i += 1
+        self.mirrors.insert(i, mirror)
+        self.place_component(mirror)
+        return True
+
+
+    def validate_mirror(self, mirror: Mirror) -> str | None:
+        '''
+        Performs the checks of add_mirror in order, without adding the
+        mirror or printing anything.
+
+        Parameters
+        ----------
+        mirror - the mirror to check
+
+        Returns
+        -------
+        The error message of the first check that fails, or None if all
+        checks pass.
+        '''
+        if mirror.x >= self.width or mirror.y >= self.height or mirror.x < 0 or mirror.y < 0:
+            return f'Error: position ({mirror.x}, {mirror.y}) is out-of-bounds of {self.width}x{self.height} circuit board'
+
         collided_emitter = self.get_collided_emitter(mirror)
         if collided_emitter is not None:
-            print(f'Error: position ({mirror.x}, {mirror.y}) is already taken by emitter \'{collided_emitter.symbol}\'')
-            return False
+            return f'Error: position ({mirror.x}, {mirror.y}) is already taken by emitter \'{collided_emitter.symbol}\''
 
         collided_receiver = self.get_collided_receiver(mirror)
         if collided_receiver is not None:
-            print(f'Error: position ({mirror.x}, {mirror.y}) is already taken by receiver \'{collided_receiver.symbol}\'')
-            return False
+            return f'Error: position ({mirror.x}, {mirror.y}) is already taken by receiver \'{collided_receiver.symbol}\''
 
         collided_mirror = self.get_collided_mirror(mirror)
         if collided_mirror is not None:
-            print(f'Error: position ({mirror.x}, {mirror.y}) is already taken by mirror \'{collided_mirror.symbol}\'')
-            return False
+            return f'Error: position ({mirror.x}, {mirror.y}) is already taken by mirror \'{collided_mirror.symbol}\''
 
-        i = 0
-        while i < len(self.mirrors) and self.mirrors[i].symbol < mirror.symbol:
-            i += 1
-        self.mirrors.insert(i, mirror)
-        self.board_displayer.add_component_to_board(mirror)
-        return True
+        return None
+
+
+    def place_component(self, component: Emitter | Receiver | Mirror) -> None:
+        '''
+        Records a component that has passed its checks in the position,
+        symbol and line indexes and on the board, and re-traces the photons
+        crossing its position if paths are being tracked. The caller is
+        responsible for adding it into the list for its type.
+
+        Parameters
+        ----------
+        component - the emitter, receiver or mirror being added
+        '''
+        self.register_component(component)
+        self.index_component_lines(component)
+        if self.path_tracker is not None:
+            self.path_tracker.update_cell(component.x, component.y)
+
+
+    def register_component(self, component: Emitter | Receiver | Mirror) -> None:
+        '''
+        Records a component that has passed its checks in the position and
+        symbol indexes and on the board, which is everything the checks of
+        the add methods look at.
+
+        Parameters
+        ----------
+        component - the emitter, receiver or mirror being added
+        '''
+        component_type = component.get_component_type()
+        position = (component.x, component.y)
+        if component_type == 'emitter':
+            self.emitter_grid[position] = component
+            self.emitter_symbols[component.symbol] = component
+        elif component_type == 'receiver':
+            self.receiver_grid[position] = component
+            self.receiver_symbols[component.symbol] = component
+            component.circuit = self
+            if component.is_activated():
+                self.count_activated_receiver()
+        else:
+            self.mirror_grid[position] = component
+        self.board_displayer.add_component_to_board(component)
+
+
+    def add_components(self, components) -> list[tuple[int, str]]:
+        '''
+        Adds many emitters, receivers and mirrors into this circuit at once.
+        Each component goes through the same checks as add_emitter,
+        add_receiver or add_mirror, against the circuit and the components
+        before it in the batch, which are all lookups in the position and
+        symbol indexes. Instead of printing errors, every rejected component
+        is reported. The lists of components and the row and column indexes
+        are sorted once at the end rather than on every insert, leaving them
+        as if each component had been added with its add method.
+
+        Parameters
+        ----------
+        components - an iterable of the components to add, in order
+
+        Returns
+        -------
+        A list of (index, error message) for each component that was not
+        added, where index is its position in components.
+        '''
+        rejected = []
+        placed = []
+        mirrors = []
+        index = 0
+        for component in components:
+            if isinstance(component, Emitter):
+                error = self.validate_emitter(component)
+                same_type = self.emitters
+            elif isinstance(component, Receiver):
+                error = self.validate_receiver(component)
+                same_type = self.receivers
+            elif isinstance(component, Mirror):
+                error = self.validate_mirror(component)
+                same_type = mirrors
+            else:
+                error = 'Error: not an emitter, receiver or mirror'
+
+            if error is not None:
+                rejected.append((index, error))
+            else:
+                same_type.append(component)
+                self.register_component(component)
+                placed.append(component)
+            index += 1
+        if not placed:
+            return rejected
+
+        rows = set()
+        columns = set()
+        for component in placed:
+            self.row_index.setdefault(component.y, []).append(component.x)
+            self.column_index.setdefault(component.x, []).append(component.y)
+            rows.add(component.y)
+            columns.add(component.x)
+        for y in rows:
+            self.row_index[y].sort()
+        for x in columns:
+            self.column_index[x].sort()
+
+        self.emitters.sort(key=Emitter.get_symbol_key)
+        self.receivers.sort(key=Receiver.get_symbol_key)
+        # add_mirror puts each mirror before the mirrors with the same
+        # symbol, so the newest come first within each symbol
+        if mirrors:
+            mirrors.reverse()
+            mirrors.extend(self.mirrors)
+            mirrors.sort(key=Mirror.get_symbol)
+            self.mirrors[:] = mirrors
+        if self.path_tracker is not None:
+            for component in placed:
+                self.path_tracker.update_cell(component.x, component.y)
+        return rejected
+
+
+    def remove_mirror(self, x: int, y: int) -> Mirror | None:
+        '''
+        Removes the mirror at (x, y) from this circuit. If there is no mirror
+        there, an error message is printed and nothing is removed. If paths
+        are being tracked, the photons crossing (x, y) are re-traced.
+
+        Parameters
+        ----------
+        x - the x position of the mirror to remove
+        y - the y position of the mirror to remove
+
+        Returns
+        -------
+        The mirror removed, or None if there was no mirror at (x, y).
+        '''
+        mirror = self.mirror_grid.pop((x, y), None)
+        if mirror is None:
+            print(f'Error: there is no mirror at position ({x}, {y})')
+            return None
+
+        self.mirrors.remove(mirror)
+        self.unindex_component_lines(mirror)
+        self.board_displayer.remove_component_from_board(mirror)
+        if self.path_tracker is not None:
+            self.path_tracker.update_cell(x, y)
+        return mirror
+
+
+    def track_paths(self) -> None:
+        '''
+        Traces every photon in this circuit to the end of its path without
+        running it, leaving the circuit in its finished state, and keeps
+        the paths so that later calls to add_mirror, remove_mirror or the
+        other add methods only re-trace the photons whose paths cross the
+        edited cell. If no photons have been added yet, the emitters emit
+        their photons first. See PathTracker for details.
+        '''
+        if not self.photons:
+            self.emit_photons()
+        self.path_tracker = PathTracker(self, self.photon_starts)
+        self.path_tracker.trace_all()
 
 
     def get_mirrors(self) -> list[Mirror]:
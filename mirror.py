@@ -1,4 +1,5 @@
 from photon import Photon
+from direction import ABSORB, REFLECTIONS
 
 '''
 Mirror - A surface that reflect photons, changing the direction in which they 
@@ -7,18 +8,27 @@ photon's initial direction when it reaches the mirror.
 
 You are free to add more attributes and methods, as long as you aren't 
 modifying the existing scaffold.
+
+Mirrors use __slots__ and share component_type through the class. The
+direction a photon leaves a mirror in is looked up in the REFLECTIONS table of
+the direction module.
 '''
 
 
 class Mirror:
-    
+
+
+    __slots__ = ('x', 'y', 'symbol')
+    component_type = 'mirror'
+
 
     def __init__(self, symbol: str, x: int, y: int):
         # only requires implementation once you reach ADD-MY-MIRRORS
         '''
         Initialises a Mirror instance given a symbol, x and y value. 
 
-        component_type: str - represents the type of component ('mirror')
+        component_type: str - represents the type of component ('mirror'),
+                              shared by every mirror
         symbol:         str - the symbol of this mirror
                               ('/', '\', '>', '<', '^' or 'v')
         x:              int - x position of this mirror
@@ -30,7 +40,6 @@ class Mirror:
         x:      int - the x position to set this mirror to
         y:      int - the y position to set this mirror to
         '''
-        self.component_type = 'mirror'
         self.x = x
         self.y = y 
         self.symbol = symbol
@@ -53,44 +62,11 @@ class Mirror:
         '''
         if photon.absorbed:
             return
-        if self.symbol == "/":
-            if photon.direction == 'E':
-                photon.direction = 'N'
-            elif photon.direction == 'N':
-                photon.direction = 'E'
-            elif photon.direction == 'S':
-                photon.direction = 'W'
-            elif photon.direction == 'W':
-                photon.direction = 'S'
-        if self.symbol == "\\":
-            if photon.direction == 'W':
-                photon.direction = 'N'
-            elif photon.direction == 'N':
-                photon.direction = 'W'
-            elif photon.direction == 'S':
-                photon.direction = 'E'
-            elif photon.direction == 'E':
-                photon.direction = 'S'
-        if self.symbol == '>':
-            if photon.direction == 'S' or photon.direction == 'N':
-                photon.direction = 'E'
-            elif photon.direction == 'W' or photon.direction == 'E':
-                photon.got_absorbed()
-        if self.symbol == '<':
-            if photon.direction == 'N' or photon.direction == 'S':
-                photon.direction = 'W'
-            elif photon.direction == 'W' or photon.direction == 'E':
-                photon.got_absorbed()
-        if self.symbol == '^':
-            if photon.direction == 'E' or photon.direction == 'W':
-                photon.direction = 'N'
-            elif photon.direction == 'N' or photon.direction == 'S':
-                photon.got_absorbed()
-        if self.symbol == 'v': 
-            if photon.direction == 'E' or photon.direction == 'W':
-                photon.direction = 'S'
-            elif photon.direction == 'N' or photon.direction == 'S':
-                photon.got_absorbed()
+        reflected = REFLECTIONS[self.symbol][photon.direction_code]
+        if reflected == ABSORB:
+            photon.got_absorbed()
+        else:
+            photon.direction_code = reflected
 
 
     def get_component_type(self) -> str:
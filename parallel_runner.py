@@ -0,0 +1,178 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from heapq import merge
+from direction import STATIONARY
+
+'''
+ParallelRunner - An alternate engine for running a LaserCircuit which traces
+the photons in the circuit across a pool of worker processes.
+
+Photons never interact with each other, so each one can be traced on its own.
+The circuit's layout is compiled into a CompiledCircuit snapshot (see
+LaserCircuit.compile), which is sent to each worker process once when the
+pool starts. The photons are then split into chunks, and each worker traces
+its chunks through the snapshot, returning the receiver hits and the end of
+every other photon. The hits are merged in the order of their time, then of
+their photon, which is the order the tick engine absorbs them in, so the
+receivers end up in exactly the same state as with run_circuit.
+
+Each photon is left where its path ends: on the receiver or mirror that
+absorbed it, on the edge of the board it left, or, if it is stuck in a loop,
+where the circuit's trap detection would have found it. If trails are drawn,
+the workers also return the straight moves of each photon's path up to then,
+which are drawn on the board afterwards, giving the same board as the tick
+engine once the circuit has finished.
+
+Trapped photons are only ever stopped by trap detection, so this engine
+requires the circuit's trap detection to be on.
+'''
+
+
+# the compiled circuit each worker process traces photons through, and
+# whether the paths of the photons are returned to draw their trails
+snapshot = None
+trails = False
+
+
+def start_worker(compiled, draw_trails: bool) -> None:
+    '''
+    Stores the compiled circuit for a worker process to trace photons with.
+    Called once in each worker process when the pool starts.
+
+    Parameters
+    ----------
+    compiled    - the compiled circuit
+    draw_trails - whether to return the paths of the photons
+    '''
+    global snapshot, trails
+    snapshot = compiled
+    trails = draw_trails
+
+
+def trace_photons(photons: list[tuple[int, int, int, str | None]]) -> tuple[list, list, list]:
+    '''
+    Traces a chunk of photons through the worker's compiled circuit.
+
+    Parameters
+    ----------
+    photons - the index, x, y and direction of each photon in the chunk
+
+    Returns
+    -------
+    A tuple (hits, ends, moves). hits holds a (time, index, x, y) for each
+    photon absorbed by a receiver, sorted by time then index. ends holds an
+    (index, kind, time, x, y, period, direction code) for every other photon,
+    where time, period and the position and direction are those the photon
+    is found trapped with if its kind is 'loop'. If trails are drawn, moves
+    holds the (x, y, direction, length) of each straight move of every
+    photon up to where it is absorbed or trapped, else it is empty.
+    '''
+    hits = []
+    ends = []
+    moves = []
+    for index, x, y, direction in photons:
+        kind, time, end_x, end_y, period = snapshot.trace(x, y, direction)
+        if kind == 'receiver':
+            hits.append((time, index, end_x, end_y))
+        elif kind == 'loop':
+            time, period, (end_x, end_y, code) = snapshot.find_trap(x, y, direction)
+            ends.append((index, kind, time, end_x, end_y, period, code))
+        else:
+            ends.append((index, kind, time, end_x, end_y, period, None))
+        if trails:
+            moves.extend(snapshot.path(x, y, direction, time))
+    hits.sort()
+    return hits, ends, moves
+
+
+class ParallelRunner:
+
+
+    def __init__(self, circuit, trails: bool = True, workers: int | None = None, chunk_size: int | None = None):
+        '''
+        Initialises a ParallelRunner instance given the circuit to run.
+
+        circuit:    LaserCircuit - the circuit this engine runs
+        trails:     bool         - whether the path of each photon is drawn
+                                   on the circuit's board displayer
+        workers:    int          - the number of worker processes
+        chunk_size: int | None   - how many photons to send to a worker at a
+                                   time, or None to split the photons into
+                                   four chunks per worker
+
+        Parameters
+        ----------
+        circuit    - the circuit to run, with trap detection on
+        trails     - whether to draw photon paths on the board
+        workers    - the number of worker processes, or None for one per CPU
+        chunk_size - the number of photons per chunk
+        '''
+        self.circuit = circuit
+        self.trails = trails
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+
+
+    def run(self) -> None:
+        '''
+        Traces every photon in the circuit that has not been absorbed and
+        updates the circuit, its receivers and its photons to the state they
+        would be in once the circuit has finished running: every photon is
+        absorbed or trapped, and the clock is the time the last one was.
+
+        Raises
+        ------
+        ValueError if the circuit's trap detection is off, since photons stuck
+        in a loop would then never finish.
+        '''
+        circuit = self.circuit
+        if not circuit.trap_detection:
+            raise ValueError('the parallel engine requires trap detection to be on')
+        photons = circuit.photons
+        live = [(index, photon.x, photon.y, photon.direction)
+                for index, photon in enumerate(photons) if not photon.is_absorbed()]
+        if not live:
+            return
+
+        chunk_size = self.chunk_size or max(1, -(-len(live) // (self.workers * 4)))
+        chunks = [live[i:i + chunk_size] for i in range(0, len(live), chunk_size)]
+        compiled = circuit.compile(resolve_all=False)
+        with ProcessPoolExecutor(self.workers, initializer=start_worker, initargs=(compiled, self.trails)) as pool:
+            results = list(pool.map(trace_photons, chunks))
+
+        if self.trails:
+            for hits, ends, moves in results:
+                for x, y, direction, length in moves:
+                    circuit.board_displayer.add_path_to_board(x, y, direction, length)
+            # a photon that never moves is drawn where it is
+            for index, x, y, direction in live:
+                if photons[index].direction_code == STATIONARY:
+                    circuit.board_displayer.add_photon_to_board(photons[index])
+
+        start = circuit.clock
+        finish = start
+        for time, index, x, y in merge(*(hits for hits, ends, moves in results)):
+            photon = photons[index]
+            photon.x = x
+            photon.y = y
+            circuit.get_collided_receiver(photon).absorb_photon(photon, start + time)
+            finish = max(finish, start + time)
+
+        traps = []
+        for hits, ends, moves in results:
+            for index, kind, time, x, y, period, code in ends:
+                photon = photons[index]
+                photon.x = x
+                photon.y = y
+                if kind == 'loop':
+                    photon.direction_code = code
+                    traps.append((start + time, index, period))
+                else:
+                    photon.got_absorbed()
+                finish = max(finish, start + time)
+
+        # traps are recorded in the order the tick engine finds them
+        traps.sort()
+        for time, index, period in traps:
+            circuit.trap_detector.add_trap(photons[index], time, period)
+        circuit.clock = finish
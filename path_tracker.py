@@ -0,0 +1,361 @@
+from receiver import Receiver
+from direction import STATIONARY, ABSORB, DIRECTIONS, DELTA_X, DELTA_Y, REFLECTIONS
+
+'''
+PathTracker - Keeps the finished state of a LaserCircuit up to date as its
+layout is edited, by re-tracing only the photons whose paths an edit touches.
+
+The tracker traces every photon in the circuit from where it was added and
+records its path as a list of waypoints: its start, then the state it leaves
+each emitter it passes over and each mirror it reflects off in. It also keeps
+an index from each cell to the photons whose paths cross it. When a component
+is placed on or removed from a cell, only the photons crossing that cell are
+re-traced, starting from the moment they reach it, and each receiver's total
+energy, photons absorbed and activation time are corrected by the difference.
+
+The circuit is left in the state it would be in had it been run to the end:
+every photon is absorbed where its path ends, photons stuck in a loop are
+recorded in the trap detector at the time the circuit would find them, and
+the clock is the time the last photon was absorbed. Since energy is taken off
+as well as added on, total energies can differ from a fresh run in the last
+few bits. Photon trails are not drawn on the board.
+'''
+
+
+class PathTracker:
+
+
+    def __init__(self, circuit, starts: list[tuple[int, int, int, int]]):
+        '''
+        Initialises a PathTracker instance given the circuit to track and
+        where each of its photons started.
+
+        circuit:    LaserCircuit                     - the circuit tracked
+        starts:     list[tuple[int, int, int, int]]  - the x, y, direction
+                                                       code and time each
+                                                       photon was added with
+        waypoints:  list[list[tuple]]                - per photon, the (x, y,
+                                                       direction code, time,
+                                                       whether it reflected
+                                                       off a mirror) of each
+                                                       waypoint of its path
+        ends:       list[tuple]                      - per photon, the (kind,
+                                                       time, x, y, period) of
+                                                       the end of its path,
+                                                       as described in
+                                                       CompiledCircuit
+        cells:      dict[tuple[int, int], dict[int, int]]
+                                                     - per cell, how many
+                                                       times each photon's
+                                                       path crosses it
+        hits:       dict[tuple[int, int], dict[int, int]]
+                                                     - per receiver position,
+                                                       the time each photon
+                                                       that reached it did
+
+        Parameters
+        ----------
+        circuit - the circuit to track
+        starts  - where each photon in the circuit started
+        '''
+        self.circuit = circuit
+        self.starts = starts
+        self.waypoints = []
+        self.ends = []
+        self.cells = {}
+        self.hits = {}
+
+
+    def trace_all(self) -> None:
+        '''
+        Resets every receiver and photon in the circuit, then traces every
+        photon from its start and brings the circuit to its finished state.
+        '''
+        circuit = self.circuit
+        for receiver in circuit.receivers:
+            receiver.total_energy = 0
+            receiver.photons_absorbed = 0
+            receiver.activated = False
+            receiver.activation_time = 0
+        circuit.activated_receiver_count = 0
+        self.hits = {}
+        self.cells = {}
+
+        self.waypoints = []
+        self.ends = []
+        for index, (x, y, code, time) in enumerate(self.starts):
+            photon = circuit.photons[index]
+            photon.absorbed = False
+            photon.trapped = False
+            self.waypoints.append([(x, y, code, time, False)])
+            self.ends.append(None)
+            self.trace(index, False)
+        circuit.live_photon_count = 0
+
+        # receivers add up energy in the same order as the tick engine
+        for time, index in sorted((end[1], index) for index, end in enumerate(self.ends)):
+            self.absorb(index)
+        self.update_traps()
+        self.update_clock()
+
+
+    def update_cell(self, x: int, y: int) -> None:
+        '''
+        Re-traces every photon whose path crosses (x, y), after a component
+        has been placed on it or removed from it.
+
+        Parameters
+        ----------
+        x - the x position of the cell that was edited
+        y - the y position of the cell that was edited
+        '''
+        crossing = self.cells.get((x, y))
+        if not crossing:
+            return
+        for index in sorted(crossing):
+            self.retract(index)
+            self.truncate(index, x, y)
+            self.trace(index, True)
+            self.absorb(index)
+        self.update_traps()
+        self.update_clock()
+
+
+    def segments(self, index: int):
+        '''
+        Yields each straight segment of a photon's path as (x, y, direction
+        code, time, end x, end y), the last one ending where its path ends.
+
+        Parameters
+        ----------
+        index - the index of the photon
+        '''
+        waypoints = self.waypoints[index]
+        kind, end_time, end_x, end_y, period = self.ends[index]
+        i = 0
+        while i < len(waypoints):
+            x, y, code, time, reflected = waypoints[i]
+            if i + 1 < len(waypoints):
+                yield x, y, code, time, waypoints[i + 1][0], waypoints[i + 1][1]
+            elif (end_x, end_y) != (x, y):
+                yield x, y, code, time, end_x, end_y
+            i += 1
+
+
+    def mark(self, index: int, x: int, y: int, end_x: int, end_y: int, crossing: bool) -> None:
+        '''
+        Counts the photon as crossing, or no longer crossing, each cell of a
+        straight segment from (x, y) to (end_x, end_y), not including (x, y).
+
+        Parameters
+        ----------
+        index    - the index of the photon
+        x        - the x position the segment starts from
+        y        - the y position the segment starts from
+        end_x    - the x position the segment ends at
+        end_y    - the y position the segment ends at
+        crossing - True to count the photon, False to take it off
+        '''
+        dx = (end_x > x) - (end_x < x)
+        dy = (end_y > y) - (end_y < y)
+        while (x, y) != (end_x, end_y):
+            x += dx
+            y += dy
+            photons = self.cells.setdefault((x, y), {})
+            if crossing:
+                photons[index] = photons.get(index, 0) + 1
+            elif photons[index] == 1:
+                del photons[index]
+            else:
+                photons[index] -= 1
+
+
+    def retract(self, index: int) -> None:
+        '''
+        Takes a photon's energy back off the receiver it reached, if any.
+
+        Parameters
+        ----------
+        index - the index of the photon
+        '''
+        kind, time, x, y, period = self.ends[index]
+        if kind != 'receiver':
+            return
+        receiver = self.circuit.receiver_grid.get((x, y))
+        hits = self.hits[(x, y)]
+        del hits[index]
+        if receiver is None:
+            return
+        receiver.total_energy -= Receiver.convert_frequency_to_energy(self.circuit.photons[index].frequency)
+        receiver.photons_absorbed -= 1
+        if receiver.photons_absorbed == 0:
+            receiver.total_energy = 0
+            receiver.activated = False
+            receiver.activation_time = 0
+            self.circuit.activated_receiver_count -= 1
+        else:
+            receiver.activation_time = min(hits.values())
+
+
+    def truncate(self, index: int, x: int, y: int) -> None:
+        '''
+        Cuts a photon's path off where it first reaches (x, y), taking it off
+        the index of every cell after that point. The last waypoint
+        left is the photon arriving at (x, y), before interacting with it.
+
+        Parameters
+        ----------
+        index - the index of the photon
+        x     - the x position to cut the path off at
+        y     - the y position to cut the path off at
+        '''
+        waypoints = self.waypoints[index]
+        kept = None
+        for i, (start_x, start_y, code, time, end_x, end_y) in enumerate(self.segments(index)):
+            if kept is None:
+                on_segment = (min(start_x, end_x) <= x <= max(start_x, end_x)
+                              and min(start_y, end_y) <= y <= max(start_y, end_y) and (x, y) != (start_x, start_y))
+                if on_segment:
+                    kept = i
+                    self.mark(index, x, y, end_x, end_y, False)
+                    arrival = (x, y, code, time + abs(x - start_x) + abs(y - start_y), None)
+            else:
+                self.mark(index, start_x, start_y, end_x, end_y, False)
+        del waypoints[kept + 1:]
+        waypoints.append(arrival)
+
+
+    def trace(self, index: int, arrived: bool) -> None:
+        '''
+        Traces a photon from the last waypoint of its path to its end,
+        recording the rest of its path and moving the photon to its end.
+
+        Parameters
+        ----------
+        index   - the index of the photon
+        arrived - whether the last waypoint is the photon arriving at a cell
+                  it has not interacted with yet, rather than leaving one
+        '''
+        circuit = self.circuit
+        waypoints = self.waypoints[index]
+        x, y, code, time, reflected = waypoints.pop() if arrived else waypoints[-1]
+
+        # replay the trap detector's checkpoints over the reflections so far
+        checkpoint = None
+        reflections_since = 0
+        reflection_limit = 1
+        for state_x, state_y, state_code, state_time, state_reflected in waypoints:
+            if state_reflected:
+                checkpoint, reflections_since, reflection_limit = self.visit(
+                    (state_x, state_y, state_code), state_time, checkpoint, reflections_since, reflection_limit)
+
+        if code == STATIONARY:
+            if (x, y) in circuit.receiver_grid:
+                end = ('receiver', time + 1, x, y, 0)
+            else:
+                end = ('loop', time + 1, x, y, 1)
+        else:
+            end = None
+        while end is None:
+            if not arrived:
+                target = circuit.find_next_component(x, y, DIRECTIONS[code])
+                if target is None:
+                    edge_x = min(max(x + DELTA_X[code] * (circuit.width + circuit.height), 0), circuit.width - 1)
+                    edge_y = min(max(y + DELTA_Y[code] * (circuit.width + circuit.height), 0), circuit.height - 1)
+                    self.mark(index, x, y, edge_x, edge_y, True)
+                    end = ('exit', time + abs(edge_x - x) + abs(edge_y - y) + 1, edge_x, edge_y, 0)
+                    break
+                self.mark(index, x, y, target[0], target[1], True)
+                time += abs(target[0] - x) + abs(target[1] - y)
+                x, y = target
+            arrived = False
+
+            if (x, y) in circuit.receiver_grid:
+                end = ('receiver', time, x, y, 0)
+            elif (x, y) in circuit.mirror_grid:
+                reflected = REFLECTIONS[circuit.mirror_grid[(x, y)].symbol][code]
+                if reflected == ABSORB:
+                    end = ('absorbed', time, x, y, 0)
+                    break
+                code = reflected
+                waypoints.append((x, y, code, time, True))
+                if checkpoint is not None and checkpoint[0] == (x, y, code):
+                    end = ('loop', time, x, y, time - checkpoint[1])
+                    break
+                checkpoint, reflections_since, reflection_limit = self.visit(
+                    (x, y, code), time, checkpoint, reflections_since, reflection_limit)
+            else:
+                # an emitter, or the empty cell the photon was re-traced from
+                waypoints.append((x, y, code, time, False))
+
+        self.ends[index] = end
+        photon = circuit.photons[index]
+        photon.x = end[2]
+        photon.y = end[3]
+        photon.direction_code = code
+        photon.absorbed = True
+        photon.trapped = end[0] == 'loop'
+
+
+    def absorb(self, index: int) -> None:
+        '''
+        Gives a photon's energy to the receiver at the end of its path, if
+        any.
+
+        Parameters
+        ----------
+        index - the index of the photon
+        '''
+        kind, time, x, y, period = self.ends[index]
+        if kind != 'receiver':
+            return
+        self.hits.setdefault((x, y), {})[index] = time
+        receiver = self.circuit.receiver_grid[(x, y)]
+        receiver.total_energy += Receiver.convert_frequency_to_energy(self.circuit.photons[index].frequency)
+        receiver.photons_absorbed += 1
+        if receiver.photons_absorbed == 1:
+            receiver.activated = True
+            receiver.activation_time = time
+            self.circuit.activated_receiver_count += 1
+        else:
+            receiver.activation_time = min(receiver.activation_time, time)
+
+
+    @staticmethod
+    def visit(state: tuple[int, int, int], time: int, checkpoint, reflections_since: int,
+              reflection_limit: int) -> tuple:
+        '''
+        Applies TrapDetector's checkpoint rule to a reflection that did not
+        return to the checkpoint, and returns the new (checkpoint,
+        reflections_since, reflection_limit).
+
+        Parameters
+        ----------
+        state             - the (x, y, direction code) after the reflection
+        time              - the time of the reflection
+        checkpoint        - the (state, time) checkpoint, or None
+        reflections_since - reflections since the checkpoint was moved
+        reflection_limit  - reflections before the checkpoint is moved
+        '''
+        if checkpoint is None:
+            return (state, time), 0, 1
+        reflections_since += 1
+        if reflections_since == reflection_limit:
+            return (state, time), 0, reflection_limit * 2
+        return checkpoint, reflections_since, reflection_limit
+
+
+    def update_traps(self) -> None:
+        '''
+        Rebuilds the circuit's list of trapped photons, in the order the tick
+        engine finds them.
+        '''
+        traps = sorted((end[1], index, end[4]) for index, end in enumerate(self.ends) if end[0] == 'loop')
+        photons = self.circuit.photons
+        self.circuit.trap_detector.traps = [(photons[index], time, period) for time, index, period in traps]
+
+
+    def update_clock(self) -> None:
+        '''Sets the circuit's clock to the time the last photon was absorbed.'''
+        if self.ends:
+            self.circuit.clock = max(end[1] for end in self.ends)
@@ -1,3 +1,5 @@
+from direction import DELTA_X, DELTA_Y, encode_direction, decode_direction
+
 '''
 Photon - A particle of light that are emitted by emitters and travels along the
 circuit board. Photons have a frequency (THz) and direction. They can interact 
@@ -11,26 +13,42 @@ Warning: Importing other components in this module will cause a circular import
 error, as those components require this module to be fully initialised before
 it can finish initialising itself. If you need to query the type of a component,
 use the component_type attribute that each component has defined instead.
+
+Photons are the most numerous objects in a circuit, so they are kept compact:
+they use __slots__ instead of a per-instance __dict__, the symbol is shared by
+the class, and the direction is stored as a small integer code from the
+direction module. The direction attribute is a property that converts to and
+from the usual 'N', 'E', 'S' and 'W'.
 '''
 
 
 class Photon:
 
 
+    __slots__ = ('x', 'y', 'frequency', 'direction_code', 'absorbed', 'trapped', 'circuit')
+    symbol = '.'
+
+
     def __init__(self, x: int, y: int, frequency: int, direction: str):
         # only requires implementation once you reach RUN-MY-CIRCUIT
         '''
         Initialises a Photon instance given an x and y position, as well as a
-        frequency and direction. symbol is '.' and absorbed is False by
-        default.
-
-        symbol:    str  - the symbol of this photon ('.')
-        x:         int  - x position of this photon
-        y:         int  - x position of this photon
-        frequency: int  - the frequency (THz) of this photon
-        direction: str  - the direction in which this photon will travel 
-                          ('N', 'E', 'S' or 'W')
-        absorbed:  bool - whether or not this photon has been absorbed
+        frequency and direction. symbol is '.', and absorbed and trapped are
+        False by default.
+
+        symbol:         str  - the symbol of this photon ('.'), shared by
+                               every photon
+        x:              int  - x position of this photon
+        y:              int  - x position of this photon
+        frequency:      int  - the frequency (THz) of this photon
+        direction_code: int  - the code of the direction in which this photon
+                               will travel (see the direction module)
+        absorbed:       bool - whether or not this photon has been absorbed
+        trapped:        bool - whether or not this photon was stopped because
+                               it is stuck in a loop
+        circuit:        LaserCircuit | None
+                             - the circuit keeping count of this photon, told
+                               when this photon is absorbed (None by default)
 
         Paramater
         ---------
@@ -41,10 +59,11 @@ class Photon:
         '''
         self.x = x
         self.y = y
-        self.symbol = '.'
         self.frequency = frequency
-        self.direction = direction
+        self.direction_code = encode_direction(direction)
         self.absorbed = False
+        self.trapped = False
+        self.circuit = None
 
 
     def move(self, board_width: int, board_height: int) -> None:
@@ -65,29 +84,22 @@ class Photon:
         if self.absorbed:
             return
 
-        if self.direction == 'E':
-            self.x += 1
-        elif self.direction == 'W':
-            self.x -= 1
-
-        if self.direction == 'N':
-            self.y -= 1
-        elif self.direction == 'S':
-            self.y += 1
+        self.x += DELTA_X[self.direction_code]
+        self.y += DELTA_Y[self.direction_code]
 
         if self.x < 0:
             self.x = 0
-            self.absorbed = True
+            self.got_absorbed()
         elif self.x >= board_width:
             self.x = board_width - 1
-            self.absorbed = True
+            self.got_absorbed()
 
         if self.y < 0:
             self.y = 0
-            self.absorbed = True
+            self.got_absorbed()
         elif self.y >= board_height:
             self.y = board_height - 1
-            self.absorbed = True
+            self.got_absorbed()
 
 
     def interact_with_component(self, component: object, timestamp: int) -> None:
@@ -135,10 +147,30 @@ class Photon:
 
     def got_absorbed(self) -> None:
         # only requires implementation once you reach RUN-MY-CIRCUIT
-        '''Updates the absorbed attribute to represent an absorption.'''
+        '''
+        Updates the absorbed attribute to represent an absorption. If this
+        photon belongs to a circuit, the circuit's count of live photons is
+        updated the first time it is absorbed.
+        '''
+        if not self.absorbed and self.circuit is not None:
+            self.circuit.count_absorbed_photon()
         self.absorbed = True
 
 
+    def got_trapped(self) -> None:
+        '''
+        Updates this photon to represent being stuck in a loop. A trapped 
+        photon is also absorbed, so it no longer moves.
+        '''
+        self.trapped = True
+        self.got_absorbed()
+
+
+    def is_trapped(self) -> bool:
+        '''Returns trapped.'''
+        return self.trapped
+
+
     def is_absorbed(self) -> bool:
         # only requires implementation once you reach RUN-MY-CIRCUIT
         '''Returns absorbed.'''
@@ -159,10 +191,22 @@ class Photon:
             self.direction = direction
 
 
+    @property
+    def direction(self) -> str | None:
+        '''Returns direction, decoded from direction_code.'''
+        return decode_direction(self.direction_code)
+
+
+    @direction.setter
+    def direction(self, direction: str | None) -> None:
+        '''Sets direction_code to the code of direction.'''
+        self.direction_code = encode_direction(direction)
+
+
     def get_direction(self) -> str:
         # only requires implementation once you reach RUN-MY-CIRCUIT
         '''Returns direction.'''
-        return self.direction
+        return decode_direction(self.direction_code)
 
         
     def get_frequency(self) -> int:
@@ -0,0 +1,127 @@
+try:
+    import numpy as np
+except ImportError:
+    np = None
+from receiver import Receiver
+from direction import NORTH, EAST, SOUTH, WEST, DIRECTIONS, encode_direction
+
+'''
+PulseEvaluator - Evaluates thousands of candidate pulse sequences for one
+circuit layout at once, without simulating any of them.
+
+A photon's path only depends on where it is emitted and in which direction,
+while its frequency only scales the energy it gives the receiver it reaches.
+So each emitter is traced once per direction through a CompiledCircuit, and
+the results are stored as an incidence table (which receiver each emitter
+reaches in each direction) and an arrival time table. A batch of pulse
+sequences is then evaluated with one matrix product per direction: the energy
+each emitter gives off times the incidence table of the emitters sent in that
+direction.
+
+Energy is added up in a different order than the circuit adds it up in, so
+total energies can differ from LaserCircuit.run_circuit in the last few bits.
+
+NumPy is an optional dependency. It is only required when this class is used.
+'''
+
+
+class PulseEvaluator:
+
+
+    def __init__(self, compiled):
+        '''
+        Initialises a PulseEvaluator instance given a compiled circuit, and
+        builds the incidence and arrival time tables.
+
+        compiled:  CompiledCircuit - the compiled circuit to evaluate pulse
+                                     sequences for
+        symbols:   list[str]       - the symbols of the emitters, in the order
+                                     of the columns of a pulse sequence batch
+        receivers: list[str]       - the symbols of the receivers, in the
+                                     order of the columns of the results
+        incidence: np.ndarray      - incidence[d, e, r] is 1 if emitter e's
+                                     photon reaches receiver r when emitted in
+                                     direction code d, else 0
+        arrival:   np.ndarray      - arrival[d, e, r] is the time (ns) that
+                                     photon reaches receiver r, or infinity if
+                                     it does not
+
+        Parameters
+        ----------
+        compiled - the compiled circuit, from LaserCircuit.compile
+        '''
+        if np is None:
+            raise ImportError('the pulse evaluator requires NumPy')
+        self.compiled = compiled
+        self.symbols = [emitter[0] for emitter in compiled.emitters]
+        self.receivers = [receiver[0] for receiver in compiled.receivers]
+
+        columns = {(x, y): i for i, (symbol, x, y) in enumerate(compiled.receivers)}
+        shape = (4, len(self.symbols), len(self.receivers))
+        self.incidence = np.zeros(shape, dtype=np.float64)
+        self.arrival = np.full(shape, np.inf)
+        for e, (symbol, x, y, frequency, direction) in enumerate(compiled.emitters):
+            for code in (NORTH, EAST, SOUTH, WEST):
+                kind, time, end_x, end_y, period = compiled.trace(x, y, DIRECTIONS[code])
+                if kind == 'receiver':
+                    r = columns[(end_x, end_y)]
+                    self.incidence[code, e, r] = 1
+                    self.arrival[code, e, r] = time
+
+
+    def evaluate(self, frequencies, directions) -> tuple:
+        '''
+        Evaluates a batch of pulse sequences, each one setting the frequency
+        and direction of every emitter.
+
+        Parameters
+        ----------
+        frequencies - array of shape (sequences, emitters) holding the
+                      frequency (THz) of each emitter in each sequence, with
+                      emitters in the order of symbols
+        directions  - array of the same shape holding the direction of each
+                      emitter, either as 'N', 'E', 'S' or 'W' or as direction
+                      codes
+
+        Returns
+        -------
+        A tuple (total_energy, photons_absorbed, activation_times) of arrays
+        of shape (sequences, receivers), with receivers in the order of
+        receivers. A receiver that absorbs no photons in a sequence has an
+        activation time of 0, like a Receiver that was never activated.
+
+        Raises
+        ------
+        ValueError if a direction is not 'N', 'E', 'S' or 'W' or the code of
+        one of them.
+
+        Example
+        -------
+        >>> energy, photons, times = evaluator.evaluate([[256, 100]], [['E', 'S']])
+        >>> energy
+        array([[1.05873094, 0.        ]])
+        '''
+        frequencies = np.asarray(frequencies, dtype=np.float64)
+        directions = np.asarray(directions)
+        if directions.dtype.kind in 'UO':
+            directions = np.vectorize(encode_direction, otypes=[np.int8])(directions)
+        if not np.isin(directions, (NORTH, EAST, SOUTH, WEST)).all():
+            raise ValueError("directions must be 'N', 'E', 'S' or 'W'")
+
+        energy = Receiver.convert_frequency_to_energy(frequencies)
+        sequences = frequencies.shape[0]
+        total_energy = np.zeros((sequences, len(self.receivers)))
+        photons_absorbed = np.zeros((sequences, len(self.receivers)))
+        for code in (NORTH, EAST, SOUTH, WEST):
+            sent = directions == code
+            total_energy += np.where(sent, energy, 0.0) @ self.incidence[code]
+            photons_absorbed += sent.astype(np.float64) @ self.incidence[code]
+
+        first_arrival = np.full((sequences, len(self.receivers)), np.inf)
+        e = 0
+        while e < len(self.symbols):
+            first_arrival = np.minimum(first_arrival, self.arrival[directions[:, e], e])
+            e += 1
+        activated = np.isfinite(first_arrival)
+        activation_times = np.where(activated, first_arrival, 0).astype(np.int64)
+        return total_energy, photons_absorbed.astype(np.int64), activation_times
@@ -0,0 +1,158 @@
+import input_parser
+
+'''
+PulseLoader - Sets the pulse sequence of a circuit's emitters from a pulse
+sequence file, streaming through the file in chunks of lines.
+
+Emitters are looked up by symbol in the circuit's symbol index, and the
+loader keeps count of the emitters whose pulse sequence is not set yet. In
+verbose mode (the default) it prints exactly what run.set_pulse_sequence has
+always printed: each line as it is applied, any error, and the emitters still
+left to set, which is only rebuilt when an emitter is set. In quiet mode
+nothing is printed, and each error is collected instead, prefixed with its
+line number.
+'''
+
+
+# roughly how many characters of the file are read at a time
+CHUNK_SIZE = 1 << 16
+
+
+class PulseLoader:
+
+
+    def __init__(self, circuit, quiet: bool = False):
+        '''
+        Initialises a PulseLoader instance given the circuit whose emitters it
+        sets.
+
+        circuit:     LaserCircuit - the circuit being loaded
+        quiet:       bool         - whether errors are collected in
+                                    diagnostics rather than printed, along
+                                    with everything else
+        unset_count: int          - how many emitters do not have their pulse
+                                    sequence set yet
+        remaining:   str | None   - the symbols of those emitters as printed,
+                                    or None if they need to be rebuilt
+        diagnostics: list[str]    - the errors found in quiet mode, each
+                                    prefixed with its line number
+
+        Parameters
+        ----------
+        circuit - the circuit to set the pulse sequence of
+        quiet   - True to collect errors instead of printing anything
+        '''
+        self.circuit = circuit
+        self.quiet = quiet
+        self.unset_count = 0
+        for emitter in circuit.emitters:
+            if not emitter.is_pulse_sequence_set():
+                self.unset_count += 1
+        self.remaining = None
+        self.diagnostics = []
+
+
+    def load(self, file_obj) -> list[str]:
+        '''
+        Reads every line of a pulse sequence file and sets the pulse sequence
+        of the emitters it names.
+
+        Parameters
+        ----------
+        file_obj - a file like object returned by open()
+
+        Returns
+        -------
+        The errors collected in quiet mode, or an empty list in verbose mode.
+        '''
+        if not self.quiet:
+            print('\nSetting pulse sequence...')
+            self.print_remaining_emitters()
+
+        line_number = 1
+        lines = file_obj.readlines(CHUNK_SIZE)
+        while lines:
+            for line in lines:
+                self.load_line(line_number, line.strip())
+                line_number += 1
+            lines = file_obj.readlines(CHUNK_SIZE)
+
+        if not self.quiet:
+            print('Pulse sequence set.\n')
+        return self.diagnostics
+
+
+    def load_line(self, line_number: int, line: str) -> None:
+        '''
+        Checks one line of a pulse sequence file and applies it.
+
+        Parameters
+        ----------
+        line_number - the number of the line, starting at 1
+        line        - the line, without surrounding whitespace
+        '''
+        pulse, error = input_parser.check_pulse_sequence(line)
+        if error is not None:
+            self.report(line_number, error)
+            return
+
+        symbol, frequency, direction = pulse
+        error = self.set_pulse(symbol, frequency, direction)
+        if not self.quiet:
+            print(f'Line {line_number}: {symbol} {frequency} {direction}')
+        if error is not None:
+            self.report(line_number, error)
+        if not self.quiet:
+            self.print_remaining_emitters()
+
+
+    def set_pulse(self, symbol: str, frequency: int, direction: str) -> str | None:
+        '''
+        Sets the pulse sequence of the emitter with the given symbol.
+
+        Parameters
+        ----------
+        symbol    - the symbol of the emitter
+        frequency - the frequency (THz) to set
+        direction - the direction to set
+
+        Returns
+        -------
+        An error message if there is no such emitter or its pulse sequence is
+        already set, else None.
+        '''
+        emitter = self.circuit.emitter_symbols.get(symbol)
+        if emitter is None:
+            return f'Error: emitter \'{symbol}\' does not exist'
+        if emitter.is_pulse_sequence_set():
+            return f'Error: Emitter \'{symbol}\' already has its pulse sequence set'
+
+        emitter.set_pulse_sequence(frequency, direction)
+        self.unset_count -= 1
+        self.remaining = None
+        return None
+
+
+    def report(self, line_number: int, error: str) -> None:
+        '''
+        Prints an error, or collects it in quiet mode.
+
+        Parameters
+        ----------
+        line_number - the line the error was found on
+        error       - the error message
+        '''
+        if self.quiet:
+            self.diagnostics.append(f'Line {line_number}: {error}')
+        else:
+            print(error)
+
+
+    def print_remaining_emitters(self) -> None:
+        '''Prints the symbols of the emitters left to set, if there are any.'''
+        if self.unset_count == 0:
+            return
+        if self.remaining is None:
+            self.remaining = ', '.join(emitter.symbol for emitter in self.circuit.emitters
+                                       if not emitter.is_pulse_sequence_set())
+        print(f'-- ({self.remaining})')
@@ -1,4 +1,5 @@
 from photon import Photon
+from symbols import symbol_key
 
 '''
 Receiver - A photodetector which absorbs photons and stores its energy. 
@@ -8,20 +9,29 @@ activated. An activated receiver can keep absorbing photons.
 
 You are free to add more attributes and methods, as long as you aren't
 modifying the existing scaffold.
+
+Receivers use __slots__ and share component_type through the class.
 '''
 
 
 class Receiver:
 
 
+    __slots__ = ('x', 'y', 'symbol', 'total_energy', 'photons_absorbed', 'activated', 'activation_time',
+                 'circuit')
+    component_type = 'receiver'
+
+
     def __init__(self, symbol: str, x: int, y: int):
         '''
         Initialises a Receiver instance with a given symbol, x and y value. 
         component_type is 'receiver', total_energy is 0.0, photons_absorbed is 0, 
         activated is False and activation_time is 0 by default.
 
-        component_type:   str   - represents the type of component ('receiver')
-        symbol:           str   - the symbol of this receiver ('R0' to 'R9')
+        component_type:   str   - represents the type of component ('receiver'),
+                                  shared by every receiver
+        symbol:           str   - the symbol of this receiver ('R0' to 'R9',
+                                  or beyond, see the symbols module)
         x:                int   - x position of this receiver 
         y:                int   - y position of this receiver
         total_energy:     float - the total energy (eV) this receiver has absorbed 
@@ -30,6 +40,10 @@ class Receiver:
         activated:        bool  - whether this receiver is activated or not       
         activation_time:  int   - the time (ns) in which this receiver was 
                                   activated
+        circuit:          LaserCircuit | None
+                                - the circuit keeping count of activated
+                                  receivers, told when this receiver is
+                                  activated (None by default)
 
         Parameters
         ----------
@@ -37,7 +51,6 @@ class Receiver:
         x      - the x position to set this receiver to
         y      - the y position to set this receiver to       
         '''
-        self.component_type = 'receiver'
         self.x = x
         self.y = y 
         self.symbol = symbol
@@ -45,6 +58,7 @@ class Receiver:
         self.photons_absorbed = 0
         self.activated = False
         self.activation_time = 0
+        self.circuit = None
 
     @staticmethod
     def convert_frequency_to_energy(frequency: int) -> float:
@@ -100,6 +114,8 @@ class Receiver:
         if self.photons_absorbed == 1:
             self.activated = True
             self.activation_time = timestamp
+            if self.circuit is not None:
+                self.circuit.count_activated_receiver()
         photon.got_absorbed()
         
         
@@ -135,7 +151,12 @@ class Receiver:
         >>> self.get_symbol()
         '0'
         '''
-        return self.symbol[1]
+        return self.symbol[1:]
+
+
+    def get_symbol_key(self) -> tuple[str, int]:
+        '''Returns the key receivers are sorted by symbol with (see symbols).'''
+        return symbol_key(self.symbol)
 
 
     def get_x(self) -> int:
@@ -0,0 +1,391 @@
+import os
+import io
+import sys
+import json
+import hashlib
+from circuit_result import CircuitResult
+
+'''
+ResultCache - An on-disk cache of the results of running circuits, so running
+an identical circuit again replays its results instead of simulating it.
+
+Entries are content addressed: the key is a hash of everything that decides
+the results of a run, which is the board size, the components (sorted, so the
+order they were added in does not matter), the pulse sequence, the state of
+the receivers, any photons already in the circuit, what is already drawn on
+the board, whether trails are drawn and traps detected, and the options
+passed to run_circuit. Runs with options that cannot be written as JSON are
+not cached. Runs that print more than max_bytes are not cached either, and
+stop being recorded as soon as they do. Each entry is a
+JSON file holding the final state of the receivers, the results written to
+the output files and everything run_circuit printed, along with a checksum.
+Entries that fail to parse or whose checksum does not match are deleted and
+treated as missing.
+
+The cache is kept under max_bytes by evicting the least recently used
+entries, using each file's modification time, which is updated on every hit.
+
+The cache fails open: if its directory cannot be created, read or written
+(e.g. it is read-only or the disk is full), a warning is printed to stderr
+and circuits are run without it from then on.
+
+Bump CACHE_VERSION whenever a change to the program changes the results or
+output of a run, so entries written by older versions are never used.
+'''
+
+
+CACHE_VERSION = 2
+DEFAULT_DIRECTORY = os.path.join(os.path.expanduser('~'), '.cache', 'laser_circuit')
+
+
+class Tee(io.TextIOBase):
+    '''
+    A text stream that writes everything to another stream while keeping a
+    copy of it, used to record what run_circuit prints. The copy is dropped
+    once it grows past a limit.
+    '''
+
+
+    def __init__(self, stream, limit: int):
+        '''
+        Initialises a Tee instance given the stream to write through to.
+
+        stream:     TextIO    - the stream everything is written to
+        limit:      int       - the most characters to keep a copy of
+        parts:      list[str] - everything written so far
+        size:       int       - the number of characters in parts
+        overflowed: bool      - whether more than limit characters were
+                                written, in which case parts is emptied and
+                                no more copies are kept
+
+        Parameters
+        ----------
+        stream - the stream to write through to
+        limit  - the most characters to keep a copy of
+        '''
+        self.stream = stream
+        self.limit = limit
+        self.parts = []
+        self.size = 0
+        self.overflowed = False
+
+
+    def write(self, text: str) -> int:
+        '''Writes text to stream and keeps a copy of it, up to limit.'''
+        if not self.overflowed:
+            self.size += len(text)
+            if self.size > self.limit:
+                self.overflowed = True
+                self.parts = []
+            else:
+                self.parts.append(text)
+        return self.stream.write(text)
+
+
+    def getvalue(self) -> str:
+        '''Returns everything written so far.'''
+        return ''.join(self.parts)
+
+
+class ResultCache:
+
+
+    def __init__(self, directory: str = DEFAULT_DIRECTORY, max_bytes: int = 64 * 2**20):
+        '''
+        Initialises a ResultCache instance storing its entries in directory,
+        which is created if it does not exist.
+
+        directory: str  - the directory holding the entries
+        max_bytes: int  - the most bytes the entries may take up together
+        enabled:   bool - whether the cache is used, which is False once it
+                          has failed
+
+        Parameters
+        ----------
+        directory - the directory to store entries in
+        max_bytes - the size to evict entries down to
+        '''
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.enabled = True
+        try:
+            os.makedirs(directory, exist_ok=True)
+        except OSError as error:
+            self.disable(error)
+
+
+    def disable(self, error: OSError) -> None:
+        '''
+        Warns on stderr that the cache failed and stops using it.
+
+        Parameters
+        ----------
+        error - the error the cache failed with
+        '''
+        print(f'Warning: cannot use the result cache ({error}), running without it', file=sys.stderr)
+        self.enabled = False
+
+
+    @staticmethod
+    def make_key(circuit, options: dict) -> str | None:
+        '''
+        Returns the hash identifying a run of circuit with the given
+        run_circuit options, not including output_dir, or None if the
+        options cannot be written as JSON.
+
+        Parameters
+        ----------
+        circuit - the circuit about to be run
+        options - the keyword arguments it will be run with
+        '''
+        lines = [
+            f'version {CACHE_VERSION}',
+            f'size {circuit.width} {circuit.height}',
+            f'clock {circuit.clock} trap_detection {circuit.trap_detection} trails {circuit.trails}',
+            f'board {circuit.board_displayer.get_checksum()}',
+            f'exit {circuit.exit_time} {circuit.exit_trails}',
+        ]
+        lines += sorted(f'emitter {emitter.symbol} {emitter.x} {emitter.y} {emitter.frequency} {emitter.direction}'
+                        for emitter in circuit.emitters)
+        lines += sorted(f'receiver {receiver.symbol} {receiver.x} {receiver.y} {receiver.total_energy!r} '
+                        f'{receiver.photons_absorbed} {receiver.activated} {receiver.activation_time}'
+                        for receiver in circuit.receivers)
+        lines += sorted(f'mirror {mirror.symbol} {mirror.x} {mirror.y}' for mirror in circuit.mirrors)
+        checkpoints = circuit.trap_detector.checkpoints
+        lines += [f'photon {photon.x} {photon.y} {photon.frequency} {photon.direction} {photon.absorbed} '
+                  f'{photon.trapped} {checkpoints.get(photon)}' for photon in circuit.photons]
+        photon_index = {id(photon): index for index, photon in enumerate(circuit.photons)}
+        lines += [f'trap {photon_index.get(id(photon))} {time} {period}'
+                  for photon, time, period in circuit.trap_detector.traps]
+        try:
+            lines.append(json.dumps({name: value for name, value in options.items() if name != 'output_dir'},
+                                    sort_keys=True))
+        except (TypeError, ValueError):
+            return None
+        return hashlib.sha256('\n'.join(lines).encode()).hexdigest()
+
+
+    def get_path(self, key: str) -> str:
+        '''Returns the path of the entry for key.'''
+        return os.path.join(self.directory, f'{key}.json')
+
+
+    def get(self, key: str) -> dict | None:
+        '''
+        Returns the entry for key, or None if there is no valid entry or the
+        cache is disabled. An entry that is found to be invalid is deleted.
+
+        Parameters
+        ----------
+        key - the key of the entry
+        '''
+        if not self.enabled:
+            return None
+        path = self.get_path(key)
+        try:
+            with open(path, 'r') as file:
+                stored = json.load(file)
+            entry = stored['entry']
+            valid = stored['checksum'] == self.checksum(entry) and entry['key'] == key
+        except FileNotFoundError:
+            return None
+        except OSError as error:
+            self.disable(error)
+            return None
+        except (ValueError, KeyError, TypeError):
+            valid = False
+            entry = None
+
+        if not valid:
+            self.remove(path)
+            return None
+        try:
+            os.utime(path)
+        except OSError as error:
+            self.disable(error)
+        return entry
+
+
+    def put(self, key: str, entry: dict) -> None:
+        '''
+        Stores entry under key, then evicts the least recently used entries
+        until the cache fits in max_bytes. Nothing is stored if the cache is
+        disabled or the entry alone is larger than max_bytes.
+
+        Parameters
+        ----------
+        key   - the key of the entry
+        entry - the entry to store
+        '''
+        if not self.enabled:
+            return
+        entry = dict(entry, key=key)
+        contents = json.dumps({'checksum': self.checksum(entry), 'entry': entry})
+        if len(contents.encode()) > self.max_bytes:
+            return
+        path = self.get_path(key)
+        temporary = f'{path}.{os.getpid()}.tmp'
+        try:
+            with open(temporary, 'w') as file:
+                file.write(contents)
+            os.replace(temporary, path)
+        except OSError as error:
+            self.disable(error)
+            self.remove(temporary)
+            return
+        self.evict()
+
+
+    def evict(self) -> None:
+        '''Removes the least recently used entries until the cache fits.'''
+        entries = []
+        total = 0
+        try:
+            names = os.listdir(self.directory)
+        except OSError as error:
+            self.disable(error)
+            return
+        for name in names:
+            if not name.endswith('.json'):
+                continue
+            try:
+                status = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                # removed by another process sharing the cache
+                continue
+            entries.append((status.st_mtime, name, status.st_size))
+            total += status.st_size
+
+        entries.sort()
+        i = 0
+        while total > self.max_bytes and i < len(entries):
+            mtime, name, size = entries[i]
+            if not self.remove(os.path.join(self.directory, name)):
+                return
+            total -= size
+            i += 1
+
+
+    def remove(self, path: str) -> bool:
+        '''
+        Removes a file from the cache, which another process sharing the
+        cache may already have removed.
+
+        Parameters
+        ----------
+        path - the path of the file
+
+        Returns
+        -------
+        False if the file could not be removed and the cache was disabled,
+        else True.
+        '''
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as error:
+            if self.enabled:
+                self.disable(error)
+            return False
+        return True
+
+
+    @staticmethod
+    def checksum(entry: dict) -> str:
+        '''Returns the checksum of an entry.'''
+        return hashlib.sha256(json.dumps(entry, sort_keys=True).encode()).hexdigest()
+
+
+def run_cached(circuit, cache: ResultCache | None, **options) -> CircuitResult:
+    '''
+    Runs circuit with circuit.run_circuit(**options), unless cache holds the
+    results of an identical run. In that case, the receivers and clock are
+    set to their final state, everything the run printed is printed again and
+    the output files are written, without running the circuit. Photons and
+    the board are left as they are.
+
+    Parameters
+    ----------
+    circuit - the circuit to run, with the pulse sequence of its emitters set
+    cache   - the cache to use, or None to always run the circuit
+    options - the keyword arguments to pass to run_circuit
+
+    Returns
+    -------
+    The results of running the circuit.
+    '''
+    if cache is None or not cache.enabled:
+        return circuit.run_circuit(**options)
+
+    key = ResultCache.make_key(circuit, options)
+    if key is None:
+        return circuit.run_circuit(**options)
+    entry = cache.get(key)
+    if entry is not None:
+        return restore_run(circuit, entry, options.get('output_dir', '/home/output'))
+
+    stdout = sys.stdout
+    tee = Tee(stdout, cache.max_bytes)
+    sys.stdout = tee
+    try:
+        result = circuit.run_circuit(**options)
+    finally:
+        sys.stdout = stdout
+
+    if tee.overflowed:
+        return result
+    cache.put(key, {
+        'stdout': tee.getvalue(),
+        'clock': result.get_clock(),
+        'emit_photons': result.emit_photons,
+        'activation_times': result.get_activation_times(),
+        'total_energy': result.get_total_energy(),
+        'trapped_photons': result.get_trapped_photons(),
+        'outputs': {
+            'emit_photons.out': result.emit_photons_output(),
+            'activation_times.out': result.activation_times_output(),
+            'total_energy.out': result.total_energy_output(),
+        },
+        'receivers': [(receiver.symbol, receiver.total_energy, receiver.photons_absorbed, receiver.activated,
+                       receiver.activation_time) for receiver in circuit.receivers],
+    })
+    return result
+
+
+def restore_run(circuit, entry: dict, output_dir: str | None) -> CircuitResult:
+    '''
+    Replays a cached run of circuit: sets its receivers and clock, prints
+    what the run printed and writes the output files into output_dir.
+
+    Parameters
+    ----------
+    circuit    - the circuit the entry is for
+    entry      - the cache entry
+    output_dir - the directory to write the output files into, or None
+    '''
+    receivers = {receiver.symbol: receiver for receiver in circuit.receivers}
+    activated = 0
+    for symbol, total_energy, photons_absorbed, is_activated, activation_time in entry['receivers']:
+        receiver = receivers[symbol]
+        receiver.total_energy = total_energy
+        receiver.photons_absorbed = photons_absorbed
+        receiver.activated = is_activated
+        receiver.activation_time = activation_time
+        activated += is_activated
+    circuit.activated_receiver_count = activated
+    circuit.clock = entry['clock']
+
+    result = CircuitResult(
+        entry['clock'],
+        entry['emit_photons'],
+        [tuple(item) for item in entry['activation_times']],
+        [tuple(item) for item in entry['total_energy']],
+        entry['trapped_photons'],
+    )
+    sys.stdout.write(entry['stdout'])
+    if output_dir is not None:
+        for name, contents in entry['outputs'].items():
+            with open(os.path.join(output_dir, name), 'w') as file:
+                file.write(contents)
+    return result
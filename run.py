@@ -5,12 +5,16 @@ from receiver import Receiver
 from mirror import Mirror
 from laser_circuit import LaserCircuit
 from board_displayer import BoardDisplayer
+from result_cache import ResultCache, run_cached
+from symbols import EMITTER_LETTERS
+from pulse_loader import PulseLoader
 
 '''
 run - Runs the entire program. It needs to take in the inputs and process them
 into setting up the circuit. The user can specify optional flags to perform
 additional steps, such as -RUN-MY-CIRCUIT to run the circuit and -ADD-MY-MIRRORS
-to include mirrors in the circuit.
+to include mirrors in the circuit. Runs are replayed from the result cache when
+an identical circuit has been run before, unless -NO-CACHE is given.
 
 You are free to add more functions, as long as you aren't modifying the
 existing scaffold.
@@ -51,6 +55,22 @@ def is_add_my_mirrors_enabled(args: list[str]) -> bool:
     return False
 
 
+def is_no_cache_enabled(args: list[str]) -> bool:
+    '''
+    Returns whether or not '-NO-CACHE' is in args.
+
+    Parameters
+    ----------
+    args - the command line arguments of the program
+    '''
+    i = 0
+    while i < len(args):
+        if args[i] == '-NO-CACHE':
+            return True
+        i += 1
+    return False
+
+
 
 def initialise_circuit() -> LaserCircuit:
     # only requires implementation once you reach GET-MY-INPUTS
@@ -79,8 +99,11 @@ def initialise_circuit() -> LaserCircuit:
 
     print('\nAdding emitter(s)...')
 
+    # the symbols 'A' to 'J' run out after ten emitters, so adding stops there
+    # unless wider symbols such as 'E123' are being used
     count_emitters = 0
-    while count_emitters < 10:
+    wide_symbols = False
+    while count_emitters < 10 or wide_symbols:
         emitters = input('> ')
         if emitters == 'END EMITTERS':
             break
@@ -89,19 +112,23 @@ def initialise_circuit() -> LaserCircuit:
             continue
         if emitter and circuit.add_emitter(emitter):
             count_emitters += 1
+            wide_symbols = wide_symbols or emitter.symbol not in EMITTER_LETTERS
  
     print(f'{count_emitters} emitter(s) added.')
 
     print('\nAdding receiver(s)...')
  
+    # likewise, 'R0' to 'R9' run out after ten receivers
     count_receivers = 0
-    while count_receivers < 10:
+    wide_symbols = False
+    while count_receivers < 10 or wide_symbols:
         receivers = input('> ')
         if receivers == 'END RECEIVERS':
             break
         receiver = input_parser.parse_receiver(receivers)
         if receiver and circuit.add_receiver(receiver):
             count_receivers += 1
+            wide_symbols = wide_symbols or len(receiver.symbol) > 2
 
     print(f'{count_receivers} receiver(s) added.\n')
     return circuit
@@ -120,58 +147,11 @@ def set_pulse_sequence(circuit: LaserCircuit, file_obj) -> None:
     ---------
     circuit - The circuit to set the pulse sequence for.
     file_obj - A file like object returned by the open()
-    '''
-    print('\nSetting pulse sequence...')
-
-    def print_remaining_emitters():
-        remaining_emitters = ''
-        i = 0
-        while i < len(circuit.emitters):
-            if not circuit.emitters[i].pulse_sequence_set:
-                remaining_emitters += circuit.emitters[i].symbol + ', '
-            i += 1
-        if remaining_emitters.strip():
-            print(f"-- ({remaining_emitters.strip(', ')})")
-
-    print_remaining_emitters()
-
-    line_number = 1
-    line = file_obj.readline()
-    while line:
-        line = line.strip()
-        result = input_parser.parse_pulse_sequence(line)
-        if result is None:
-            line_number += 1
-            line = file_obj.readline()
-            continue
-
-        symbol, frequency, direction = result
-
-        emitter_found = False
-        already_set = False
-        i = 0
-        while i < len(circuit.emitters):
-            if circuit.emitters[i].symbol == symbol:
-                emitter_found = True
-                if circuit.emitters[i].pulse_sequence_set:
-                    already_set = True
-                else:
-                    circuit.emitters[i].set_pulse_sequence(frequency, direction)
-                    circuit.emitters[i].pulse_sequence_set = True
-                break
-            i += 1
-
-        print(f'Line {line_number}: {symbol} {frequency} {direction}')
-        if not emitter_found:
-            print(f'Error: emitter \'{symbol}\' does not exist')
-        elif already_set:
-            print(f'Error: Emitter \'{symbol}\' already has its pulse sequence set')
-        
-        print_remaining_emitters()
 
-        line_number += 1
-        line = file_obj.readline()
-    print('Pulse sequence set.\n')
+    The file is streamed through a PulseLoader in verbose mode; use a
+    PulseLoader in quiet mode directly to collect the errors instead.
+    '''
+    PulseLoader(circuit).load(file_obj)
 
 
 def add_mirrors(circuit: LaserCircuit) -> None:
@@ -231,7 +211,7 @@ def main(args: list[str]) -> None:
         try:
             with open('/home/input/pulse_sequence.in', 'r') as file:
                 set_pulse_sequence(circuit, file)
-                circuit.run_circuit()
+            run_cached(circuit, None if is_no_cache_enabled(args) else ResultCache())
         except FileNotFoundError:
             print('\nError: -RUN-MY-CIRCUIT flag detected but /home/input/pulse_sequence.in does not exist')
             return
@@ -7,6 +7,12 @@ Since most students taking this course have not done algorithms, you are not
 expected to know how to sort. You should have the ability to use our sort
 functions to handle it in your program when needed.
 
+The sorts are stable keyed sorts, so receivers tied on activation time or
+total energy always come out in symbol order, as documented. The exchange
+sorts they replaced were not stable and could leave ties out of symbol order
+(e.g. R1 before R0 when both activated at 4ns), so reports with ties can
+differ from older versions.
+
 You are free to add more functions, as long as you aren't modifying the
 existing scaffold.
 '''
@@ -17,7 +23,8 @@ def sort_receivers_by_symbol(receivers: list[Receiver]) -> list[Receiver]:
     '''
     This is a helper function which returns a new list of the same receivers
     passed in, sorted by their symbol in ascending order. This is used to resolve
-    ties when sorting by other values.
+    ties when sorting by other values. Symbols are sorted naturally, so 'R9'
+    comes before 'R10' (see symbols).
 
     Parameters
     ----------
@@ -28,27 +35,8 @@ def sort_receivers_by_symbol(receivers: list[Receiver]) -> list[Receiver]:
     A new list containing the same receivers, sorted by their symbol in
     ascending order.
     '''
-    # copy the receivers objects into a new list so we don't modify the original
-    new_list = receivers.copy()
-
-    # perform a bubble sort
-    i = 0
-    # traverse through all receivers in the list
-    while i < len(new_list):
-        j = i
-        while j < len(new_list):
-            # compare the symbols of the two adjacent receivers
-            # swap them if the component at the front has a larger symbol
-            if new_list[i].get_symbol() > new_list[j].get_symbol():
-                # swap the positions of the receivers in the list
-                temp = new_list[i]
-                new_list[i] = new_list[j]
-                new_list[j] = temp
-            j += 1
-            # at this point, all elements from 0 to i is sorted
-        i += 1
-
-    return new_list
+    # sorted copies the receivers into a new list so we don't modify the original
+    return sorted(receivers, key=Receiver.get_symbol_key)
 
 
 def sort_receivers_by_activation_time(receivers: list[Receiver]) -> list[Receiver]:
@@ -67,22 +55,9 @@ def sort_receivers_by_activation_time(receivers: list[Receiver]) -> list[Receive
     A new list containing the same receivers, sorted by their activation times
     in ascending order, followed by a sorting of their symbol in ascending order.
     '''
-    # sort our receivers by symbol to resolve ties
-    new_list = sort_receivers_by_symbol(receivers)    
-
-    i = 0
-    while i < len(new_list):
-        j = i
-        while j < len(new_list):
-            # compare the activation time of the two adjacent receivers
-            # swap them if the receiver at the front has a larger activation time
-            if new_list[i].get_activation_time() > new_list[j].get_activation_time():
-                temp = new_list[i]
-                new_list[i] = new_list[j]
-                new_list[j] = temp
-            j += 1
-        i += 1
-
+    # sorting is stable, so sorting by symbol first resolves ties
+    new_list = sort_receivers_by_symbol(receivers)
+    new_list.sort(key=Receiver.get_activation_time)
     return new_list
 
 
@@ -102,20 +77,29 @@ def sort_receivers_by_total_energy(receivers: list[Receiver]) -> list[Receiver]:
     A new list containing the same receivers, sorted by their total energy in
     descending order, followed by a sorting of their symbol in ascending order.
     '''
-    # sort our receivers by symbol to resolve ties
+    # sorting is stable, even in reverse, so sorting by symbol first resolves ties
     new_list = sort_receivers_by_symbol(receivers)
+    new_list.sort(key=Receiver.get_total_energy, reverse=True)
+    return new_list
 
-    i = 0
-    while i < len(new_list):
-        j = i
-        while j < len(new_list):
-            # compare the total energy of the two adjacent receivers
-            # swap them if the receiver at the front has a smaller total energy
-            if new_list[i].get_total_energy() < new_list[j].get_total_energy():
-                temp = new_list[i]
-                new_list[i] = new_list[j]
-                new_list[j] = temp
-            j += 1
-        i += 1
 
-    return new_list
+def sort_receivers_for_report(receivers: list[Receiver]) -> tuple[list[Receiver], list[Receiver]]:
+    '''
+    Returns both orderings needed to report on a circuit's receivers, only
+    including receivers that have been activated. The receivers are filtered
+    and sorted by symbol once, and both orderings are sorted from that.
+
+    Parameters
+    ----------
+    receivers - a list of receivers
+
+    Returns
+    -------
+    A tuple of two new lists containing the activated receivers. The first
+    is sorted the same as sort_receivers_by_activation_time and the second
+    the same as sort_receivers_by_total_energy.
+    '''
+    by_symbol = sort_receivers_by_symbol([receiver for receiver in receivers if receiver.is_activated()])
+    by_activation_time = sorted(by_symbol, key=Receiver.get_activation_time)
+    by_total_energy = sorted(by_symbol, key=Receiver.get_total_energy, reverse=True)
+    return by_activation_time, by_total_energy
@@ -0,0 +1,359 @@
+import sys
+import hashlib
+from bisect import bisect_left
+from emitter import Emitter
+from receiver import Receiver
+from photon import Photon
+from mirror import Mirror
+from symbols import get_glyph
+from board_displayer import PHOTON, clip_region
+
+'''
+SparseBoardDisplayer - A board displayer for very large boards that are
+mostly empty, with the same methods as BoardDisplayer.
+
+Instead of allocating every cell up front, only what is drawn on the board
+is stored: the glyph of each component, kept in a dict of rows, and the
+trails photons leave, kept as sorted spans of cells along each row and each
+column. A photon travelling across the whole board is then a single span,
+however long it is. Components are drawn over trails, which gives the same
+board as BoardDisplayer, where a trail never replaces a component; removing
+a component also cuts any trail out of its cell, since on BoardDisplayer the
+cell is left empty.
+
+The board is only laid out as bytes when it is rendered, one region at a
+time. print_board writes a large board a band of rows at a time, so it never
+holds all of it in memory, and render_region renders any part of it.
+
+LaserCircuit uses a SparseBoardDisplayer for boards with more than
+SPARSE_THRESHOLD cells.
+'''
+
+
+# boards with more cells than this are stored sparsely
+SPARSE_THRESHOLD = 1 << 24
+
+# roughly how many bytes of the board print_board lays out at a time
+BAND_SIZE = 1 << 22
+
+
+def add_span(spans: list[tuple[int, int]], first: int, last: int) -> None:
+    '''
+    Adds the cells from first to last (inclusive) to a sorted list of
+    disjoint spans, merging it with the spans it overlaps or touches.
+
+    Parameters
+    ----------
+    spans - the (first, last) spans of cells along a row or column
+    first - the first cell to add
+    last  - the last cell to add
+    '''
+    i = bisect_left(spans, (first,))
+    if i > 0 and spans[i - 1][1] >= first - 1:
+        i -= 1
+    j = bisect_left(spans, (last + 2,))
+    if i < j:
+        first = min(first, spans[i][0])
+        last = max(last, spans[j - 1][1])
+    spans[i:j] = [(first, last)]
+
+
+def cut_span(spans: list[tuple[int, int]], cell: int) -> None:
+    '''
+    Takes one cell out of a sorted list of disjoint spans, splitting the span
+    holding it.
+
+    Parameters
+    ----------
+    spans - the (first, last) spans of cells along a row or column
+    cell  - the cell to take out
+    '''
+    i = bisect_left(spans, (cell + 1,)) - 1
+    if i < 0 or spans[i][1] < cell:
+        return
+    first, last = spans[i]
+    pieces = []
+    if first < cell:
+        pieces.append((first, cell - 1))
+    if cell < last:
+        pieces.append((cell + 1, last))
+    spans[i:i + 1] = pieces
+
+
+def covers(spans: list[tuple[int, int]] | None, cell: int) -> bool:
+    '''
+    Returns whether a sorted list of disjoint spans holds a cell.
+
+    Parameters
+    ----------
+    spans - the (first, last) spans of cells along a row or column, or None
+    cell  - the cell to look for
+    '''
+    if not spans:
+        return False
+    i = bisect_left(spans, (cell + 1,)) - 1
+    return i >= 0 and spans[i][1] >= cell
+
+
+class SparseBoardDisplayer:
+
+
+    def __init__(self, width: int, height: int):
+        '''
+        Initialises a SparseBoardDisplayer instance given a width and height
+        which is the size of the circuit board. Nothing is drawn on it yet.
+
+        width:         int                                 - the width of
+                                                             this board
+        height:        int                                 - the height of
+                                                             this board
+        rows:          dict[int, dict[int, int]]           - the byte value
+                                                             of the glyph of
+                                                             each component,
+                                                             keyed by y then x
+        row_trails:    dict[int, list[tuple[int, int]]]    - the spans of x
+                                                             positions photons
+                                                             have passed
+                                                             through along
+                                                             each row, keyed
+                                                             by y
+        column_trails: dict[int, list[tuple[int, int]]]    - the spans of y
+                                                             positions photons
+                                                             have passed
+                                                             through along
+                                                             each column,
+                                                             keyed by x
+
+        Parameters
+        ----------
+        width  - the width to set this board to
+        height - the height to set this board to
+        '''
+        self.width = width
+        self.height = height
+        self.rows = {}
+        self.row_trails = {}
+        self.column_trails = {}
+
+
+    def get_cell(self, x: int, y: int) -> str:
+        '''
+        Returns the symbol on the board at (x, y), being ' ' for an empty cell.
+
+        Parameters
+        ----------
+        x - the x position of the cell
+        y - the y position of the cell
+        '''
+        glyph = self.rows.get(y, {}).get(x)
+        if glyph is not None:
+            return chr(glyph)
+        if covers(self.row_trails.get(y), x) or covers(self.column_trails.get(x), y):
+            return chr(PHOTON)
+        return ' '
+
+
+    def add_component_to_board(self, component: Emitter | Receiver | Mirror) -> None:
+        '''
+        Adds the symbol of the component on the board at its assigned
+        position, drawn as one character (see symbols.get_glyph).
+
+        Parameters
+        ----------
+        component: the component to add its symbol on the board
+        '''
+        if 0 <= component.x < self.width and 0 <= component.y < self.height:
+            symbol = get_glyph(component.symbol, component.get_component_type())
+            self.rows.setdefault(component.y, {})[component.x] = ord(symbol)
+
+
+    def remove_component_from_board(self, component: Emitter | Receiver | Mirror) -> None:
+        '''
+        Clears the cell of the board at the position of a component that was
+        taken out of the circuit, including any trail drawn through it.
+
+        Parameters
+        ----------
+        component: the component to remove its symbol from the board
+        '''
+        x = component.x
+        y = component.y
+        row = self.rows.get(y)
+        if row is not None and x in row:
+            del row[x]
+            if not row:
+                del self.rows[y]
+        if y in self.row_trails:
+            cut_span(self.row_trails[y], x)
+        if x in self.column_trails:
+            cut_span(self.column_trails[x], y)
+
+
+    def add_photon_to_board(self, photon: Photon) -> None:
+        '''
+        Adds the symbol of the photon ('.') on the board at its current
+        position, unless there already is a component there.
+
+        Parameters
+        ----------
+        photon: the photon to add its symbol on the board
+        '''
+        if 0 <= photon.x < self.width and 0 <= photon.y < self.height:
+            add_span(self.row_trails.setdefault(photon.y, []), photon.x, photon.x)
+
+
+    def add_path_to_board(self, x: int, y: int, direction: str, length: int) -> None:
+        '''
+        Adds the photon symbol on the board for each of the length cells a
+        photon passes through when it travels from (x, y) in the given
+        direction, not including (x, y) itself, as one span. Cells that hold
+        a component still show the component.
+
+        Parameters
+        ----------
+        x         - the x position the photon starts from
+        y         - the y position the photon starts from
+        direction - the direction the photon travels in ('N', 'E', 'S' or 'W')
+        length    - the number of cells the photon passes through
+        '''
+        if length <= 0:
+            return
+        if direction == 'E' or direction == 'W':
+            if not 0 <= y < self.height:
+                return
+            if direction == 'E':
+                first, last = x + 1, x + length
+            else:
+                first, last = x - length, x - 1
+            first = max(first, 0)
+            last = min(last, self.width - 1)
+            if first <= last:
+                add_span(self.row_trails.setdefault(y, []), first, last)
+        elif direction == 'N' or direction == 'S':
+            if not 0 <= x < self.width:
+                return
+            if direction == 'S':
+                first, last = y + 1, y + length
+            else:
+                first, last = y - length, y - 1
+            first = max(first, 0)
+            last = min(last, self.height - 1)
+            if first <= last:
+                add_span(self.column_trails.setdefault(x, []), first, last)
+
+
+    def add_cells_to_board(self, cells: list[tuple[int, int]]) -> None:
+        '''
+        Adds the photon symbol on the board at each (x, y) position in cells
+        that a photon has passed through. Cells that hold a component still
+        show the component.
+
+        Parameters
+        ----------
+        cells - the (x, y) positions photons have passed through
+        '''
+        for x, y in cells:
+            add_span(self.row_trails.setdefault(y, []), x, x)
+
+
+    def draw_rows(self, left: int, right: int, top: int, bottom: int) -> bytearray:
+        '''
+        Lays out the rows from top up to (not including) bottom of the
+        columns from left up to (not including) right as they are printed,
+        with the side borders and newlines but not the top and bottom
+        borders. The region must lie within the board.
+
+        Parameters
+        ----------
+        left   - the first x position to draw
+        right  - the x position after the last one to draw
+        top    - the first y position to draw
+        bottom - the y position after the last one to draw
+        '''
+        width = right - left
+        stride = width + 3
+        rows = bytearray((b'|' + b' ' * width + b'|\n') * (bottom - top))
+
+        for x, spans in self.column_trails.items():
+            if not left <= x < right:
+                continue
+            i = max(bisect_left(spans, (top,)) - 1, 0)
+            while i < len(spans) and spans[i][0] < bottom:
+                first = max(spans[i][0], top)
+                last = min(spans[i][1], bottom - 1)
+                if first <= last:
+                    start = stride * (first - top) + 1 + x - left
+                    rows[start:start + stride * (last - first) + 1:stride] = bytes([PHOTON]) * (last - first + 1)
+                i += 1
+
+        y = top
+        while y < bottom:
+            offset = stride * (y - top) + 1 - left
+            spans = self.row_trails.get(y)
+            if spans:
+                i = max(bisect_left(spans, (left,)) - 1, 0)
+                while i < len(spans) and spans[i][0] < right:
+                    first = max(spans[i][0], left)
+                    last = min(spans[i][1], right - 1)
+                    if first <= last:
+                        rows[offset + first:offset + last + 1] = bytes([PHOTON]) * (last - first + 1)
+                    i += 1
+            row = self.rows.get(y)
+            if row:
+                for x, glyph in row.items():
+                    if left <= x < right:
+                        rows[offset + x] = glyph
+            y += 1
+        return rows
+
+
+    def get_checksum(self) -> str:
+        '''Returns a hash of everything drawn on the board.'''
+        state = (
+            sorted((y, sorted(row.items())) for y, row in self.rows.items() if row),
+            sorted((y, spans) for y, spans in self.row_trails.items() if spans),
+            sorted((x, spans) for x, spans in self.column_trails.items() if spans),
+        )
+        return hashlib.sha256(repr(state).encode()).hexdigest()
+
+
+    def print_board(self) -> None:
+        '''
+        Prints a formatted board with the border included, exactly as
+        BoardDisplayer.print_board does, laying out a band of rows at a time.
+        '''
+        border = '+' + '-' * self.width + '+\n'
+        band = max(BAND_SIZE // (self.width + 3), 1)
+        sys.stdout.write(border)
+        top = 0
+        while top < self.height:
+            bottom = min(top + band, self.height)
+            sys.stdout.write(self.draw_rows(0, self.width, top, bottom).decode('latin-1'))
+            top = bottom
+        sys.stdout.write(border)
+
+
+    def render_board(self) -> str:
+        '''
+        Returns the formatted board with the border included, exactly as
+        print_board prints it.
+        '''
+        return self.render_region(0, 0, self.width, self.height)
+
+
+    def render_region(self, x: int, y: int, width: int, height: int) -> str:
+        '''
+        Returns the formatted region of the board width cells wide and height
+        cells high with its top left cell at (x, y), with a border around
+        it. The region is clipped to the board.
+
+        Parameters
+        ----------
+        x      - the x position of the left column of the region
+        y      - the y position of the top row of the region
+        width  - the width of the region
+        height - the height of the region
+        '''
+        left, top, right, bottom = clip_region(x, y, width, height, self.width, self.height)
+        border = '+' + '-' * (right - left) + '+\n'
+        return border + self.draw_rows(left, right, top, bottom).decode('latin-1') + border
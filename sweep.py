@@ -0,0 +1,353 @@
+import os
+import sys
+from array import array
+from bisect import bisect_left
+from collections import deque
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+import input_parser
+from laser_circuit import LaserCircuit
+from circuit_result import CircuitResult
+from compiled_circuit import CompiledCircuit
+from circuit_loader import load_circuit
+from direction import MIRROR_SYMBOLS
+
+'''
+sweep - Runs many variants of one circuit, each placing extra mirrors on the
+same base board, across a pool of worker processes.
+
+The mirrors of the base circuit are written into a block of shared memory as
+the sorted flat indices (y * width + x) of their cells, followed by the index
+of each one's symbol in MIRROR_SYMBOLS, so each worker reads the layout
+straight out of it when it starts instead of being sent a copy, and the
+memory used only depends on the number of mirrors, not the size of the board.
+The emitters and receivers are few and are sent as they are. Each worker
+compiles the base circuit once, lazily, and keeps the shared memory open. A
+variant's mirrors are checked one at a time against the base mirrors (with a
+binary search of their cells), the emitters, the receivers and the variant's
+earlier mirrors, with the same checks and error messages as add_mirror, and the
+variant is run through CompiledCircuit.with_mirrors, so the work done per
+variant depends only on its mirrors and the paths of its photons, not on the
+size of the board. This gives the same receiver results as run_circuit.
+
+Variants are read from the iterable given to sweep in chunks, with a bounded
+number of chunks in flight, so a generator of variants is streamed rather
+than read all at once.
+
+Usage: python sweep.py <circuit file> <variants file> [<workers>]
+where <circuit file> is read by circuit_loader and each line of <variants
+file> is a variant in the format
+
+    <variant id>: <mirror>; <mirror>; ...
+
+with each <mirror> given as a mirror is added to a circuit, e.g. '/ 3 4'.
+'''
+
+
+# how many variants a worker runs per task, and how many tasks per worker
+# are queued at once
+CHUNK_SIZE = 16
+TASKS_PER_WORKER = 4
+
+# the base circuit a worker process runs variants of, as its compiled circuit,
+# the shared memory holding its mirrors, views of the sorted cells and the
+# symbols of the mirrors in it, and the symbol of the emitter and of the
+# receiver at each position
+base = None
+
+
+def share_mirrors(circuit: LaserCircuit) -> SharedMemory:
+    '''
+    Writes the mirrors of circuit into a new block of shared memory. The
+    caller is responsible for closing and unlinking it.
+
+    Parameters
+    ----------
+    circuit - the base circuit
+
+    Returns
+    -------
+    The shared memory, holding the flat index of each mirror's cell as a
+    sorted array of 8 byte integers, followed by the index of each mirror's
+    symbol in MIRROR_SYMBOLS as one byte, in the same order.
+    '''
+    mirrors = sorted((mirror.y * circuit.width + mirror.x, MIRROR_SYMBOLS.index(mirror.symbol))
+                     for mirror in circuit.mirrors)
+    count = len(mirrors)
+    grid = SharedMemory(create=True, size=max(1, 9 * count))
+    grid.buf[:8 * count] = array('q', [cell for cell, symbol in mirrors]).tobytes()
+    grid.buf[8 * count:9 * count] = bytes(symbol for cell, symbol in mirrors)
+    return grid
+
+
+def start_worker(name: str, count: int, width: int, height: int, emitters: list[tuple],
+                 receivers: list[tuple]) -> None:
+    '''
+    Compiles the base circuit out of shared memory for a worker process,
+    keeping the shared memory open for checking the mirrors of variants.
+    Called once in each worker process when the pool starts.
+
+    Parameters
+    ----------
+    name      - the name of the shared memory holding the mirrors
+    count     - the number of mirrors
+    width     - the width of the board
+    height    - the height of the board
+    emitters  - the emitters, as (symbol, x, y, frequency, direction)
+    receivers - the receivers, as (symbol, x, y)
+    '''
+    global base
+    grid = SharedMemory(name=name)
+    cells = grid.buf[:8 * count].cast('q')
+    symbols = grid.buf[8 * count:9 * count]
+    mirrors = [(MIRROR_SYMBOLS[symbols[i]], cells[i] % width, cells[i] // width) for i in range(count)]
+    compiled = CompiledCircuit(width, height, emitters, receivers, mirrors, resolve_all=False)
+    emitter_grid = {(x, y): symbol for symbol, x, y, frequency, direction in emitters}
+    receiver_grid = {(x, y): symbol for symbol, x, y in receivers}
+    base = (compiled, grid, cells, symbols, emitter_grid, receiver_grid)
+
+
+def check_variant_mirror(x: int, y: int, placed: dict[tuple[int, int], str]) -> str | None:
+    '''
+    Performs the checks of LaserCircuit.add_mirror on a mirror of a variant
+    against the worker's base circuit and the variant's mirrors placed
+    before it.
+
+    Parameters
+    ----------
+    x      - the x position of the mirror
+    y      - the y position of the mirror
+    placed - the symbol of each mirror of the variant placed so far
+
+    Returns
+    -------
+    The error message of the first check that fails, or None if all checks
+    pass.
+    '''
+    compiled, grid, cells, symbols, emitter_grid, receiver_grid = base
+    if x >= compiled.width or y >= compiled.height or x < 0 or y < 0:
+        return f'Error: position ({x}, {y}) is out-of-bounds of {compiled.width}x{compiled.height} circuit board'
+    if (x, y) in emitter_grid:
+        return f'Error: position ({x}, {y}) is already taken by emitter \'{emitter_grid[(x, y)]}\''
+    if (x, y) in receiver_grid:
+        return f'Error: position ({x}, {y}) is already taken by receiver \'{receiver_grid[(x, y)]}\''
+    cell = y * compiled.width + x
+    i = bisect_left(cells, cell)
+    if i < len(cells) and cells[i] == cell:
+        return f'Error: position ({x}, {y}) is already taken by mirror \'{MIRROR_SYMBOLS[symbols[i]]}\''
+    if (x, y) in placed:
+        return f'Error: position ({x}, {y}) is already taken by mirror \'{placed[(x, y)]}\''
+    return None
+
+
+def run_variant(variant: tuple[object, list[tuple[str, int, int]]]) -> tuple[object, list[str], CircuitResult]:
+    '''
+    Places the mirrors of one variant on the worker's base circuit and runs
+    it.
+
+    Parameters
+    ----------
+    variant - the variant id and the (symbol, x, y) of each mirror to place
+
+    Returns
+    -------
+    The variant id, an error message for each mirror that could not be
+    placed (prefixed with its position in the variant's list of mirrors,
+    starting at 1), and the results of running the variant.
+    '''
+    variant_id, edits = variant
+    placed = {}
+    errors = []
+    index = 0
+    while index < len(edits):
+        symbol, x, y = edits[index]
+        error = check_variant_mirror(x, y, placed)
+        if error is not None:
+            errors.append(f'Mirror {index + 1}: {error}')
+        else:
+            placed[(x, y)] = symbol
+        index += 1
+    compiled = base[0].with_mirrors([(symbol, x, y) for (x, y), symbol in placed.items()])
+    return variant_id, errors, compiled.run()
+
+
+def run_variants(variants: list[tuple[object, list[tuple[str, int, int]]]]) -> list[tuple[object, list[str], CircuitResult]]:
+    '''
+    Runs a chunk of variants with run_variant and returns their results in
+    order.
+
+    Parameters
+    ----------
+    variants - the variants to run
+    '''
+    return [run_variant(variant) for variant in variants]
+
+
+def sweep(circuit: LaserCircuit, variants, workers: int | None = None) -> dict[object, tuple[list[str], CircuitResult]]:
+    '''
+    Runs every variant of circuit across a pool of worker processes. The
+    variants are read in chunks of CHUNK_SIZE as workers become free, with
+    at most TASKS_PER_WORKER chunks per worker queued at once.
+
+    Parameters
+    ----------
+    circuit  - the base circuit, with the pulse sequence of its emitters set
+    variants - an iterable (e.g. a generator) of (variant id, mirrors) where
+               mirrors is a list of (symbol, x, y) to place on the base board
+    workers  - the number of worker processes, or None for one per CPU
+
+    Returns
+    -------
+    A dict from each variant id to the errors of the mirrors that could not
+    be placed and the results of running the variant, in the order the
+    variants were given.
+
+    Raises
+    ------
+    ValueError if two variants have the same id.
+    '''
+    emitters = [(emitter.symbol, emitter.x, emitter.y, emitter.frequency, emitter.direction)
+                for emitter in circuit.emitters]
+    receivers = [(receiver.symbol, receiver.x, receiver.y) for receiver in circuit.receivers]
+    variants = iter(variants)
+    seen = set()
+    results = {}
+    grid = share_mirrors(circuit)
+    try:
+        initargs = (grid.name, len(circuit.mirrors), circuit.width, circuit.height, emitters, receivers)
+        with ProcessPoolExecutor(workers, initializer=start_worker, initargs=initargs) as pool:
+            limit = (workers or os.cpu_count() or 1) * TASKS_PER_WORKER
+            pending = deque()
+            while True:
+                chunk = list(islice(variants, CHUNK_SIZE))
+                for variant_id, edits in chunk:
+                    if variant_id in seen:
+                        raise ValueError(f'duplicate variant id {variant_id!r}')
+                    seen.add(variant_id)
+                if chunk:
+                    pending.append(pool.submit(run_variants, chunk))
+                if pending and (not chunk or len(pending) >= limit):
+                    for variant_id, errors, result in pending.popleft().result():
+                        results[variant_id] = (errors, result)
+                elif not chunk:
+                    break
+    finally:
+        grid.close()
+        grid.unlink()
+    return results
+
+
+def format_sweep_table(results: dict[object, tuple[list[str], CircuitResult]], receivers: list[str]) -> str:
+    '''
+    Returns a table of the results of a sweep with one row per variant and
+    one column per receiver, showing the total energy the receiver absorbed
+    and its activation time, or '-' if it was not activated.
+
+    Parameters
+    ----------
+    results   - the results returned by sweep
+    receivers - the symbols of the receivers, in the order of the columns
+
+    Example
+    -------
+    >>> print(format_sweep_table(results, ['R0', 'R1']))
+    variant            R0            R1
+    v1       1.06eV@4ns             -
+    v2                -   0.41eV@12ns
+    '''
+    width = max([len('variant')] + [len(str(variant_id)) for variant_id in results])
+    lines = [f'{"variant":<{width}}' + ''.join(f' {symbol:>13}' for symbol in receivers)]
+    for variant_id, (errors, result) in results.items():
+        activation_times = dict(result.get_activation_times())
+        energies = {symbol: energy for symbol, energy, photons in result.get_total_energy()}
+        row = f'{str(variant_id):<{width}}'
+        for symbol in receivers:
+            if symbol in activation_times:
+                row += f' {f"{energies[symbol]:.2f}eV@{activation_times[symbol]}ns":>13}'
+            else:
+                row += f' {"-":>13}'
+        lines.append(row)
+    return '\n'.join(lines)
+
+
+def read_variants(file_obj) -> tuple[list[tuple[str, list[tuple[str, int, int]]]], list[str]]:
+    '''
+    Reads a variants file as described at the top of this module.
+
+    Parameters
+    ----------
+    file_obj - a file like object returned by open()
+
+    Returns
+    -------
+    A tuple of the variants and a list of error messages, each prefixed with
+    the line it was found on. Mirrors with errors are left out of their
+    variant, and a variant whose id is already used is left out entirely.
+    '''
+    variants = []
+    errors = []
+    seen = set()
+    line_number = 0
+    for line in file_obj:
+        line_number += 1
+        line = line.strip()
+        if not line:
+            continue
+        variant_id, separator, edits = line.partition(':')
+        if not separator:
+            errors.append(f'Line {line_number}: Error: <variant id>: <mirror>; <mirror>; ...')
+            continue
+        variant_id = variant_id.strip()
+        if variant_id in seen:
+            errors.append(f'Line {line_number}: Error: variant id \'{variant_id}\' is already used')
+            continue
+        seen.add(variant_id)
+        mirrors = []
+        for edit in edits.split(';'):
+            if not edit.strip():
+                continue
+            mirror, error = input_parser.check_mirror(edit)
+            if error is not None:
+                errors.append(f'Line {line_number}: {error}')
+            else:
+                mirrors.append((mirror.symbol, mirror.x, mirror.y))
+        variants.append((variant_id, mirrors))
+    return variants, errors
+
+
+def main(args: list[str]) -> None:
+    '''
+    Runs the sweep described by the command line arguments and prints the
+    table of results, followed by any errors.
+
+    Parameters
+    ----------
+    args - the command line arguments of the program
+    '''
+    if len(args) < 3:
+        print('Usage: python sweep.py <circuit file> <variants file> [<workers>]')
+        return
+
+    with open(args[1]) as file:
+        circuit, errors = load_circuit(file)
+    errors = [f'{args[1]}: {error}' for error in errors]
+    if circuit is None:
+        print('\n'.join(errors))
+        return
+    with open(args[2]) as file:
+        variants, variant_errors = read_variants(file)
+    variant_errors = [f'{args[2]}: {error}' for error in variant_errors]
+    workers = int(args[3]) if len(args) > 3 else None
+
+    results = sweep(circuit, variants, workers)
+    print(format_sweep_table(results, [receiver.symbol for receiver in circuit.receivers]))
+    for error in errors + variant_errors:
+        print(error)
+    for variant_id, (mirror_errors, result) in results.items():
+        for error in mirror_errors:
+            print(f'{variant_id}: {error}')
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,86 @@
+import re
+
+'''
+symbols - The symbols emitters and receivers can have, the order they are
+sorted in and how they are drawn on the board.
+
+An emitter's symbol is a letter from 'A' to 'J', or 'E' followed by a number
+(e.g. 'E123'). A receiver's symbol is 'R' followed by a number, from 'R0' to
+'R9' as before and beyond (e.g. 'R4567'). Numbers are written without leading
+zeros, so each number has exactly one symbol.
+
+Symbols sort naturally, by their letter and then by their number, so 'R9'
+comes before 'R10'. A symbol without a number sorts before the ones with a
+number that start with the same letter ('E' before 'E0'), which keeps 'A' to
+'J' and 'R0' to 'R9' in the same order as sorting their strings.
+
+A cell of the board only holds one character. Receivers 'R0' to 'R9' are drawn
+as their digit and emitters 'A' to 'J' as themselves, while every wider symbol
+is drawn as its first letter, 'E' for an emitter or 'R' for a receiver.
+'''
+
+
+EMITTER_LETTERS = frozenset('ABCDEFGHIJ')
+
+# patterns matching exactly the valid symbols
+NUMBER_PATTERN = '(?:0|[1-9][0-9]*)'
+EMITTER_SYMBOL = re.compile(f'[A-J]|E{NUMBER_PATTERN}')
+RECEIVER_SYMBOL = re.compile(f'R{NUMBER_PATTERN}')
+NUMBERED_SYMBOL = re.compile(f'.{NUMBER_PATTERN}', re.DOTALL)
+
+
+def is_emitter_symbol(symbol: str) -> bool:
+    '''
+    Returns whether symbol is a valid emitter symbol.
+
+    Parameters
+    ----------
+    symbol - the symbol to check
+    '''
+    return EMITTER_SYMBOL.fullmatch(symbol) is not None
+
+
+def is_receiver_symbol(symbol: str) -> bool:
+    '''
+    Returns whether symbol is a valid receiver symbol.
+
+    Parameters
+    ----------
+    symbol - the symbol to check
+    '''
+    return RECEIVER_SYMBOL.fullmatch(symbol) is not None
+
+
+def symbol_key(symbol: str) -> tuple[str, int]:
+    '''
+    Returns the key symbols are sorted by: their letter, then their number,
+    or -1 if they have no number.
+
+    Parameters
+    ----------
+    symbol - the symbol of an emitter or receiver
+
+    Example
+    -------
+    >>> sorted(['R10', 'R9', 'R0'], key=symbol_key)
+    ['R0', 'R9', 'R10']
+    '''
+    if NUMBERED_SYMBOL.fullmatch(symbol) is not None:
+        return symbol[0], int(symbol[1:])
+    return symbol, -1
+
+
+def get_glyph(symbol: str, component_type: str) -> str:
+    '''
+    Returns the character a component is drawn as on the board.
+
+    Parameters
+    ----------
+    symbol         - the symbol of the component
+    component_type - 'emitter', 'receiver' or 'mirror'
+    '''
+    if len(symbol) == 1:
+        return symbol
+    if component_type == 'receiver' and len(symbol) == 2:
+        return symbol[1]
+    return symbol[0]
@@ -0,0 +1,132 @@
+import random
+import pytest
+import sparse_board_displayer
+from board_displayer import BoardDisplayer
+from sparse_board_displayer import SparseBoardDisplayer
+from emitter import Emitter
+from receiver import Receiver
+from mirror import Mirror
+from photon import Photon
+from laser_circuit import LaserCircuit
+
+'''
+Tests that SparseBoardDisplayer draws exactly the same board as
+BoardDisplayer, both when each method is called directly and when the same
+circuits are run with either displayer, with mirrors removed part way.
+'''
+
+
+@pytest.fixture(autouse=True)
+def small_bands(monkeypatch):
+    # print a few rows at a time, so boards are printed in several bands
+    monkeypatch.setattr(sparse_board_displayer, 'BAND_SIZE', 40)
+
+
+def random_region(rng: random.Random, width: int, height: int) -> tuple[int, int, int, int]:
+    '''
+    Returns a random region around a board, which may reach past its edges.
+
+    Parameters
+    ----------
+    rng    - the random number generator
+    width  - the width of the board
+    height - the height of the board
+    '''
+    return rng.randint(-3, width), rng.randint(-3, height), rng.randint(-2, width + 3), rng.randint(-2, height + 3)
+
+
+def test_methods_match_board_displayer():
+    for seed in range(500):
+        rng = random.Random(seed)
+        width = rng.randint(1, 12)
+        height = rng.randint(1, 12)
+        displayers = [BoardDisplayer(width, height), SparseBoardDisplayer(width, height)]
+        for step in range(rng.randint(0, 40)):
+            x = rng.randint(-2, width + 1)
+            y = rng.randint(-2, height + 1)
+            kind = rng.random()
+            for displayer in displayers:
+                if kind < 0.25:
+                    displayer.add_component_to_board(Mirror('/\\'[step % 2], x, y) if step % 3 else Emitter('A', x, y))
+                elif kind < 0.4:
+                    displayer.remove_component_from_board(Mirror('/', x, y))
+                elif kind < 0.55:
+                    displayer.add_photon_to_board(Photon(x, y, 1, 'N'))
+                elif kind < 0.9:
+                    displayer.add_path_to_board(x, y, 'NESW'[step % 4], step % 16)
+                else:
+                    displayer.add_cells_to_board([(x % width, y % height), ((x + step) % width, y % height)])
+            dense, sparse = displayers
+            assert sparse.render_board() == dense.render_board(), seed
+            region = random_region(rng, width, height)
+            assert sparse.render_region(*region) == dense.render_region(*region), seed
+            x = rng.randrange(width)
+            y = rng.randrange(height)
+            assert sparse.get_cell(x, y) == dense.get_cell(x, y), seed
+
+
+def make_circuit(seed: int, displayer_class: type) -> LaserCircuit:
+    '''
+    Returns a random circuit drawn with a board displayer of the given class.
+
+    Parameters
+    ----------
+    seed            - the seed for the random number generator
+    displayer_class - BoardDisplayer or SparseBoardDisplayer
+    '''
+    rng = random.Random(seed)
+    width = rng.randint(2, 20)
+    height = rng.randint(2, 14)
+    circuit = LaserCircuit(width, height)
+    circuit.board_displayer = displayer_class(width, height)
+    cells = [(x, y) for x in range(width) for y in range(height)]
+    rng.shuffle(cells)
+    for symbol in 'ABCD'[:len(cells) // 4]:
+        emitter = Emitter(symbol, *cells.pop())
+        emitter.set_pulse_sequence(rng.randint(1, 100), rng.choice('NESW'))
+        circuit.add_emitter(emitter)
+    for i in range(min(len(cells) // 8, 10)):
+        circuit.add_receiver(Receiver(f'R{i}', *cells.pop()))
+    for i in range(len(cells) // 3):
+        circuit.add_mirror(Mirror(rng.choice('/\\'), *cells.pop()))
+    return circuit
+
+
+def run_with_removals(circuit: LaserCircuit, seed: int) -> list[str]:
+    '''
+    Runs circuit, removing a random mirror every few ticks, and returns the
+    board rendered after each removal and once the circuit has finished.
+
+    Parameters
+    ----------
+    circuit - the circuit to run
+    seed    - the seed for the random number generator
+    '''
+    rng = random.Random(seed)
+    boards = []
+    circuit.emit_photons()
+    while not circuit.is_finished():
+        circuit.tick()
+        if circuit.mirrors and rng.random() < 0.2:
+            mirror = rng.choice(circuit.mirrors)
+            circuit.remove_mirror(mirror.x, mirror.y)
+            boards.append(circuit.board_displayer.render_board())
+    circuit.paint_exit_trails()
+    boards.append(circuit.board_displayer.render_board())
+    return boards
+
+
+def test_circuits_match_board_displayer(capsys):
+    for seed in range(300):
+        dense = make_circuit(seed, BoardDisplayer)
+        sparse = make_circuit(seed, SparseBoardDisplayer)
+        assert run_with_removals(sparse, seed) == run_with_removals(dense, seed), seed
+        capsys.readouterr()
+
+        dense.board_displayer.print_board()
+        printed = capsys.readouterr().out
+        sparse.board_displayer.print_board()
+        assert capsys.readouterr().out == printed, seed
+        assert printed == dense.board_displayer.render_board()
+        region = random_region(random.Random(seed), dense.width, dense.height)
+        assert sparse.board_displayer.render_region(*region) == dense.board_displayer.render_region(*region), seed
@@ -0,0 +1,69 @@
+import io
+from circuit_loader import load_circuit
+
+'''
+Tests that load_circuit builds the circuit a circuit file describes, and
+reports every error in it against the line it was found on.
+'''
+
+
+# a circuit file with errors in every section
+CIRCUIT_FILE = '''6 4
+A 0 1
+A 2 2
+K 1 1
+B 9 9
+B 1 1
+END EMITTERS
+R0 5 1
+R0 4 1
+R1 0 1
+
+END RECEIVERS
+/ 3 1
+x 3 2
+/ 3 1
+END MIRRORS
+A 100 E
+B 0 N
+C 10 S
+A 5 E
+B 50 S
+'''
+
+
+def test_valid_file_loads_without_errors():
+    circuit, errors = load_circuit(io.StringIO('5 3\nA 0 1\nEND EMITTERS\nR0 4 1\nEND RECEIVERS\nEND MIRRORS\nA 100 E\n'))
+    assert errors == []
+    result = circuit.run_circuit(headless=True, output_dir=None)
+    assert result.activation_times == [('R0', 4)]
+
+
+def test_errors_are_reported_with_line_numbers():
+    circuit, errors = load_circuit(io.StringIO(CIRCUIT_FILE))
+    assert errors == [
+        'Line 3: Error: symbol \'A\' is already taken',
+        'Line 4: Error: symbol is not between \'A\'-\'J\'',
+        'Line 5: Error: position (9, 9) is out-of-bounds of 6x4 circuit board',
+        'Line 9: Error: symbol \'R0\' is already taken',
+        'Line 10: Error: position (0, 1) is already taken by emitter \'A\'',
+        'Line 14: Error: symbol must be \'/\', \'\\\', \'>\', \'<\', \'^\' or \'v\'',
+        'Line 15: Error: position (3, 1) is already taken by mirror \'/\'',
+        'Line 18: Error: frequency must be greater than zero',
+        'Line 19: Error: emitter \'C\' does not exist',
+        'Line 20: Error: Emitter \'A\' already has its pulse sequence set',
+    ]
+    assert [(emitter.symbol, emitter.x, emitter.y, emitter.frequency, emitter.direction)
+            for emitter in circuit.emitters] == [('A', 0, 1, 100, 'E'), ('B', 1, 1, 50, 'S')]
+    assert [(receiver.symbol, receiver.x, receiver.y) for receiver in circuit.receivers] == [('R0', 5, 1)]
+    assert [(mirror.symbol, mirror.x, mirror.y) for mirror in circuit.mirrors] == [('/', 3, 1)]
+
+
+def test_invalid_size_returns_no_circuit():
+    circuit, errors = load_circuit(io.StringIO('8 x\nA 0 0\nEND EMITTERS\n'))
+    assert circuit is None
+    assert errors == ['Line 1: Error: height is not an integer', 'Line 4: Error: missing END RECEIVERS']
+
+
+def test_empty_file_returns_no_circuit():
+    assert load_circuit(io.StringIO('\n\n')) == (None, ['Line 3: Error: the circuit file is empty'])
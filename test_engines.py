@@ -0,0 +1,203 @@
+import io
+import random
+import contextlib
+import pytest
+from emitter import Emitter
+from receiver import Receiver
+from mirror import Mirror
+from laser_circuit import LaserCircuit
+from sparse_board_displayer import SPARSE_THRESHOLD, SparseBoardDisplayer
+
+'''
+Tests that every engine of LaserCircuit.run_circuit, and running a compiled
+circuit, gives the same results as the 'tick' engine on random circuits,
+including photons stuck in loops, photons that never move and receivers hit
+by several photons in the same nanosecond, and on a board large enough to be
+drawn by a SparseBoardDisplayer.
+'''
+
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def make_circuit(seed: int) -> LaserCircuit:
+    '''
+    Returns a random circuit with enough mirrors that some photons are stuck
+    in loops, one emitter without a pulse sequence, whose photons never move,
+    and a receiver two emitters fire at from either side at the same time.
+
+    Parameters
+    ----------
+    seed - the seed for the random number generator
+    '''
+    rng = random.Random(seed)
+    width = rng.randint(7, 18)
+    height = rng.randint(3, 12)
+    circuit = LaserCircuit(width, height)
+
+    # R0 is hit by the photons of A and B in the same nanosecond
+    y = rng.randrange(height)
+    x = rng.randint(3, width - 4)
+    reach = rng.randint(1, min(x, width - 1 - x))
+    frequency = rng.randint(1, 300)
+    left = Emitter('A', x - reach, y)
+    left.set_pulse_sequence(frequency, 'E')
+    right = Emitter('B', x + reach, y)
+    right.set_pulse_sequence(frequency, 'W')
+    circuit.add_emitter(left)
+    circuit.add_emitter(right)
+    circuit.add_receiver(Receiver('R0', x, y))
+
+    free = [(i, j) for i in range(width) for j in range(height) if j != y]
+    rng.shuffle(free)
+    for symbol in 'CDE':
+        emitter = Emitter(symbol, *free.pop())
+        emitter.set_pulse_sequence(rng.randint(1, 300), rng.choice('NESW'))
+        circuit.add_emitter(emitter)
+    circuit.add_emitter(Emitter('F', *free.pop()))
+    for i in range(1, 4):
+        circuit.add_receiver(Receiver(f'R{i}', *free.pop()))
+    for i in range(len(free) // 3):
+        circuit.add_mirror(Mirror(rng.choice('/\\/\\<>^v'), *free.pop()))
+    return circuit
+
+
+def run(circuit: LaserCircuit, engine: str, **options) -> tuple:
+    '''
+    Runs circuit with engine and returns what it printed, its results, the
+    state of its receivers and its board.
+
+    Parameters
+    ----------
+    circuit - the circuit to run
+    engine  - the engine to run it with
+    options - any other arguments to run_circuit
+    '''
+    with contextlib.redirect_stdout(io.StringIO()) as printed:
+        result = circuit.run_circuit(engine=engine, output_dir=None, **options)
+    return (
+        printed.getvalue(),
+        result.clock,
+        result.activation_times,
+        result.total_energy,
+        result.trapped_photons,
+        [(receiver.activated, receiver.activation_time, receiver.total_energy) for receiver in circuit.receivers],
+        circuit.board_displayer.render_board(),
+    )
+
+
+def test_circuits_have_loops_and_ties():
+    loops = 0
+    for seed in range(30):
+        printed, clock, activation_times, total_energy, trapped, receivers, board = run(make_circuit(seed), 'tick')
+        assert 'R0' in [symbol for symbol, time in activation_times]
+        loops += trapped
+    assert loops > 0
+
+
+@pytest.mark.parametrize('engine', [
+    'leapfrog',
+    pytest.param('vectorized', marks=pytest.mark.skipif(numpy is None, reason='requires NumPy')),
+])
+def test_engine_matches_tick(engine):
+    for seed in range(30):
+        assert run(make_circuit(seed), engine) == run(make_circuit(seed), 'tick'), seed
+        assert run(make_circuit(seed), engine, snapshot_interval=7) == \
+            run(make_circuit(seed), 'tick', snapshot_interval=7), seed
+
+
+@pytest.mark.parametrize('engine', ['event', 'parallel'])
+def test_final_engine_matches_tick(engine):
+    # these engines only print the board once the circuit has finished
+    for seed in range(30):
+        expected = run(make_circuit(seed), 'tick', snapshot_interval=None)
+        assert run(make_circuit(seed), engine, snapshot_interval=None)[1:] == expected[1:], seed
+
+
+@pytest.mark.parametrize('engine', [
+    'tick',
+    'leapfrog',
+    pytest.param('vectorized', marks=pytest.mark.skipif(numpy is None, reason='requires NumPy')),
+    'event',
+    'parallel',
+])
+def test_engine_without_trails_leaves_board_empty(engine):
+    for seed in range(10):
+        circuit = make_circuit(seed)
+        circuit.trails = False
+        expected = make_circuit(seed).board_displayer.render_board()
+        assert run(circuit, engine, snapshot_interval=7)[-1] == expected, seed
+
+
+@pytest.mark.parametrize('trails', [True, False])
+def test_headless_run_keeps_trails_setting(trails):
+    circuit = make_circuit(0)
+    circuit.trails = trails
+    circuit.run_circuit(headless=True, output_dir=None)
+    assert circuit.trails == trails
+    assert circuit.board_displayer.render_board() == make_circuit(0).board_displayer.render_board()
+
+
+def test_parallel_requires_trap_detection():
+    circuit = make_circuit(0)
+    circuit.trap_detection = False
+    with pytest.raises(ValueError, match='trap detection'):
+        circuit.run_circuit(engine='parallel', output_dir=None)
+    assert circuit.clock == 0
+
+
+@pytest.mark.skipif(numpy is None, reason='requires NumPy')
+def test_vectorized_sparse_lookup_matches_tick(monkeypatch):
+    import vectorized_engine
+    monkeypatch.setattr(vectorized_engine, 'SPARSE_THRESHOLD', 0)
+    monkeypatch.setattr(vectorized_engine, 'VISITED_LIMIT', 16)
+    for seed in range(30):
+        assert run(make_circuit(seed), 'vectorized', snapshot_interval=7) == \
+            run(make_circuit(seed), 'tick', snapshot_interval=7), seed
+
+
+def make_large_circuit() -> LaserCircuit:
+    '''
+    Returns a circuit on a board with more than SPARSE_THRESHOLD cells, with
+    a photon reflected into a receiver and one leaving the board.
+    '''
+    circuit = LaserCircuit(SPARSE_THRESHOLD // 1000 + 1, 1000)
+    emitter = Emitter('A', 10, 10)
+    emitter.set_pulse_sequence(100, 'E')
+    circuit.add_emitter(emitter)
+    emitter = Emitter('B', 300, 900)
+    emitter.set_pulse_sequence(50, 'S')
+    circuit.add_emitter(emitter)
+    circuit.add_mirror(Mirror('\\', 200, 10))
+    circuit.add_receiver(Receiver('R0', 200, 300))
+    return circuit
+
+
+@pytest.mark.parametrize('engine', [
+    'tick',
+    'leapfrog',
+    pytest.param('vectorized', marks=pytest.mark.skipif(numpy is None, reason='requires NumPy')),
+    'event',
+    'parallel',
+])
+def test_engine_runs_large_board(engine):
+    circuit = make_large_circuit()
+    assert isinstance(circuit.board_displayer, SparseBoardDisplayer)
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = circuit.run_circuit(engine=engine, snapshot_interval=None, output_dir=None)
+    assert (result.clock, result.activation_times) == (480, [('R0', 480)])
+    assert circuit.board_displayer.render_region(198, 9, 4, 3) == \
+        '+----+\n|    |\n|..\\ |\n|  . |\n+----+\n'
+    assert circuit.board_displayer.render_region(299, 997, 3, 3) == \
+        '+---+\n| . |\n| . |\n| . |\n+---+\n'
+
+
+def test_compiled_circuit_matches_tick():
+    for seed in range(30):
+        expected = make_circuit(seed).run_circuit(headless=True, output_dir=None)
+        result = make_circuit(seed).compile().run()
+        assert (result.clock, result.activation_times, result.total_energy, result.trapped_photons) == \
+            (expected.clock, expected.activation_times, expected.total_energy, expected.trapped_photons), seed
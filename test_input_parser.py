@@ -0,0 +1,115 @@
+import random
+import pytest
+import input_parser
+from input_parser import check_lines, check_size, check_emitter, check_receiver, check_mirror, check_pulse_sequence
+
+'''
+Tests that the check functions and check_lines report the same results and
+error messages as the parse functions print, that they keep the messages of
+the original parser, and that invalid emitter and receiver symbols are
+reported against the rule they break.
+'''
+
+
+# each check with the parse function that prints its errors
+CHECKS = [
+    (check_size, input_parser.parse_size),
+    (check_emitter, input_parser.parse_emitter),
+    (check_receiver, input_parser.parse_receiver),
+    (check_mirror, input_parser.parse_mirror),
+    (check_pulse_sequence, input_parser.parse_pulse_sequence),
+]
+
+# tokens random lines are made of, valid and invalid for every check
+TOKENS = ['A', 'J', 'K', 'E', 'E1', 'E01', 'E12', 'AB', 'R0', 'R9', 'R', 'R01', 'R42', 'X', '/', '\\', '>', '<',
+          '^', 'v', 'x', '0', '1', '7', '18', '007', '-1', '-05', '1.5', 'a', 'N', 'E', 'S', 'W', 'NE', '']
+
+
+def describe(result) -> object:
+    '''
+    Returns a component as its class name, symbol and position, so that
+    results can be compared, and any other result as it is.
+
+    Parameters
+    ----------
+    result - what a check or parse function returned
+    '''
+    if result is None or isinstance(result, tuple):
+        return result
+    return type(result).__name__, result.symbol, result.x, result.y
+
+
+def random_lines(seed: int, count: int) -> list[str]:
+    '''
+    Returns count random lines of zero to four tokens.
+
+    Parameters
+    ----------
+    seed  - the seed for the random number generator
+    count - how many lines to return
+    '''
+    rng = random.Random(seed)
+    lines = []
+    for i in range(count):
+        tokens = [rng.choice(TOKENS) for token in range(rng.choice((0, 1, 2, 3, 3, 3, 4)))]
+        lines.append(rng.choice((' ', '  ', '\t')).join(tokens) + rng.choice(('', '\n', ' ')))
+    return lines
+
+
+@pytest.mark.parametrize('check, parse', CHECKS)
+def test_check_lines_matches_parse(check, parse, capsys):
+    lines = random_lines(0, 2000)
+    results, errors = check_lines(check, lines, first_line=5)
+    expected_results = []
+    expected_errors = []
+    for line_number, line in enumerate(lines, 5):
+        result = parse(line)
+        printed = capsys.readouterr().out
+        if printed:
+            assert result is None
+            expected_errors.append((line_number, printed.rstrip('\n')))
+        else:
+            expected_results.append((line_number, describe(result)))
+    assert [(line_number, describe(result)) for line_number, result in results] == expected_results
+    assert errors == expected_errors
+    assert expected_results and expected_errors
+
+
+@pytest.mark.parametrize('check, line, expected', [
+    (check_size, '18 6', None),
+    (check_size, '18', 'Error: <width> <height>'),
+    (check_size, 'a 6', 'Error: width is not an integer'),
+    (check_size, '6 b', 'Error: height is not an integer'),
+    (check_size, '-1 2', 'Error: width must be greater than zero'),
+    (check_size, '6 0', 'Error: height must be greater than zero'),
+    (check_emitter, 'A 1', 'Error: <symbol> <x> <y>'),
+    (check_emitter, 'AB 1 2', 'Error: symbol is not between \'A\'-\'J\''),
+    (check_emitter, 'A x 2', 'Error: x is not an integer'),
+    (check_emitter, 'A 1 y', 'Error: y is not an integer'),
+    (check_emitter, 'A -1 2', 'Error: x cannot be negative'),
+    (check_emitter, 'A 1 -2', 'Error: y cannot be negative'),
+    (check_receiver, 'R 1 2', 'Error: symbol is not between R0-R9'),
+    (check_receiver, 'R0 -1 2', 'Error: x cannot be negative'),
+    (check_mirror, 'x 1 2', 'Error: symbol must be \'/\', \'\\\', \'>\', \'<\', \'^\' or \'v\''),
+    (check_mirror, '/ 1 -2', 'Error: y cannot be negative'),
+    (check_pulse_sequence, 'A 100', 'Error: <symbol> <frequency> <direction>'),
+    (check_pulse_sequence, 'K 100 N', 'Error: symbol is not between \'A\'-\'J\''),
+    (check_pulse_sequence, 'A x N', 'Error: frequency is not an integer'),
+    (check_pulse_sequence, 'A -5 N', 'Error: frequency must be greater than zero'),
+    (check_pulse_sequence, 'A 100 X', 'Error: direction must be \'N\', \'E\', \'S\' or \'W\''),
+])
+def test_messages_match_original_parser(check, line, expected):
+    assert check(line)[1] == expected
+
+
+def test_emitter_symbol_errors():
+    assert check_emitter('K 1 1')[1] == 'Error: symbol is not between \'A\'-\'J\''
+    assert check_emitter('E01 1 1')[1] == 'Error: symbol is not \'E\' followed by a number without leading zeros'
+    assert check_pulse_sequence('Ex 1 N')[1] == 'Error: symbol is not \'E\' followed by a number without leading zeros'
+    assert check_emitter('E12 1 1')[1] is None
+
+
+def test_receiver_symbol_errors():
+    assert check_receiver('X 1 1')[1] == 'Error: symbol is not between R0-R9'
+    assert check_receiver('R01 1 1')[1] == 'Error: symbol is not \'R\' followed by a number without leading zeros'
+    assert check_receiver('R4567 1 1')[1] is None
@@ -0,0 +1,87 @@
+import random
+from emitter import Emitter
+from receiver import Receiver
+from mirror import Mirror
+from laser_circuit import LaserCircuit
+
+'''
+Tests that LaserCircuit.add_components leaves a circuit exactly as adding
+each component with add_emitter, add_receiver or add_mirror does.
+'''
+
+
+def make_components(seed: int) -> list[Emitter | Receiver | Mirror]:
+    '''
+    Returns a random mix of components on a 6x5 board, including ones that
+    collide with each other and ones out of bounds.
+
+    Parameters
+    ----------
+    seed - the seed for the random number generator
+    '''
+    rng = random.Random(seed)
+    components = []
+    for i in range(rng.randint(0, 40)):
+        x = rng.randint(-1, 6)
+        y = rng.randint(-1, 5)
+        kind = rng.random()
+        if kind < 0.15:
+            components.append(Emitter(rng.choice('ABCDEFGHIJ'), x, y))
+        elif kind < 0.3:
+            components.append(Receiver(f'R{rng.randrange(10)}', x, y))
+        else:
+            components.append(Mirror(rng.choice('/\\|-'), x, y))
+    return components
+
+
+def add_one_by_one(circuit: LaserCircuit, components: list[Emitter | Receiver | Mirror]) -> None:
+    '''
+    Adds each component with its add method.
+
+    Parameters
+    ----------
+    circuit    - the circuit to add the components into
+    components - the components to add
+    '''
+    for component in components:
+        if isinstance(component, Emitter):
+            circuit.add_emitter(component)
+        elif isinstance(component, Receiver):
+            circuit.add_receiver(component)
+        else:
+            circuit.add_mirror(component)
+
+
+def get_layout(circuit: LaserCircuit) -> tuple:
+    '''Returns the lists of components and the board of circuit.'''
+    return (
+        [(emitter.symbol, emitter.x, emitter.y) for emitter in circuit.get_emitters()],
+        [(receiver.symbol, receiver.x, receiver.y) for receiver in circuit.get_receivers()],
+        [(mirror.symbol, mirror.x, mirror.y) for mirror in circuit.get_mirrors()],
+        circuit.board_displayer.render_board(),
+    )
+
+
+def test_mirror_order_matches_add_mirror():
+    mirrors = [Mirror('/', 0, 0), Mirror('\\', 1, 0), Mirror('-', 2, 0), Mirror('/', 3, 0)]
+    one_by_one = LaserCircuit(4, 1)
+    add_one_by_one(one_by_one, mirrors)
+    batch = LaserCircuit(4, 1)
+    batch.add_components([Mirror(mirror.symbol, mirror.x, mirror.y) for mirror in mirrors])
+    assert [(mirror.symbol, mirror.x) for mirror in one_by_one.get_mirrors()] == \
+        [('-', 2), ('/', 3), ('/', 0), ('\\', 1)]
+    assert get_layout(batch) == get_layout(one_by_one)
+
+
+def test_add_components_matches_add_methods(capsys):
+    for seed in range(200):
+        first, second = make_components(seed), make_components(seed + 1000)
+        one_by_one = LaserCircuit(6, 5)
+        add_one_by_one(one_by_one, first)
+        add_one_by_one(one_by_one, second)
+        batch = LaserCircuit(6, 5)
+        batch.add_components(make_components(seed))
+        batch.add_components(make_components(seed + 1000))
+        assert get_layout(batch) == get_layout(one_by_one), seed
+        assert batch.row_index == one_by_one.row_index
+        assert batch.column_index == one_by_one.column_index
@@ -0,0 +1,80 @@
+import random
+import pytest
+from emitter import Emitter
+from receiver import Receiver
+from mirror import Mirror
+from laser_circuit import LaserCircuit
+from pulse_evaluator import PulseEvaluator
+
+'''
+Tests that PulseEvaluator gives the same results as running the compiled
+circuit with each pulse sequence, and that it rejects invalid directions.
+'''
+
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+pytestmark = pytest.mark.skipif(numpy is None, reason='requires NumPy')
+
+
+def make_circuit(seed: int) -> LaserCircuit:
+    '''
+    Returns a random circuit with enough mirrors that some photons are stuck
+    in loops.
+
+    Parameters
+    ----------
+    seed - the seed for the random number generator
+    '''
+    rng = random.Random(seed)
+    width = rng.randint(4, 16)
+    height = rng.randint(4, 12)
+    circuit = LaserCircuit(width, height)
+    cells = [(x, y) for x in range(width) for y in range(height)]
+    rng.shuffle(cells)
+    for symbol in 'ABCDEF':
+        emitter = Emitter(symbol, *cells.pop())
+        emitter.set_pulse_sequence(100, 'N')
+        circuit.add_emitter(emitter)
+    for i in range(rng.randint(1, 6)):
+        circuit.add_receiver(Receiver(f'R{i}', *cells.pop()))
+    for i in range(len(cells) // 3):
+        circuit.add_mirror(Mirror(rng.choice('/\\/\\<>^v'), *cells.pop()))
+    return circuit
+
+
+def test_evaluate_matches_compiled_run():
+    for seed in range(60):
+        rng = random.Random(seed)
+        compiled = make_circuit(seed).compile()
+        evaluator = PulseEvaluator(compiled)
+        frequencies = [[rng.randint(1, 1000) for symbol in evaluator.symbols] for sequence in range(10)]
+        directions = [[rng.choice('NESW') for symbol in evaluator.symbols] for sequence in range(10)]
+        total_energy, photons_absorbed, activation_times = evaluator.evaluate(frequencies, directions)
+
+        for s in range(10):
+            result = compiled.run({symbol: (frequencies[s][e], directions[s][e])
+                                   for e, symbol in enumerate(evaluator.symbols)})
+            energy = {symbol: (total, count) for symbol, total, count in result.total_energy}
+            times = dict(result.activation_times)
+            for r, symbol in enumerate(evaluator.receivers):
+                total, count = energy.get(symbol, (0.0, 0))
+                assert total_energy[s, r] == pytest.approx(total, rel=1e-12, abs=1e-12), (seed, s)
+                assert photons_absorbed[s, r] == count, (seed, s)
+                assert activation_times[s, r] == times.get(symbol, 0), (seed, s)
+
+
+@pytest.mark.parametrize('directions', [[['N', 'X']], [[0, 4]], [[-1, 0]], [[1, 7]]])
+def test_evaluate_rejects_invalid_directions(directions):
+    circuit = LaserCircuit(4, 3)
+    for symbol, x in (('A', 0), ('B', 1)):
+        emitter = Emitter(symbol, x, 1)
+        emitter.set_pulse_sequence(100, 'E')
+        circuit.add_emitter(emitter)
+    circuit.add_receiver(Receiver('R0', 3, 1))
+    evaluator = PulseEvaluator(circuit.compile())
+    with pytest.raises(ValueError, match='directions'):
+        evaluator.evaluate([[100, 200]], directions)
@@ -0,0 +1,98 @@
+import io
+import pulse_loader
+from emitter import Emitter
+from laser_circuit import LaserCircuit
+from pulse_loader import PulseLoader, CHUNK_SIZE
+
+'''
+Tests that PulseLoader prints what run.set_pulse_sequence always printed,
+collects the same errors in quiet mode, and numbers lines correctly across
+the chunks it reads the file in.
+'''
+
+
+# a pulse sequence file with errors on lines 2, 3, 4, 5 and 7
+PULSE_FILE = 'A 100 N\nbad line\nD 5 S\n\nA 7 E\nC 20 W\nB 0 S\nB 1 S\n'
+
+
+def make_circuit(symbols: str = 'ABC') -> LaserCircuit:
+    '''
+    Returns a circuit with an emitter for each symbol, none of them with its
+    pulse sequence set.
+
+    Parameters
+    ----------
+    symbols - the symbols of the emitters
+    '''
+    circuit = LaserCircuit(10, 1)
+    for x, symbol in enumerate(symbols):
+        circuit.add_emitter(Emitter(symbol, x, 0))
+    return circuit
+
+
+def test_verbose_output_matches_set_pulse_sequence(capsys):
+    circuit = make_circuit()
+    assert PulseLoader(circuit).load(io.StringIO(PULSE_FILE)) == []
+    assert capsys.readouterr().out == (
+        '\nSetting pulse sequence...\n'
+        '-- (A, B, C)\n'
+        'Line 1: A 100 N\n'
+        '-- (B, C)\n'
+        'Error: <symbol> <frequency> <direction>\n'
+        'Line 3: D 5 S\n'
+        'Error: emitter \'D\' does not exist\n'
+        '-- (B, C)\n'
+        'Error: <symbol> <frequency> <direction>\n'
+        'Line 5: A 7 E\n'
+        'Error: Emitter \'A\' already has its pulse sequence set\n'
+        '-- (B, C)\n'
+        'Line 6: C 20 W\n'
+        '-- (B)\n'
+        'Error: frequency must be greater than zero\n'
+        'Line 8: B 1 S\n'
+        'Pulse sequence set.\n\n'
+    )
+
+
+def test_quiet_mode_collects_errors(capsys):
+    circuit = make_circuit()
+    loader = PulseLoader(circuit, quiet=True)
+    assert loader.load(io.StringIO(PULSE_FILE)) == [
+        'Line 2: Error: <symbol> <frequency> <direction>',
+        'Line 3: Error: emitter \'D\' does not exist',
+        'Line 4: Error: <symbol> <frequency> <direction>',
+        'Line 5: Error: Emitter \'A\' already has its pulse sequence set',
+        'Line 7: Error: frequency must be greater than zero',
+    ]
+    assert capsys.readouterr().out == ''
+    assert loader.unset_count == 0
+    assert [(emitter.frequency, emitter.direction) for emitter in circuit.emitters] == \
+        [(100, 'N'), (1, 'S'), (20, 'W')]
+
+
+def test_lines_are_numbered_across_chunks(monkeypatch):
+    monkeypatch.setattr(pulse_loader, 'CHUNK_SIZE', 16)
+    circuit = make_circuit('ABCDEFGHIJ')
+    lines = [f'{symbol} {i + 1} E' for i, symbol in enumerate('ABCDEFGHIJ')]
+    lines[3:3] = ['A 5 N', 'K 5 N']
+    lines.append('E 9 S')
+    loader = PulseLoader(circuit, quiet=True)
+    assert loader.load(io.StringIO('\n'.join(lines))) == [
+        'Line 4: Error: Emitter \'A\' already has its pulse sequence set',
+        'Line 5: Error: symbol is not between \'A\'-\'J\'',
+        'Line 13: Error: Emitter \'E\' already has its pulse sequence set',
+    ]
+    assert loader.unset_count == 0
+    assert [emitter.frequency for emitter in circuit.emitters] == list(range(1, 11))
+
+
+def test_file_larger_than_chunk():
+    circuit = make_circuit('AB')
+    lines = ['A 100 N'] + ['A 100 N'] * (CHUNK_SIZE // 8 + 10) + ['B 7 W']
+    assert len('\n'.join(lines)) > CHUNK_SIZE
+    loader = PulseLoader(circuit, quiet=True)
+    diagnostics = loader.load(io.StringIO('\n'.join(lines)))
+    assert len(diagnostics) == len(lines) - 2
+    assert diagnostics[-1] == f'Line {len(lines) - 1}: Error: Emitter \'A\' already has its pulse sequence set'
+    assert loader.unset_count == 0
+    assert (circuit.emitters[1].frequency, circuit.emitters[1].direction) == (7, 'W')
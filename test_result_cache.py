@@ -0,0 +1,84 @@
+import os
+from emitter import Emitter
+from receiver import Receiver
+from laser_circuit import LaserCircuit
+from result_cache import ResultCache, run_cached
+
+'''
+Tests that the result cache replays identical runs and fails open, running
+circuits without the cache when its directory cannot be used.
+'''
+
+
+def make_circuit() -> LaserCircuit:
+    '''Returns a small circuit with its pulse sequence set.'''
+    circuit = LaserCircuit(8, 3)
+    emitter = Emitter('A', 0, 1)
+    emitter.set_pulse_sequence(100, 'E')
+    circuit.add_emitter(emitter)
+    circuit.add_receiver(Receiver('R0', 7, 1))
+    return circuit
+
+
+def test_hit_replays_run(tmp_path, capsys):
+    cache = ResultCache(str(tmp_path))
+    first = run_cached(make_circuit(), cache, output_dir=None)
+    printed = capsys.readouterr().out
+    circuit = make_circuit()
+    second = run_cached(circuit, cache, output_dir=None)
+    assert capsys.readouterr().out == printed
+    assert second.get_total_energy() == first.get_total_energy()
+    assert circuit.receivers[0].activated
+
+
+def test_unusable_directory_runs_without_cache(tmp_path, capsys):
+    blocker = tmp_path / 'file'
+    blocker.write_text('')
+    cache = ResultCache(str(blocker / 'cache'))
+    assert not cache.enabled
+    result = run_cached(make_circuit(), cache, output_dir=None)
+    assert result.get_activation_times() == [('R0', 7)]
+    assert 'Warning: cannot use the result cache' in capsys.readouterr().err
+
+
+def test_failed_write_runs_without_cache(tmp_path, capsys, monkeypatch):
+    def replace(source, destination):
+        raise OSError(28, 'No space left on device')
+
+    cache = ResultCache(str(tmp_path))
+    monkeypatch.setattr(os, 'replace', replace)
+    result = run_cached(make_circuit(), cache, output_dir=None)
+    assert result.get_activation_times() == [('R0', 7)]
+    assert not cache.enabled
+    assert os.listdir(tmp_path) == []
+    assert 'No space left on device' in capsys.readouterr().err
+
+
+def test_removing_missing_entry_is_ignored(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    assert cache.remove(str(tmp_path / 'missing.json'))
+    assert cache.enabled
+
+
+def test_key_covers_trails_and_board(tmp_path):
+    circuit = make_circuit()
+    key = ResultCache.make_key(circuit, {})
+    circuit.trails = False
+    assert ResultCache.make_key(circuit, {}) != key
+    circuit.trails = True
+    circuit.board_displayer.add_path_to_board(0, 0, 'E', 3)
+    assert ResultCache.make_key(circuit, {}) != key
+    assert ResultCache.make_key(make_circuit(), {'output_dir': str(tmp_path)}) == key
+
+
+def test_only_serialisable_options_are_cached(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    assert ResultCache.make_key(make_circuit(), {'engine': object()}) is None
+    run_cached(make_circuit(), cache, output_dir=None, snapshot_interval=None)
+    assert len(os.listdir(tmp_path)) == 1
+
+
+def test_oversized_run_is_not_stored(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=100)
+    run_cached(make_circuit(), cache, output_dir=None)
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,57 @@
+import random
+from receiver import Receiver
+from symbols import symbol_key
+from sorter import sort_receivers_by_symbol, sort_receivers_by_activation_time, \
+    sort_receivers_by_total_energy, sort_receivers_for_report
+
+'''
+Tests the receiver sorts. Receivers tied on activation time or total energy
+always come out in symbol order, as documented. This is a change from the
+exchange sorts sorter used to have, which were not stable: receivers R0, R1
+and R2 activated at 4ns, 4ns and 3ns were reported as R2, R1, R0.
+'''
+
+
+def make_receiver(symbol: str, activation_time: int, total_energy: float) -> Receiver:
+    '''
+    Returns an activated receiver.
+
+    Parameters
+    ----------
+    symbol          - the symbol of the receiver
+    activation_time - the time it was activated
+    total_energy    - the energy it absorbed
+    '''
+    receiver = Receiver(symbol, 0, 0)
+    receiver.activated = True
+    receiver.activation_time = activation_time
+    receiver.total_energy = total_energy
+    receiver.photons_absorbed = 1
+    return receiver
+
+
+def get_symbols(receivers: list[Receiver]) -> list[str]:
+    '''Returns the symbols of receivers.'''
+    return [receiver.symbol for receiver in receivers]
+
+
+def test_ties_are_in_symbol_order():
+    receivers = [make_receiver('R0', 4, 1.0), make_receiver('R1', 4, 1.0), make_receiver('R2', 3, 2.0)]
+    assert get_symbols(sort_receivers_by_activation_time(receivers)) == ['R2', 'R0', 'R1']
+    assert get_symbols(sort_receivers_by_total_energy(receivers)) == ['R2', 'R0', 'R1']
+    by_activation_time, by_total_energy = sort_receivers_for_report(receivers)
+    assert get_symbols(by_activation_time) == ['R2', 'R0', 'R1']
+    assert get_symbols(by_total_energy) == ['R2', 'R0', 'R1']
+
+
+def test_sorts_match_keys():
+    rng = random.Random(0)
+    for size in range(30):
+        symbols = [f'R{i}' for i in range(size)]
+        rng.shuffle(symbols)
+        receivers = [make_receiver(symbol, rng.randint(1, 4), rng.choice([0.5, 1.0, 1.5])) for symbol in symbols]
+        assert get_symbols(sort_receivers_by_symbol(receivers)) == sorted(symbols, key=symbol_key)
+        assert sort_receivers_by_activation_time(receivers) == \
+            sorted(receivers, key=lambda receiver: (receiver.activation_time, symbol_key(receiver.symbol)))
+        assert sort_receivers_by_total_energy(receivers) == \
+            sorted(receivers, key=lambda receiver: (-receiver.total_energy, symbol_key(receiver.symbol)))
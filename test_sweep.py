@@ -0,0 +1,72 @@
+import io
+import pytest
+from emitter import Emitter
+from receiver import Receiver
+from mirror import Mirror
+from laser_circuit import LaserCircuit
+from sweep import sweep, read_variants
+
+'''
+Tests that sweep gives each variant the same results and errors as adding
+its mirrors to the base circuit and running it, and that variant ids are
+unique.
+'''
+
+
+def make_circuit() -> LaserCircuit:
+    '''Returns a base circuit with a mirror, two emitters and two receivers.'''
+    circuit = LaserCircuit(6, 4)
+    for symbol, x, y, frequency, direction in (('A', 0, 0, 100, 'E'), ('B', 0, 3, 200, 'E')):
+        emitter = Emitter(symbol, x, y)
+        emitter.set_pulse_sequence(frequency, direction)
+        circuit.add_emitter(emitter)
+    circuit.add_receiver(Receiver('R0', 5, 0))
+    circuit.add_receiver(Receiver('R1', 3, 1))
+    circuit.add_mirror(Mirror('/', 4, 3))
+    return circuit
+
+
+def test_variants_match_added_mirrors(capsys):
+    variants = [
+        ('base', []),
+        ('turn', [('\\', 3, 0)]),
+        ('blocked', [('/', 4, 3), ('/', 9, 9), ('/', 0, 0), ('/', 5, 0), ('\\', 2, 3), ('/', 2, 3)]),
+    ]
+    results = sweep(make_circuit(), iter(variants), workers=2)
+    assert list(results) == ['base', 'turn', 'blocked']
+    for variant_id, mirrors in variants:
+        circuit = make_circuit()
+        for symbol, x, y in mirrors:
+            circuit.add_mirror(Mirror(symbol, x, y))
+        printed = [line for line in capsys.readouterr().out.splitlines() if line]
+        expected = circuit.compile().run()
+        errors, result = results[variant_id]
+        assert [error.split(': ', 1)[1] for error in errors] == printed
+        assert result.get_activation_times() == expected.get_activation_times()
+        assert result.get_total_energy() == expected.get_total_energy()
+
+
+def test_large_board_shares_only_its_mirrors():
+    circuit = LaserCircuit(100000, 100000)
+    emitter = Emitter('A', 0, 99998)
+    emitter.set_pulse_sequence(100, 'E')
+    circuit.add_emitter(emitter)
+    circuit.add_receiver(Receiver('R0', 70000, 0))
+    circuit.add_mirror(Mirror('/', 70000, 99998))
+    circuit.add_mirror(Mirror('\\', 5, 5))
+    variants = [('base', []), ('blocked', [('\\', 5, 5), ('v', 40000, 99998)])]
+    results = sweep(circuit, variants, workers=1)
+    errors, result = results['base']
+    assert errors == []
+    assert result.get_activation_times() == [('R0', 169998)]
+    errors, result = results['blocked']
+    assert errors == ['Mirror 1: Error: position (5, 5) is already taken by mirror \'\\\'']
+    assert result.get_activation_times() == []
+
+
+def test_duplicate_variant_ids_are_rejected():
+    with pytest.raises(ValueError):
+        sweep(make_circuit(), [('v1', []), ('v1', [('/', 1, 1)])], workers=1)
+    variants, errors = read_variants(io.StringIO('v1: / 1 1\nv2:\nv1: \\\\ 2 2\n'))
+    assert variants == [('v1', [('/', 1, 1)]), ('v2', [])]
+    assert errors == ["Line 3: Error: variant id 'v1' is already used"]
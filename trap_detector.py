@@ -0,0 +1,84 @@
+'''
+TrapDetector - Detects photons that are stuck in a loop between mirrors.
+
+A photon's path is fully determined by its position and direction, so a
+photon that reflects off the same mirror in the same direction twice will
+repeat the same loop forever. Instead of remembering every state a photon has
+been in, the detector keeps one checkpoint state per photon and compares each
+new mirror reflection against it, moving the checkpoint forward after 1, 2, 4,
+8, ... reflections (Brent's cycle detection). This needs constant memory per
+photon and finds every loop within a couple of trips around it.
+'''
+
+
+class TrapDetector:
+
+
+    def __init__(self):
+        '''
+        Initialises a TrapDetector instance with no checkpoints or traps.
+
+        checkpoints: dict[object, list]            - per photon key, the
+                                                     checkpoint as [state,
+                                                     time, reflections since
+                                                     checkpoint, reflections
+                                                     before moving it]
+        traps:       list[tuple[Photon, int, int]] - each trapped photon with
+                                                     the time (ns) it was
+                                                     found to be trapped and
+                                                     its loop period (ns)
+        '''
+        self.checkpoints = {}
+        self.traps = []
+
+
+    def visit(self, key: object, state: tuple[int, int, str], time: int) -> int | None:
+        '''
+        Records that the photon identified by key has just reflected off a
+        mirror, leaving it in state at time.
+
+        Parameters
+        ----------
+        key   - anything identifying the photon, e.g. the photon itself
+        state - the (x, y, direction) of the photon after the reflection
+        time  - the time (ns) of the reflection
+
+        Returns
+        -------
+        The loop period (ns) if the photon has returned to its checkpoint
+        state, meaning it is trapped. Else, None.
+        '''
+        checkpoint = self.checkpoints.get(key)
+        if checkpoint is None:
+            self.checkpoints[key] = [state, time, 0, 1]
+            return None
+
+        if checkpoint[0] == state:
+            return time - checkpoint[1]
+
+        checkpoint[2] += 1
+        if checkpoint[2] == checkpoint[3]:
+            checkpoint[0] = state
+            checkpoint[1] = time
+            checkpoint[2] = 0
+            checkpoint[3] *= 2
+        return None
+
+
+    def add_trap(self, photon, time: int, period: int) -> None:
+        '''
+        Marks photon as trapped and records the trap.
+
+        Parameters
+        ----------
+        photon - the photon that is trapped
+        time   - the time (ns) it was found to be trapped
+        period - the length (ns) of the loop it is stuck in
+        '''
+        photon.got_trapped()
+        self.traps.append((photon, time, period))
+
+
+    def get_traps(self) -> list[tuple[object, int, int]]:
+        '''Returns traps.'''
+        return self.traps
@@ -0,0 +1,327 @@
+try:
+    import numpy as np
+except ImportError:
+    np = None
+from direction import NORTH, EAST, SOUTH, WEST, STATIONARY, ABSORB, DELTA_X, DELTA_Y, MIRROR_SYMBOLS
+from direction import REFLECTIONS as MIRROR_REFLECTIONS
+from sparse_board_displayer import SPARSE_THRESHOLD
+
+'''
+vectorized_engine - An alternate engine for running a LaserCircuit which
+advances every photon in the circuit at once using NumPy array operations.
+
+Photons are stored as a structure of arrays (x, y, direction code and
+absorbed mask) and the components as a sorted array of the flat indices
+(y * width + x) of their cells, looked up with np.searchsorted, so a tick is
+a handful of array operations rather than a Python loop over photons. On
+boards with up to SPARSE_THRESHOLD cells, a dense index from each cell into
+that array, and a mask of the cells photons have passed through, make the
+lookups cheaper. Larger boards, which are drawn by a SparseBoardDisplayer,
+only store the cells that hold a component or that photons have passed
+through, so the engine runs on boards of any size.
+Mirror reflections are looked up in a table indexed by (cell kind, direction),
+built from the same tables Photon.move and Mirror.reflect_photon use.
+Receivers still absorb photons through Receiver.absorb_photon, in the same
+order as the tick engine, so the results written by the circuit are identical.
+
+NumPy is an optional dependency. It is only required when this engine is used.
+'''
+
+
+# cell kinds stored for each component, mirrors taking one kind per symbol
+EMPTY = 0
+EMITTER = 1
+RECEIVER = 2
+MIRROR_KINDS = {symbol: RECEIVER + 1 + i for i, symbol in enumerate(MIRROR_SYMBOLS)}
+
+# reflected direction for each (cell kind, direction), built from the mirror
+# table in the direction module with no change of direction on other cells
+PASS_THROUGH = (NORTH, EAST, SOUTH, WEST, STATIONARY)
+REFLECTIONS = (PASS_THROUGH, PASS_THROUGH, PASS_THROUGH) + \
+    tuple(MIRROR_REFLECTIONS[symbol] for symbol in MIRROR_SYMBOLS)
+
+# how many visited cells are kept before they are merged into unique cells
+VISITED_LIMIT = 1 << 20
+
+
+class VectorizedEngine:
+
+
+    def __init__(self, circuit):
+        '''
+        Initialises a VectorizedEngine instance given the circuit to run. The
+        photons currently in the circuit are copied into arrays and the
+        cells of the circuit's components are sorted by their flat index.
+
+        circuit:        LaserCircuit     - the circuit this engine runs
+        photons:        list[Photon]     - the photons being simulated, in the
+                                           same order as circuit.photons
+        x:              ndarray[int32]   - x position of each photon
+        y:              ndarray[int32]   - y position of each photon
+        direction:      ndarray[int8]    - direction code of each photon
+        absorbed:       ndarray[bool]    - whether each photon is absorbed
+        active:         ndarray[intp]    - indices of photons not yet absorbed,
+                                           in ascending order
+        cells:          ndarray[int64]   - the flat index of each cell
+                                           holding a component, sorted, then
+                                           one past the last cell of the board
+        cell_kinds:     ndarray[uint8]   - the kind of component in each of
+                                           cells, EMPTY for the last one
+        cell_receivers: ndarray[int32]   - index into circuit.receivers of the
+                                           receiver in each of cells, or -1
+        cell_grid:      ndarray[int32] | None
+                                         - the index into cells of each cell
+                                           of the board, or of the last one
+                                           if it has no component, or None
+                                           if the board is sparse
+        checkpoint_state:
+                        ndarray[int64]   - per photon trap checkpoint, encoded
+                                           as (y * width + x) * 4 + direction,
+                                           or -1 before its first reflection
+        checkpoint_time:
+                        ndarray[int64]   - clock when each checkpoint was set
+        reflections_since:
+                        ndarray[int64]   - reflections since each checkpoint
+        reflection_limit:
+                        ndarray[int64]   - reflections before each checkpoint
+                                           is moved forward
+        visited:        list[ndarray]    - the flat indices of the cells
+                                           photons have passed through since
+                                           the board was last painted, if the
+                                           board is sparse
+        visited_count:  int              - how many indices visited holds
+        visited_mask:   ndarray[bool] | None
+                                         - whether photons have passed through
+                                           each cell since the board was last
+                                           painted, or None if the board is
+                                           sparse
+
+        Parameters
+        ----------
+        circuit - the circuit to run
+        '''
+        if np is None:
+            raise ImportError('the vectorized engine requires NumPy')
+
+        self.circuit = circuit
+        width = circuit.width
+        height = circuit.height
+
+        # later writes win, matching the lookup order of get_collided_component
+        components = {}
+        for mirror in circuit.mirrors:
+            components[mirror.y * width + mirror.x] = (MIRROR_KINDS[mirror.symbol], -1)
+        for index, receiver in enumerate(circuit.receivers):
+            components[receiver.y * width + receiver.x] = (RECEIVER, index)
+        for emitter in circuit.emitters:
+            components[emitter.y * width + emitter.x] = (EMITTER, -1)
+        # the array ends with the cell past the end of the board, so no
+        # search lands past the end of it
+        cells = sorted(components)
+        self.cells = np.array(cells + [width * height], dtype=np.int64)
+        self.cell_kinds = np.array([components[cell][0] for cell in cells] + [EMPTY], dtype=np.uint8)
+        self.cell_receivers = np.array([components[cell][1] for cell in cells] + [-1], dtype=np.int32)
+        self.cell_grid = None
+        if width * height <= SPARSE_THRESHOLD:
+            self.cell_grid = np.full(width * height, len(cells), dtype=np.int32)
+            self.cell_grid[self.cells[:-1]] = np.arange(len(cells), dtype=np.int32)
+
+        self.reflections = np.array(REFLECTIONS, dtype=np.int8)
+        self.delta_x = np.array(DELTA_X, dtype=np.int32)
+        self.delta_y = np.array(DELTA_Y, dtype=np.int32)
+
+        self.photons = circuit.photons
+        count = len(self.photons)
+        self.x = np.fromiter((photon.x for photon in self.photons), dtype=np.int32, count=count)
+        self.y = np.fromiter((photon.y for photon in self.photons), dtype=np.int32, count=count)
+        self.direction = np.fromiter((photon.direction_code for photon in self.photons), dtype=np.int8, count=count)
+        self.absorbed = np.fromiter((photon.absorbed for photon in self.photons), dtype=bool, count=count)
+        self.active = np.flatnonzero(~self.absorbed)
+
+        self.checkpoint_state = np.full(count, -1, dtype=np.int64)
+        self.checkpoint_time = np.zeros(count, dtype=np.int64)
+        self.reflections_since = np.zeros(count, dtype=np.int64)
+        self.reflection_limit = np.ones(count, dtype=np.int64)
+
+        self.visited = []
+        self.visited_count = 0
+        self.visited_mask = None
+        if self.cell_grid is not None:
+            self.visited_mask = np.zeros(width * height, dtype=bool)
+
+
+    def is_finished(self) -> bool:
+        '''Returns whether every photon has been absorbed.'''
+        return self.active.size == 0
+
+
+    def tick(self) -> None:
+        '''
+        Runs a single nanosecond (tick) of the circuit for every photon that
+        has not been absorbed, then increments the circuit's clock. Has the
+        same effect on the circuit as LaserCircuit.tick.
+        '''
+        if self.is_finished():
+            return
+        circuit = self.circuit
+        circuit.clock += 1
+
+        active = self.active
+        direction = self.direction[active]
+        x = self.x[active] + self.delta_x[direction]
+        y = self.y[active] + self.delta_y[direction]
+
+        out_of_bounds = (x < 0) | (x >= circuit.width) | (y < 0) | (y >= circuit.height)
+        np.clip(x, 0, circuit.width - 1, out=x)
+        np.clip(y, 0, circuit.height - 1, out=y)
+        self.x[active] = x
+        self.y[active] = y
+        flat = y.astype(np.int64) * circuit.width + x
+        if circuit.trails:
+            self.visit(flat)
+
+        found = self.find_cells(flat)
+        kind = self.cell_kinds[found]
+        kind[out_of_bounds] = EMPTY
+
+        # receivers absorb photons one at a time so energy adds up in the
+        # same order as the tick engine
+        hits = np.flatnonzero(kind == RECEIVER)
+        if hits.size:
+            receiver_indices = self.cell_receivers[found[hits]]
+            for hit, receiver_index in zip(active[hits].tolist(), receiver_indices.tolist()):
+                circuit.receivers[receiver_index].absorb_photon(self.photons[hit], circuit.clock)
+
+        reflected = self.reflections[kind, direction]
+        lost = reflected == ABSORB
+        self.direction[active] = np.where(lost, direction, reflected)
+
+        finished = out_of_bounds | lost
+        finished[hits] = True
+        if circuit.trap_detection:
+            finished |= self.check_for_traps(active, x, y, kind, finished)
+        self.absorbed[active[finished]] = True
+        self.active = active[~finished]
+
+
+    def check_for_traps(self, active, x, y, kind, finished):
+        '''
+        Vectorized form of LaserCircuit.check_for_trap, applying the same
+        checkpoint rule as TrapDetector to every photon that has just
+        reflected off a mirror. Trapped photons are recorded in the circuit's
+        trap_detector in photon order.
+
+        Parameters
+        ----------
+        active   - indices of the photons moved this tick
+        x        - their new x positions
+        y        - their new y positions
+        kind     - the kind of cell each one is on
+        finished - whether each one was absorbed this tick
+
+        Returns
+        -------
+        A mask over active of the photons found to be trapped.
+        '''
+        circuit = self.circuit
+        direction = self.direction[active]
+        stalled = (direction == STATIONARY) & ~finished
+        reflected = (kind >= MIRROR_KINDS['/']) & ~finished
+
+        moved = np.flatnonzero(reflected)
+        photons = active[moved]
+        state = (y[moved].astype(np.int64) * circuit.width + x[moved]) * 4 + direction[moved]
+        checkpoint = self.checkpoint_state[photons]
+
+        first = checkpoint < 0
+        looped = (checkpoint == state) & ~first
+        periods = circuit.clock - self.checkpoint_time[photons[looped]]
+
+        counting = photons[~first & ~looped]
+        self.reflections_since[counting] += 1
+        advance = np.concatenate((photons[first], counting[self.reflections_since[counting] == self.reflection_limit[counting]]))
+        self.checkpoint_state[advance] = state[np.searchsorted(photons, advance)]
+        self.checkpoint_time[advance] = circuit.clock
+        self.reflections_since[advance] = 0
+        self.reflection_limit[counting[self.reflections_since[counting] == 0]] *= 2
+
+        trapped = stalled.copy()
+        trapped[moved[looped]] = True
+        period_of = dict(zip(photons[looped].tolist(), periods.tolist()))
+        for index in active[trapped].tolist():
+            circuit.trap_detector.add_trap(self.photons[index], circuit.clock, period_of.get(index, 1))
+        return trapped
+
+
+    def find_cells(self, flat):
+        '''
+        Returns the index into cells of the component at each of the given
+        flat indices, or of the last of cells for those without one.
+
+        Parameters
+        ----------
+        flat - the flat indices of the cells to look up, all on the board
+        '''
+        if self.cell_grid is not None:
+            return self.cell_grid[flat]
+        found = np.searchsorted(self.cells, flat)
+        found[self.cells[found] != flat] = self.cells.size - 1
+        return found
+
+
+    def visit(self, cells) -> None:
+        '''
+        Records the cells photons have moved to this tick, to be drawn on the
+        board by paint_board. On a sparse board, once more than VISITED_LIMIT
+        cells are recorded they are merged into the unique cells among them,
+        so a long run keeps no more than each cell visited once.
+
+        Parameters
+        ----------
+        cells - the flat indices of the cells
+        '''
+        if self.visited_mask is not None:
+            self.visited_mask[cells] = True
+            return
+        self.visited.append(cells)
+        self.visited_count += cells.size
+        if self.visited_count > VISITED_LIMIT:
+            self.visited = [np.unique(np.concatenate(self.visited))]
+            self.visited_count = self.visited[0].size
+
+
+    def paint_board(self) -> None:
+        '''
+        Adds the trail of every cell visited since the last call onto the
+        circuit's board displayer, so the board matches what the tick engine
+        would show at the current clock.
+        '''
+        if self.visited_mask is not None:
+            cells = np.flatnonzero(self.visited_mask)
+            self.visited_mask[cells] = False
+        elif self.visited:
+            cells = np.unique(np.concatenate(self.visited))
+            self.visited = []
+            self.visited_count = 0
+        else:
+            return
+        y, x = np.divmod(cells, self.circuit.width)
+        self.circuit.board_displayer.add_cells_to_board(zip(x.tolist(), y.tolist()))
+
+
+    def sync(self) -> None:
+        '''
+        Writes the state of the arrays back into the circuit's photons: each
+        photon's position, direction and absorption, and paints the board if
+        the circuit draws trails. Photons absorbed by the engine are absorbed
+        with got_absorbed so the circuit's count of live photons is kept up
+        to date.
+        '''
+        if self.circuit.trails:
+            self.paint_board()
+        for index, photon in enumerate(self.photons):
+            photon.x = int(self.x[index])
+            photon.y = int(self.y[index])
+            photon.direction_code = int(self.direction[index])
+            if self.absorbed[index] and not photon.absorbed:
+                photon.got_absorbed()